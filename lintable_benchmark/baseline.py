@@ -0,0 +1,123 @@
+"""Saves benchmark results as baselines, and compares later results against them."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+from typing import Dict, List, Optional
+
+# where baselines are saved by default, one JSON file per name
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+# the results compared against baselines, besides the timing of each stage;
+# the rest, like the number of files, describe what was benchmarked
+COMPARED = {'seconds', 'files_per_second', 'peak_rss'}
+
+# results where bigger is better; for every other result smaller is better
+HIGHER_IS_BETTER = {'files_per_second'}
+
+# results too small to compare reliably, in seconds and bytes
+MIN_SECONDS = 0.05
+MIN_BYTES = 1024 * 1024
+
+
+def baseline_filename(name: str, path: Optional[str] = None) -> str:
+    """The file a named baseline is saved in."""
+
+    return os.path.join(path if path is not None else BASELINE_PATH, '{name}.json'.format(name=name))
+
+
+def save_baseline(name: str, results: Dict[str, dict], path: Optional[str] = None) -> str:
+    """Save the results of a benchmark run as a named baseline.
+
+    :param name: The name of the baseline, e.g. the machine or the commit it was run on
+    :param results: The results of each scenario, keyed by scenario name
+    :param path: The directory to save the baseline in, defaults to BASELINE_PATH
+    :return str: The file the baseline was saved in
+    """
+
+    filename = baseline_filename(name, path)
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+
+    with open(filename, 'w') as output:
+        json.dump(results, output, indent=2, sort_keys=True)
+        output.write('\n')
+
+    return filename
+
+
+def load_baseline(name: str, path: Optional[str] = None) -> Dict[str, dict]:
+    """Load a named baseline saved by save_baseline."""
+
+    with open(baseline_filename(name, path), 'r') as file:
+        return json.load(file)
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """Find the results that regressed by more than tolerance against a baseline.
+
+    Scenarios and results that aren't in both are ignored, as are scenarios
+    run in a different mode or with a different spec, and timings and sizes
+    too small to be compared reliably.
+
+    :param results: The results of each scenario, keyed by scenario name
+    :param baseline: The baseline results, in the same form
+    :param tolerance: How much worse, as a fraction, a result may be, e.g. 0.2 for 20%
+    :return List[str]: A description of each regression
+    """
+
+    regressions = []
+
+    for scenario in sorted(set(results) & set(baseline)):
+        if any(results[scenario].get(key) != baseline[scenario].get(key) for key in ('mode', 'spec')):
+            continue
+
+        current = flatten(results[scenario])
+        previous = flatten(baseline[scenario])
+
+        for key in sorted(set(current) & set(previous)):
+            if (key in COMPARED or key.startswith('stages.')) and regressed(key, current[key], previous[key], tolerance):
+                regressions.append('{scenario} {key}: {current:.4g} against {previous:.4g}'.format(
+                    scenario=scenario, key=key, current=current[key], previous=previous[key]))
+
+    return regressions
+
+
+def regressed(key: str, current: float, previous: float, tolerance: float) -> bool:
+    """Whether a single result is worse than its baseline by more than tolerance."""
+
+    if key in HIGHER_IS_BETTER:
+        return current * (1 + tolerance) < previous
+
+    minimum = MIN_BYTES if key == 'peak_rss' else MIN_SECONDS
+
+    return max(current, previous) >= minimum and current > previous * (1 + tolerance)
+
+
+def flatten(result: dict, prefix: str = '') -> Dict[str, float]:
+    """Flatten nested results, like {'stages': {'lint': 1.0}}, into {'stages.lint': 1.0}.
+
+    Only numbers are kept, since only they can be compared.
+    """
+
+    flat = {}  # type: Dict[str, float]
+
+    for key, value in result.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, prefix + key + '.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[prefix + key] = value
+
+    return flat
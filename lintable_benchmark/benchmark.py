@@ -0,0 +1,289 @@
+"""Benchmarks the clone, retrieve, lint and report pipeline against synthetic repos."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import logging
+import os
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from multiprocessing import get_context
+from typing import Dict, List, Optional, Tuple
+from uuid import uuid4
+
+import click
+
+from lintable_benchmark.baseline import compare, load_baseline, save_baseline
+from lintable_benchmark.synthetic_repo import RepoSpec, create_synthetic_repo
+from lintable_git.git_handler import GitHandler
+from lintable_lintball.lintball import lint_process
+from lintable_processes.log_handler import LogHandler
+from lintable_processes.process_handler import ProcessHandler
+
+# the scenarios run when none are named, from a typical pull request up to a
+# sweeping change across a large repo
+SCENARIOS = OrderedDict([
+    ('small', RepoSpec(file_count=200, file_size=4 * 1024, changed_count=20, error_density=0.01)),
+    ('medium', RepoSpec(file_count=2000, file_size=8 * 1024, changed_count=200, error_density=0.01)),
+    ('large_files', RepoSpec(file_count=200, file_size=512 * 1024, changed_count=50, error_density=0.01)),
+    ('many_changes', RepoSpec(file_count=5000, file_size=4 * 1024, changed_count=2500, error_density=0.01)),
+    ('dense_errors', RepoSpec(file_count=500, file_size=16 * 1024, changed_count=100, error_density=0.5)),
+])  # type: Dict[str, RepoSpec]
+
+# the path of the command line entry point, to benchmark it end to end
+CLI_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cli.py')
+
+
+def peak_rss(usage: resource.struct_rusage) -> int:
+    """The peak resident set size, in bytes, of a resource usage; Linux counts it in KiB, OS X in bytes."""
+
+    return usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024
+
+
+def run_pipeline(repo_path: str, sha1_a: str, sha1_b: str) -> dict:
+    """Lint the changes between two commits of a repo, timing each stage.
+
+    The changes are linted by lint_process, with a ProcessHandler that only
+    delegates to a LogHandler, so nothing leaves the machine. Meant to be run
+    in a fresh process, so that its peak RSS is its own.
+
+    :return dict: The number of files linted, the timings and the peak RSS
+    """
+
+    # the logs are produced, as they would be on a worker, but go nowhere
+    logger = logging.getLogger()
+    logger.addHandler(logging.NullHandler())
+    logger.setLevel('INFO')
+
+    process_handler = ProcessHandler(handlers=[LogHandler(logger=logger)], uuid=uuid4(), repo=repo_path)
+    git_handler = GitHandler(process_handler, repo_path, sha1_a, sha1_b)
+
+    lint_process(git_handler, process_handler)
+
+    timings = process_handler.timings.to_dict()
+    seconds = timings['total']
+    files = len(set(process_handler.files))
+
+    return {'files': files,
+            'seconds': seconds,
+            'files_per_second': files / seconds if seconds > 0 else 0.0,
+            'peak_rss': peak_rss(resource.getrusage(resource.RUSAGE_SELF)),
+            'peak_child_rss': peak_rss(resource.getrusage(resource.RUSAGE_CHILDREN)),
+            'stages': timings['stages'],
+            'linters': timings['linters']}
+
+
+def run_entry(repo_path: str, sha1_a: str, sha1_b: str, files: int) -> dict:
+    """Lint the changes between two commits of a repo through the command line entry point.
+
+    Only the whole run can be timed, but it includes starting Python and
+    importing lintball, just as running cli.py does.
+
+    :return dict: The timings and the peak RSS of the run
+    """
+
+    start = time.monotonic()
+
+    with open(os.devnull, 'wb') as devnull:
+        process = subprocess.Popen([sys.executable, CLI_PATH, repo_path, '-a', sha1_a, '-b', sha1_b],
+                                   stdout=devnull, stderr=devnull, cwd=os.path.dirname(CLI_PATH))
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = status
+
+    seconds = time.monotonic() - start
+
+    if status != 0:
+        raise click.ClickException('{cli} exited with status {status}'.format(cli=CLI_PATH, status=status))
+
+    return {'files': files,
+            'seconds': seconds,
+            'files_per_second': files / seconds if seconds > 0 else 0.0,
+            'peak_rss': peak_rss(usage)}
+
+
+def run_in_fresh_process(fn, *args):
+    """Call fn(*args) in a freshly spawned process, returning its result or raising its exception.
+
+    The process isn't a daemon, unlike a multiprocessing.Pool worker, so the
+    LintPool it runs can still fork a process pool of its own.
+    """
+
+    context = get_context('spawn')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=send_result, args=(sender, fn) + args)
+    process.start()
+    sender.close()
+
+    try:
+        succeeded, result = receiver.recv()
+    except EOFError:
+        succeeded = None
+    finally:
+        receiver.close()
+        process.join()
+
+    if succeeded is None:
+        raise RuntimeError('Benchmark process exited with {exitcode} before returning'.format(
+            exitcode=process.exitcode))
+
+    if not succeeded:
+        raise result
+
+    return result
+
+
+def send_result(sender, fn, *args):
+    """Call fn(*args), sending whether it succeeded and its result or exception down sender."""
+
+    try:
+        sender.send((True, fn(*args)))
+    except Exception as e:
+        sender.send((False, e))
+    finally:
+        sender.close()
+
+
+def run_scenario(spec: RepoSpec, repetitions: int, entry: bool = False) -> dict:
+    """Benchmark a scenario, each repetition in a fresh process, returning the median results.
+
+    :param spec: The shape of the synthetic repo to lint
+    :param repetitions: How many times to lint it
+    :param entry: Whether to run the command line entry point instead of timing each stage
+    :return dict: The median of each result across the repetitions
+    """
+
+    tmp_dir = tempfile.mkdtemp()
+
+    try:
+        repo_path = os.path.join(tmp_dir, 'repo')
+        sha1_a, sha1_b = create_synthetic_repo(repo_path, spec)
+        runs = []
+
+        for _ in range(repetitions):
+            if entry:
+                runs.append(run_entry(repo_path, sha1_a, sha1_b, spec.changed_count))
+                continue
+
+            runs.append(run_in_fresh_process(run_pipeline, repo_path, sha1_a, sha1_b))
+    finally:
+        shutil.rmtree(tmp_dir)
+
+    return dict(median(runs), mode='entry' if entry else 'stages', spec=dict(spec._asdict()),
+                repetitions=repetitions)
+
+
+def median(runs: List[dict]) -> dict:
+    """The median of each number across several runs' results, keeping their nesting."""
+
+    result = OrderedDict()
+
+    for key, value in runs[0].items():
+        if isinstance(value, dict):
+            result[key] = median([run[key] for run in runs])
+        else:
+            result[key] = statistics.median(run[key] for run in runs)
+
+    return result
+
+
+def format_result(name: str, result: dict) -> str:
+    """Describe the results of a scenario on a line or two."""
+
+    line = '{name:<14} {files:>6} files {seconds:>8.3f}s {rate:>9.1f} files/s {rss:>8.1f} MiB peak RSS'.format(
+        name=name, files=int(result['files']), seconds=result['seconds'], rate=result['files_per_second'],
+        rss=result['peak_rss'] / (1024 * 1024))
+
+    if 'stages' in result:
+        line += '\n' + ' ' * 15 + '  '.join('{stage} {seconds:.3f}s'.format(stage=stage, seconds=seconds)
+                                            for stage, seconds in result['stages'].items())
+
+    return line
+
+
+def custom_spec(file_count: Optional[int], file_size: Optional[int], changed_count: Optional[int],
+                error_density: Optional[float]) -> Optional[Tuple[str, RepoSpec]]:
+    """A custom scenario from the command line options, based on the small scenario, if any were given."""
+
+    overrides = dict(file_count=file_count, file_size=file_size, changed_count=changed_count,
+                     error_density=error_density)
+    overrides = dict((key, value) for key, value in overrides.items() if value is not None)
+
+    if not overrides:
+        return None
+
+    return 'custom', SCENARIOS['small']._replace(**overrides)
+
+
+@click.command()
+@click.argument('scenarios', nargs=-1, type=click.Choice(list(SCENARIOS)))
+@click.option('--repetitions', '-r', default=3, type=int, help='How many times to run each scenario.')
+@click.option('--files', 'file_count', type=int, help='Run a custom scenario with this many files.')
+@click.option('--size', 'file_size', type=int, help='Run a custom scenario with files of this many bytes.')
+@click.option('--changed', 'changed_count', type=int, help='Run a custom scenario with this many changed files.')
+@click.option('--density', 'error_density', type=float, help='Run a custom scenario with this fraction of errors.')
+@click.option('--entry', is_flag=True, help='Time cli.py end to end instead of each stage.')
+@click.option('--save', help='Save the results as the baseline with this name.')
+@click.option('--compare', 'compare_to', help='Compare the results against the baseline with this name.')
+@click.option('--tolerance', default=0.2, type=float, help='How much worse a result may be than its baseline.')
+@click.option('--baseline-path', type=click.Path(file_okay=False), help='Where baselines are saved.')
+@click.option('--json', 'as_json', is_flag=True, help='Print the results as JSON.')
+def benchmark(scenarios, repetitions, file_count, file_size, changed_count, error_density, entry, save, compare_to,
+              tolerance, baseline_path, as_json):
+    """Benchmark lintball against synthetic repos, optionally against a saved baseline.
+
+    Exits with a status of 1 if any result regressed against the baseline.
+    """
+
+    specs = [(name, SCENARIOS[name]) for name in scenarios]
+    custom = custom_spec(file_count, file_size, changed_count, error_density)
+
+    if custom is not None:
+        specs.append(custom)
+    elif not specs:
+        specs = list(SCENARIOS.items())
+
+    results = OrderedDict()
+
+    for name, spec in specs:
+        results[name] = run_scenario(spec, repetitions, entry)
+
+        if not as_json:
+            click.echo(format_result(name, results[name]))
+
+    if as_json:
+        click.echo(json.dumps(results, indent=2))
+
+    if save:
+        click.echo('Saved baseline to {filename}'.format(filename=save_baseline(save, results, baseline_path)),
+                   err=True)
+
+    if compare_to:
+        regressions = compare(results, load_baseline(compare_to, baseline_path), tolerance)
+
+        for regression in regressions:
+            click.echo('Regression: {regression}'.format(regression=regression), err=True)
+
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    benchmark()
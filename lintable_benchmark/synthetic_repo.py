@@ -0,0 +1,132 @@
+"""Generates local git repos of a given shape to benchmark lintball against."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import random
+import string
+from typing import List, NamedTuple, Tuple
+
+from git import Repo
+
+# The shape of a synthetic repo: file_count files of about file_size bytes
+# each are committed as commit b, then changed_count of them are rewritten
+# and committed as commit a. error_density is the fraction of lines, in both
+# commits, that end in trailing whitespace.
+RepoSpec = NamedTuple('RepoSpec', [('file_count', int),
+                                   ('file_size', int),
+                                   ('changed_count', int),
+                                   ('error_density', float),
+                                   ('seed', int)])
+RepoSpec.__new__.__defaults__ = (0,)
+
+# the length of each generated line, not counting any trailing whitespace or the newline
+LINE_LENGTH = 72
+
+# the files are spread across this many directories
+DIRECTORY_COUNT = 16
+
+# how many different lines the files are made up of
+DISTINCT_LINES = 1024
+
+# who the synthetic commits are by
+IDENTITY = {'GIT_AUTHOR_NAME': 'Lintable Benchmark',
+            'GIT_AUTHOR_EMAIL': 'benchmark@lintable.com',
+            'GIT_COMMITTER_NAME': 'Lintable Benchmark',
+            'GIT_COMMITTER_EMAIL': 'benchmark@lintable.com'}
+
+
+def create_synthetic_repo(path: str, spec: RepoSpec) -> Tuple[str, str]:
+    """Create a git repo at path with the shape given by spec.
+
+    The same spec always gives the same files, so runs can be compared.
+
+    :param path: The directory to create the repo in
+    :param spec: The shape of the repo
+    :return: The sha1s of commit a, with the changes, and commit b, before them
+    """
+
+    if spec.changed_count > spec.file_count:
+        raise ValueError('Unable to change {changed} of {files} files'.format(changed=spec.changed_count,
+                                                                            files=spec.file_count))
+
+    generator = random.Random(spec.seed)
+    repo = Repo.init(path=path)
+    repo.git.update_environment(**IDENTITY)
+    filenames = synthetic_filenames(spec.file_count)
+    lines = synthetic_lines(generator)
+
+    for filename in filenames:
+        write_file(os.path.join(path, filename), spec, lines, generator)
+
+    commit_b = commit_all(repo, 'commit b')
+
+    for filename in generator.sample(filenames, spec.changed_count):
+        write_file(os.path.join(path, filename), spec, lines, generator)
+
+    commit_a = commit_all(repo, 'commit a')
+
+    return commit_a, commit_b
+
+
+def synthetic_filenames(file_count: int) -> List[str]:
+    """The paths of the files in a synthetic repo, spread across its directories."""
+
+    return ['dir_{directory}/file_{index}.txt'.format(directory=index % DIRECTORY_COUNT, index=index)
+            for index in range(file_count)]
+
+
+def synthetic_lines(generator: random.Random) -> List[str]:
+    """Generate the lines the files of a synthetic repo are made up of, without trailing whitespace."""
+
+    letters = string.ascii_letters + '     '
+
+    return [''.join(generator.choice(letters) for _ in range(LINE_LENGTH)).strip() or 'x'
+            for _ in range(DISTINCT_LINES)]
+
+
+def synthetic_contents(spec: RepoSpec, lines: List[str], generator: random.Random) -> bytes:
+    """Generate about spec.file_size bytes of lines, error_density of them with trailing whitespace."""
+
+    line_count = max(1, spec.file_size // (LINE_LENGTH + 1))
+    contents = []
+
+    for _ in range(line_count):
+        line = generator.choice(lines)
+
+        if generator.random() < spec.error_density:
+            line += generator.choice([' ', '\t', '  '])
+
+        contents.append(line + '\n')
+
+    return ''.join(contents).encode('ascii')
+
+
+def write_file(filename: str, spec: RepoSpec, lines: List[str], generator: random.Random):
+    """Write a synthetic file, making its directory if need be."""
+
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+
+    with open(filename, 'wb') as output:
+        output.write(synthetic_contents(spec, lines, generator))
+
+
+def commit_all(repo: Repo, message: str) -> str:
+    """Commit every file in the repo's working tree, returning the new commit's sha1."""
+
+    repo.git.add(all=True)
+    repo.git.commit('--quiet', '--no-verify', message=message)
+
+    return repo.head.commit.hexsha
@@ -0,0 +1,110 @@
+"""Tests for the synthetic repos and baselines of the benchmark."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from git import Repo
+
+from lintable_benchmark.baseline import compare, load_baseline, save_baseline
+from lintable_benchmark.synthetic_repo import RepoSpec, create_synthetic_repo
+
+
+class SyntheticRepoTests(unittest.TestCase):
+    """Tests for create_synthetic_repo."""
+
+    spec = RepoSpec(file_count=40, file_size=1024, changed_count=10, error_density=0.25)
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_shape(self):
+        """Make sure the repo has the files, changes and errors asked for."""
+
+        sha1_a, sha1_b = create_synthetic_repo(os.path.join(self.tmp_dir, 'repo'), self.spec)
+        repo = Repo(os.path.join(self.tmp_dir, 'repo'))
+        commit_a = repo.commit(sha1_a)
+        commit_b = repo.commit(sha1_b)
+
+        self.assertEqual(list(commit_a.parents), [commit_b])
+        self.assertEqual(len(list(commit_b.tree.traverse(lambda item, depth: item.type == 'blob'))), 40)
+        self.assertEqual(len(commit_b.diff(commit_a)), 10)
+
+        lines = [line for item in commit_b.tree.traverse(lambda item, depth: item.type == 'blob')
+                 for line in item.data_stream.read().splitlines()]
+        dirty = [line for line in lines if line != line.rstrip()]
+
+        self.assertAlmostEqual(len(dirty) / len(lines), 0.25, delta=0.05)
+
+    def test_reproducible(self):
+        """Make sure the same spec always gives the same commits."""
+
+        first = create_synthetic_repo(os.path.join(self.tmp_dir, 'first'), self.spec)
+        second = create_synthetic_repo(os.path.join(self.tmp_dir, 'second'), self.spec)
+        other = create_synthetic_repo(os.path.join(self.tmp_dir, 'other'), self.spec._replace(seed=1))
+
+        self.assertEqual(Repo(os.path.join(self.tmp_dir, 'first')).commit(first[0]).tree.hexsha,
+                         Repo(os.path.join(self.tmp_dir, 'second')).commit(second[0]).tree.hexsha)
+        self.assertNotEqual(Repo(os.path.join(self.tmp_dir, 'first')).commit(first[0]).tree.hexsha,
+                            Repo(os.path.join(self.tmp_dir, 'other')).commit(other[0]).tree.hexsha)
+
+
+class BaselineTests(unittest.TestCase):
+    """Tests for saving baselines and comparing against them."""
+
+    baseline = {'small': {'mode': 'stages', 'files': 20, 'seconds': 1.0, 'files_per_second': 20.0,
+                          'peak_rss': 64 * 1024 * 1024, 'stages': {'lint': 0.5, 'report': 0.001}}}
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_save_and_load(self):
+        """Make sure a saved baseline loads back the same."""
+
+        save_baseline('machine', self.baseline, self.tmp_dir)
+
+        self.assertEqual(load_baseline('machine', self.tmp_dir), self.baseline)
+
+    def test_compare(self):
+        """Make sure only results worse than the tolerance are regressions."""
+
+        results = {'small': {'mode': 'stages', 'files': 10, 'seconds': 1.1, 'files_per_second': 12.0,
+                             'peak_rss': 96 * 1024 * 1024, 'stages': {'lint': 0.9, 'report': 0.01}}}
+
+        self.assertEqual(compare(results, self.baseline, 0.2),
+                         ['small files_per_second: 12 against 20',
+                          'small peak_rss: 1.007e+08 against 6.711e+07',
+                          'small stages.lint: 0.9 against 0.5'])
+        self.assertEqual(compare(results, self.baseline, 1.0), [])
+        self.assertEqual(compare(self.baseline, self.baseline, 0.0), [])
+
+    def test_compare_different_modes(self):
+        """Make sure results of the entry point aren't compared against timings of each stage."""
+
+        results = {'small': dict(self.baseline['small'], mode='entry', seconds=10.0)}
+
+        self.assertEqual(compare(results, self.baseline, 0.2), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -19,6 +19,8 @@ from typing import Union
 from uuid import UUID
 
 from lintable_db.models import User, Repo, Jobs, AcmeChallengeResponse
+from lintable_lintball.lint_report import LintReport, create_from_db_query
+from lintable_lintball.lint_report_codec import decode_report
 
 logger = logging.getLogger(__name__)
 
@@ -121,6 +123,21 @@ class DatabaseHandler:
 
         return job
 
+    @staticmethod
+    def get_report(job: Jobs) -> LintReport:
+        """Reads back a job's report, whether it was stored encoded or as a row per error.
+
+        :param job:
+        :return LintReport:
+        """
+
+        encoded_reports = list(job.encoded_reports)
+
+        if encoded_reports:
+            return decode_report(encoded_reports[0].data)
+
+        return create_from_db_query(job.reports)
+
     @staticmethod
     def get_acme_response(identifier: str) -> str:
         """Look up an ACME response by challenge identifier.
@@ -0,0 +1,47 @@
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+
+from lintable_db.models import EncodedReport
+
+logger = logging.getLogger(__name__)
+
+# The tables added to the schema, in the order they were added, by migration name.
+MIGRATIONS = [('0001_encoded_reports', [EncodedReport])]
+
+
+def migrate():
+    """Create every table added by a migration that the database doesn't have yet.
+
+    It is safe to run repeatedly; tables that already exist are left alone.
+
+    :return:
+    """
+
+    for name, tables in MIGRATIONS:
+        missing = [table for table in tables if not table.table_exists()]
+
+        if missing:
+            logger.info('Applying migration {0}'.format(name))
+
+            for table in missing:
+                table.create_table(fail_silently=True)
+
+    return
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    migrate()
@@ -19,7 +19,7 @@ from datetime import date, timedelta
 from urllib.parse import urlparse
 
 from peewee import (Model, PrimaryKeyField, IntegerField, ForeignKeyField,
-                    DateTimeField, CharField, UUIDField, PostgresqlDatabase)
+                    DateTimeField, CharField, UUIDField, BlobField, PostgresqlDatabase)
 from cryptography.fernet import Fernet
 
 from lintable_db.fields import OauthField
@@ -150,6 +150,12 @@ class Report(BaseModel):
     line_number = IntegerField()
     error_message = CharField()
 
+class EncodedReport(BaseModel):
+    """A job's whole linting results report, in the lint_report_codec encoding."""
+
+    job = ForeignKeyField(Jobs, related_name='encoded_reports')
+    data = BlobField()
+
 class ReportSummary(BaseModel):
     job_id = ForeignKeyField(Jobs, related_name='summaries')
     file_name = CharField()
@@ -0,0 +1,45 @@
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from peewee import SqliteDatabase
+from playhouse.test_utils import test_database
+
+from lintable_db.migrations import MIGRATIONS, migrate
+from lintable_db.models import User, Jobs, Repo
+
+test_db = SqliteDatabase(':memory:')
+
+
+class MigrationsTests(unittest.TestCase):
+    """Tests for migrate."""
+
+    def test_migrate_creates_missing_tables(self):
+        """Make sure migrating creates the tables added since the original schema, and can be run again."""
+
+        added = [table for name, tables in MIGRATIONS for table in tables]
+
+        with test_database(test_db, [User, Repo, Jobs]):
+            with test_database(test_db, added, create_tables=False):
+                self.assertFalse(any(table.table_exists() for table in added))
+
+                migrate()
+                migrate()
+
+                self.assertTrue(all(table.table_exists() for table in added))
+
+
+if __name__ == '__main__':
+    unittest.main()
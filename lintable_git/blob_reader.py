@@ -0,0 +1,180 @@
+"""Reads the contents of many files of a repo through a single git process."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import subprocess
+import threading
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from git import Repo
+from git.exc import GitCommandError
+
+
+class BlobReader(object):
+    """Reads files out of commits through one long running git cat-file --batch.
+
+    Each file is asked for by its path within the commit, so git finds its
+    blob rather than the trees being walked in Python, and the requests are
+    written while the contents are read back, so the whole batch costs a
+    single round trip. Contents are read as bytes, exactly as they're stored.
+    """
+
+    def __init__(self, repo: Repo):
+        """
+        :param repo: The repo to read from
+        :return:
+        """
+
+        self.repo = repo  # type: Repo
+        self.process = None  # type: Optional[subprocess.Popen]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def start(self) -> subprocess.Popen:
+        """Start git cat-file --batch, unless it's already running."""
+
+        if self.process is None:
+            self.process = subprocess.Popen(['git', '-C', self.repo.git_dir, 'cat-file', '--batch'],
+                                            stdin=subprocess.PIPE,
+                                            stdout=subprocess.PIPE,
+                                            stderr=subprocess.DEVNULL)
+
+        return self.process
+
+    def close(self):
+        """Stop git cat-file, if it's running."""
+
+        if self.process is None:
+            return
+
+        process, self.process = self.process, None
+
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+
+        process.kill()
+        process.wait()
+        process.stdout.close()
+
+    def read(self, commit: str, filenames: Iterable[str]) -> Iterator[Tuple[str, Optional[str], Optional[bytes]]]:
+        """Read files out of a commit, in the order they're given.
+
+        Files that aren't blobs in the commit, like submodules, are given
+        with None for their blob id and contents.
+
+        :param commit: The sha1 of the commit to read from
+        :param filenames: The paths of the files within the commit
+        :return Iterator[Tuple[str, Optional[str], Optional[bytes]]]: Each file's path, blob id and contents
+        """
+
+        filenames = list(filenames)
+
+        return self.read_requests(filenames, [self.request(commit, filename) for filename in filenames])
+
+    def read_blobs(self, blob_ids: Iterable[Tuple[str, str]]) -> Iterator[Tuple[str, Optional[str], Optional[bytes]]]:
+        """Read files by their blob ids, as given by git diff, in the order they're given.
+
+        This skips looking the files up in their commit's tree altogether.
+
+        :param blob_ids: Each file's path and blob id
+        :return Iterator[Tuple[str, Optional[str], Optional[bytes]]]: Each file's path, blob id and contents
+        """
+
+        blob_ids = list(blob_ids)
+
+        return self.read_requests([filename for filename, _ in blob_ids], [blob_id for _, blob_id in blob_ids])
+
+    def read_requests(self, filenames: List[str],
+                      requests: List[str]) -> Iterator[Tuple[str, Optional[str], Optional[bytes]]]:
+        """Send git cat-file a request for each file, and read back its answers."""
+
+        if not filenames:
+            return
+
+        process = self.start()
+        writer = threading.Thread(target=self.write_requests, args=(process, requests), daemon=True)
+        writer.start()
+
+        answered = 0
+
+        try:
+            for filename in filenames:
+                blob_id, contents = self.read_response(process)
+                answered += 1
+                yield filename, blob_id, contents
+        finally:
+            # a reader that stopped early, or broke, has answers still coming
+            if answered < len(filenames):
+                self.close()
+
+            writer.join()
+
+    def request(self, commit: str, filename: str) -> str:
+        """The line asking git cat-file for a file of a commit."""
+
+        if '\n' not in filename:
+            return '{commit}:{filename}'.format(commit=commit, filename=filename)
+
+        # requests are split on newlines, so look up the blob of files with one in their name
+        try:
+            return self.repo.commit(commit).tree[filename].hexsha
+        except KeyError:
+            return commit + ':'
+
+    @staticmethod
+    def write_requests(process: subprocess.Popen, requests: List[str]):
+        """Write every request to git cat-file; run in its own thread so the answers can be read meanwhile."""
+
+        try:
+            for request in requests:
+                process.stdin.write(request.encode('utf-8', errors='surrogateescape') + b'\n')
+
+            process.stdin.flush()
+        except (OSError, ValueError):
+            # git exited or was closed, which the reader reports
+            pass
+
+    def read_response(self, process: subprocess.Popen) -> Tuple[Optional[str], Optional[bytes]]:
+        """Read git cat-file's answer to a request, as the blob id and contents, or None for both if it's no blob."""
+
+        header = process.stdout.readline()
+
+        if not header.endswith(b'\n'):
+            raise GitCommandError(process.args, process.poll(), 'git cat-file exited before answering every request')
+
+        fields = header.split()
+
+        # not found, or not something the commit's tree has, e.g. "<sha1>:<path> missing"
+        if len(fields) != 3 or fields[-1] in (b'missing', b'ambiguous'):
+            return None, None
+
+        object_id, object_type, size = fields
+        contents = process.stdout.read(int(size) + 1)
+
+        if len(contents) != int(size) + 1:
+            raise GitCommandError(process.args, process.poll(), 'git cat-file exited in the middle of a file')
+
+        contents = contents[:-1]
+
+        if object_type != b'blob':
+            return None, None
+
+        return object_id.decode('ascii'), contents
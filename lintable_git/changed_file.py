@@ -0,0 +1,94 @@
+"""The files changed between two commits, as parsed from git diff --raw."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import List, NamedTuple, Optional, Tuple
+
+# Commit a is the commit being checked and commit b is the commit it is
+# compared against, as in GitHandler. Renamed and copied files have the path
+# and blob they came from in commit b, added files have None for both, and
+# score is how similar a renamed or copied file is to where it came from, in
+# percent. Status is git's: A, C, M, R or T.
+ChangedFile = NamedTuple('ChangedFile', [('status', str),
+                                         ('a_path', str),
+                                         ('a_blob_id', str),
+                                         ('b_path', Optional[str]),
+                                         ('b_blob_id', Optional[str]),
+                                         ('score', Optional[int])])
+
+# the mode of submodules, which aren't files of the commit
+GITLINK_MODE = '160000'
+
+# the mode of symlinks, whose blobs are the paths they point to
+SYMLINK_MODE = '120000'
+
+
+def parse_raw_diff(output: bytes) -> List[ChangedFile]:
+    """Parse the files added to or changed in commit a out of git diff --raw -z --no-abbrev from commit b.
+
+    Deleted files, submodules, symlinks, and files whose contents didn't change, like
+    files that were only renamed or had their mode changed, are left out.
+
+    :param output: The output of git diff, with NUL-terminated fields
+    :return List[ChangedFile]:
+    """
+
+    entries, _ = parse_raw_entries(output)
+
+    return [changed_file for _, changed_file in entries if changed_file is not None]
+
+
+def parse_raw_entries(output: bytes) -> Tuple[List[Tuple[str, Optional[ChangedFile]]], int]:
+    """Parse every entry of the raw part of git diff -z --no-abbrev output, in order.
+
+    Each entry is given with its status letter, and entries that
+    parse_raw_diff leaves out are given as None, so that the entries can
+    still be lined up with the patches of git diff --patch-with-raw.
+
+    :param output: The output of git diff, with NUL-terminated fields
+    :return Tuple[List[Tuple[str, Optional[ChangedFile]]], int]: The status and ChangedFile of each entry,
+                                                                 and where the output after them starts
+    """
+
+    entries = []  # type: List[Tuple[str, Optional[ChangedFile]]]
+    index = 0
+
+    # each file is ":b_mode a_mode b_blob_id a_blob_id status" NUL path NUL,
+    # with the path in commit b first for renames and copies
+    while output.startswith(b':', index):
+        end = output.index(b'\0', index)
+        b_mode, a_mode, b_blob_id, a_blob_id, status = output[index + 1:end].decode('ascii').split(' ')
+        letter, score = status[0], int(status[1:]) if status[1:] else None
+        paths = []  # type: List[str]
+
+        for _ in range(2 if letter in 'RC' else 1):
+            index, end = end + 1, output.index(b'\0', end + 1)
+            paths.append(output[index:end].decode('utf-8', errors='surrogateescape'))
+
+        index = end + 1
+        b_path, a_path = paths[0], paths[-1]
+
+        if (letter not in 'ACMRT' or a_blob_id == b_blob_id or GITLINK_MODE in (a_mode, b_mode) or
+                a_mode == SYMLINK_MODE):
+            entries.append((letter, None))
+            continue
+
+        if letter == 'A':
+            b_path = b_blob_id = None
+
+        entries.append((letter, ChangedFile(status=letter, a_path=a_path, a_blob_id=a_blob_id,
+                                            b_path=b_path, b_blob_id=b_blob_id, score=score)))
+
+    return entries, index
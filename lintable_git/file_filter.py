@@ -0,0 +1,185 @@
+"""Finds the changed files that are not worth linting: binary, generated, vendored or huge."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import fnmatch
+import os
+import subprocess
+import tempfile
+from typing import Dict, Iterable, List, Optional
+
+from git import Commit, Repo
+
+from lintable_settings.settings import LINTBALL_SETTINGS
+
+# files that are almost always generated, whatever the repo's attributes say
+GENERATED_GLOBS = ['*.min.js', '*.min.css', '*.map', '*_pb2.py', '*.pb.go',
+                   'package-lock.json', 'yarn.lock', 'Gemfile.lock', 'Cargo.lock', 'composer.lock', 'poetry.lock']
+
+# directories that almost always hold someone else's code
+VENDORED_GLOBS = ['node_modules/*', '*/node_modules/*', 'bower_components/*', '*/bower_components/*',
+                  'vendor/*', '*/vendor/*', 'third_party/*', '*/third_party/*']
+
+# the git attributes checked for each file
+ATTRIBUTES = ['linguist-generated', 'linguist-vendored', 'diff']
+
+GENERATED = 'generated'
+VENDORED = 'vendored'
+BINARY = 'binary'
+TOO_LARGE = 'too large'
+
+
+class FileFilter(object):
+    """Classifies the files of a commit, before anything is written to disk or linted.
+
+    Files are skipped when the repo's git attributes mark them as generated,
+    vendored or not diffable (linguist-generated, linguist-vendored, -diff or
+    binary), when they match the usual generated or vendored paths and the
+    attributes don't say otherwise, or when their blob is over max_size bytes.
+    Binary files are found by sniffing their first sniff_size bytes for a NUL
+    byte, once their contents have been read.
+    """
+
+    def __init__(self, repo: Repo, commit: Commit, max_size: Optional[int] = None, sniff_size: Optional[int] = None):
+        """
+        :param repo: The repo the commit is in
+        :param commit: The commit whose files are being classified
+        :param max_size: The largest blob, in bytes, worth linting, defaults to LINTBALL_SETTINGS['filter']['max_size']
+        :param sniff_size: How much of a blob to check for NULs, defaults to LINTBALL_SETTINGS['filter']['sniff_size']
+        :return:
+        """
+
+        self.repo = repo  # type: Repo
+        self.commit = commit  # type: Commit
+        self.max_size = max_size if max_size is not None else LINTBALL_SETTINGS['filter']['max_size']  # type: int
+        self.sniff_size = sniff_size if sniff_size is not None else LINTBALL_SETTINGS['filter']['sniff_size']  # type: int
+
+    def classify(self, filenames: Iterable[str], check_sizes: bool = True) -> Dict[str, str]:
+        """Find the files that shouldn't be retrieved, without reading their contents.
+
+        :param filenames: The files of the commit to classify
+        :param check_sizes: Whether to check the sizes of their blobs too, which a partial clone
+                            only knows once it has fetched them, see classify_sizes
+        :return Dict[str, str]: Why each skipped file is skipped, keyed by filename
+        """
+
+        filenames = sorted(filenames)
+        attributes = self.attributes(filenames)
+        skipped = {}  # type: Dict[str, str]
+
+        for filename in filenames:
+            reason = self.classify_path(filename, attributes.get(filename, {}))
+
+            if reason is not None:
+                skipped[filename] = reason
+
+        if check_sizes:
+            # the blob ids are in the commit's trees, so looking them up doesn't read the blobs
+            skipped.update(self.classify_sizes(dict((filename, self.commit.tree[filename].hexsha)
+                                                    for filename in filenames if filename not in skipped)))
+
+        return skipped
+
+    def classify_sizes(self, blob_ids: Dict[str, str]) -> Dict[str, str]:
+        """Find the files whose blobs are over max_size bytes, looking their sizes up in one batch.
+
+        :param blob_ids: The blob id of each file to check, keyed by filename
+        :return Dict[str, str]: TOO_LARGE for each file that's too large, keyed by filename
+        """
+
+        if not self.max_size or not blob_ids:
+            return {}
+
+        filenames = sorted(blob_ids)
+        output = subprocess.run(['git', '-C', self.repo.git_dir, 'cat-file', '--batch-check'],
+                                input='\n'.join(blob_ids[filename] for filename in filenames).encode('ascii') + b'\n',
+                                check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE).stdout
+
+        skipped = {}  # type: Dict[str, str]
+
+        # each object is reported as sha1 SP type SP size, or sha1 SP missing, in the order asked for
+        for filename, line in zip(filenames, output.decode('ascii').splitlines()):
+            fields = line.split()
+
+            if len(fields) == 3 and fields[1] == 'blob' and int(fields[2]) > self.max_size:
+                skipped[filename] = TOO_LARGE
+
+        return skipped
+
+    @staticmethod
+    def classify_path(filename: str, attributes: Dict[str, str]) -> Optional[str]:
+        """Classify a file by its path and git attributes alone."""
+
+        if attributes.get('diff') == 'unset':
+            return BINARY
+
+        for attribute, globs, reason in (('linguist-generated', GENERATED_GLOBS, GENERATED),
+                                         ('linguist-vendored', VENDORED_GLOBS, VENDORED)):
+            value = attributes.get(attribute, 'unspecified')
+
+            if value in ('set', 'true'):
+                return reason
+
+            # an explicit false overrides the usual paths
+            if value == 'unspecified' and matches_any(filename, globs):
+                return reason
+
+        return None
+
+    def is_binary(self, contents: bytes) -> bool:
+        """Whether a file's contents look binary, judging by a NUL in the first block."""
+
+        return b'\0' in contents[:self.sniff_size]
+
+    def attributes(self, filenames: List[str]) -> Dict[str, Dict[str, str]]:
+        """Look up the git attributes of files as of the commit.
+
+        The attributes are read through a temporary index of the commit, so the
+        .gitattributes files of the commit apply rather than those checked out.
+
+        :param filenames: The files to look up
+        :return Dict[str, Dict[str, str]]: The value of each attribute of each file, keyed by filename
+        """
+
+        if not filenames:
+            return {}
+
+        with tempfile.TemporaryDirectory() as index_dir:
+            env = dict(os.environ, GIT_INDEX_FILE=os.path.join(index_dir, 'index'))
+            git = ['git', '-C', self.repo.working_dir]
+
+            subprocess.run(git + ['read-tree', self.commit.hexsha], env=env, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            output = subprocess.run(git + ['check-attr', '--cached', '-z', '--stdin'] + ATTRIBUTES,
+                                    input='\0'.join(filenames).encode('utf-8') + b'\0',
+                                    env=env, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE).stdout
+
+        attributes = {}  # type: Dict[str, Dict[str, str]]
+        fields = output.decode('utf-8', errors='surrogateescape').split('\0')
+
+        # each attribute of each file is reported as path NUL attribute NUL value NUL
+        for index in range(0, len(fields) - 2, 3):
+            filename, attribute, value = fields[index:index + 3]
+            attributes.setdefault(filename, {})[attribute] = value
+
+        return attributes
+
+
+def matches_any(filename: str, globs: Iterable[str]) -> bool:
+    """Whether a path matches any of the globs; globs without a directory match just the file's name."""
+
+    basename = os.path.basename(filename)
+
+    return any(fnmatch.fnmatchcase(filename if '/' in glob else basename, glob) for glob in globs)
@@ -18,13 +18,19 @@ import os
 import shutil
 import tempfile
 
-from typing import Iterable, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 from typing import Set
 
 from urllib.parse import urlparse
 
 from git import Repo, Commit
 
+from lintable_git.blob_reader import BlobReader
+from lintable_git.changed_file import ChangedFile, parse_raw_diff
+from lintable_git.file_filter import BINARY, FileFilter
+from lintable_git.hunk import Hunk, parse_patch_with_raw
+from lintable_git.partial_clone import PartialClone, default_partial_clone, fetch_blobs, is_partial
+from lintable_git.repo_cache import RepoCache, cache_key, default_repo_cache
 from lintable_processes.process_handler import ProcessHandler
 
 
@@ -35,6 +41,7 @@ class GitHandler(object):
     started - Post constructor setup, this is largely to delegate to the ProcessHandler
     clone_repo - clone the repository at repo_url into the local_path/repo directory
     retrieve_files - pull the changes files from commit a and any corresponding files from commit b, storing them in path a and path b respectively
+    retrieve_hunks - optionally, find the changed line ranges of each file so linters can skip unchanged lines
     """
 
     def __init__(self,
@@ -42,13 +49,21 @@ class GitHandler(object):
                  repo_url: str,
                  sha1_a: str,
                  sha1_b: str,
-                 local_path: Optional[str] = None):
+                 local_path: Optional[str] = None,
+                 repo_id: Optional[str] = None,
+                 repo_cache: Optional[RepoCache] = None,
+                 partial_clone: Optional[PartialClone] = None):
         """
         :param process_handler: The ProcessHandler to delegate to for IO handling
         :param repo_url: The URL of the repository to clone
         :param sha1_a: The sha1 in hex format of the commit to compare with
         :param sha1_b: The sha1 in hex format of the commit to compare against
         :param local_path: The local path to store the cloned repository and the files pulled from the commits
+        :param repo_id: Identifies the repository in the repo cache, rather than its URL
+        :param repo_cache: The cache of mirrors to clone remote repositories from,
+                           by default the worker-wide one if it's enabled
+        :param partial_clone: How to clone just the two commits of repositories that
+                              aren't in a repo cache, by default as configured for remote ones
         :return:
         """
 
@@ -62,7 +77,13 @@ class GitHandler(object):
         self.commit_b = None  # type: Optional[Commit]
         self.repo = None  # type: Optional[Repo]
         self.files = []  # type: List[str]
+        self.changed = None  # type: Optional[List[ChangedFile]]
         self.local_path = local_path if local_path else tempfile.mkdtemp()  # type: str
+        self.repo_id = repo_id  # type: Optional[str]
+        self.repo_cache = repo_cache if repo_cache is not None or not self.remote \
+            else default_repo_cache()  # type: Optional[RepoCache]
+        self.partial_clone = partial_clone if partial_clone is not None or not self.remote \
+            else default_partial_clone()  # type: Optional[PartialClone]
         return
 
     def __del__(self):
@@ -111,14 +132,25 @@ class GitHandler(object):
     def clone_repo(self):
         """Clones a git repo and locates the last merge and previous commit.
 
-        It will clone the repo into the local_path/repo.
+        It will clone the repo into the local_path/repo, from the repo cache's
+        mirror of it if there is a repo cache, or else just the two commits if
+        there is a partial clone.
 
         :return:
         """
 
         self.process_handler.clone_repo(self.local_path, self.cloned_repo_path, self.a_path, self.b_path)
 
-        if self.remote:
+        if self.repo_cache is not None:
+            self.repo = self.repo_cache.clone(url=self.repo_url,
+                                              key=cache_key(self.repo_url, self.repo_id),
+                                              sha1s=[self.sha1_a, self.sha1_b],
+                                              to_path=self.cloned_repo_path)
+        elif self.partial_clone is not None:
+            self.repo = self.partial_clone.clone(url=self.repo_url,
+                                                 sha1s=[self.sha1_a, self.sha1_b],
+                                                 to_path=self.cloned_repo_path)
+        elif self.remote:
             self.repo = Repo.clone_from(url=self.repo_url, to_path=self.cloned_repo_path)
         else:
             self.repo = Repo(path=self.repo_url)
@@ -128,11 +160,14 @@ class GitHandler(object):
         self.commit_b = self.repo.commit(self.sha1_b)
         return
 
-    def retrieve_changed_files_from_commit(self):
+    def retrieve_changed_files_from_commit(self, only: Optional[Set[str]] = None, write_files: bool = True):
         """Gets the files changed between the last merge and previous commit.
 
         Those files are stored into the a and b directories respectively.
 
+        :param only: If given, only the changed files in this set are retrieved
+        :param write_files: If False, the files are handed to the process handler
+                            in memory instead of being stored
         :return:
         """
 
@@ -142,36 +177,160 @@ class GitHandler(object):
         os.mkdir(self.b_path)
 
         # get the files that were added or modified between commit b and commit a
-        a_files, b_files = self.get_files_changed_between_commits(self.commit_a, self.commit_b)
+        changed = self.changed = self.get_changed_files_between_commits(self.commit_a, self.commit_b)
+
+        if only is not None:
+            changed = [changed_file for changed_file in changed if changed_file.a_path in only]
+
+        # the blob of each file in commit a, and of its previous version in commit b,
+        # which renamed and copied files are compared against under their new names
+        a_blob_ids = dict((changed_file.a_path, changed_file.a_blob_id) for changed_file in changed)
+        b_blob_ids = dict((changed_file.a_path, changed_file.b_blob_id) for changed_file in changed
+                          if changed_file.b_blob_id is not None)
+
+        # partial clones have none of the files yet, and need the .gitattributes ones to classify the rest
+        partial = is_partial(self.repo)
+
+        if partial:
+            fetch_blobs(self.repo, self.attributes_blob_ids())
+
+        # skip the files that aren't worth linting before retrieving anything
+        file_filter = FileFilter(self.repo, self.commit_a)
+        skipped = file_filter.classify(list(a_blob_ids), check_sizes=not partial)
+
+        if partial:
+            # then fetch just the files that are left, all at once, whose sizes are only known once they're fetched
+            fetch_blobs(self.repo, self.blob_ids([changed_file for changed_file in changed
+                                                  if changed_file.a_path not in skipped]))
+            skipped.update(file_filter.classify_sizes(dict((filename, blob_id)
+                                                           for filename, blob_id in a_blob_ids.items()
+                                                           if filename not in skipped)))
+
+        for filename, reason in sorted(skipped.items()):
+            self.process_handler.skip_file(filename, self.commit_a, reason)
+
+        # both commits are read through the one git process
+        with BlobReader(self.repo) as blob_reader:
+            # pull the file contents out from commit a and store them in path a,
+            # dropping any that turn out to be binary
+            a_files = self.pull_files_from_commit(self.commit_a, set(a_blob_ids) - set(skipped), self.a_path,
+                                                  file_filter, write_files=write_files, blob_reader=blob_reader,
+                                                  blob_ids=a_blob_ids)
+            b_files = set(b_blob_ids) & a_files
+
+            # note which files we are checking
+            self.files = a_files
+
+            # pull the file contents out from commit b and store them in path b
+            self.pull_files_from_commit(self.commit_b, b_files, self.b_path, write_files=write_files,
+                                        blob_reader=blob_reader, blob_ids=b_blob_ids)
 
-        # note which files we are checking
-        self.files = a_files
+        return
+
+    @staticmethod
+    def blob_ids(changed: List[ChangedFile]) -> List[str]:
+        """The blobs needed to retrieve the given files from commits a and b.
+
+        :param changed: The files to retrieve
+        :return List[str]: The sha1s of the files' blobs
+        """
+
+        blob_ids = [changed_file.a_blob_id for changed_file in changed]
+        blob_ids.extend(changed_file.b_blob_id for changed_file in changed if changed_file.b_blob_id is not None)
+
+        return blob_ids
+
+    def attributes_blob_ids(self) -> List[str]:
+        """The blobs of commit a's .gitattributes files, needed to classify its files.
+
+        :return List[str]: The sha1s of the blobs
+        """
+
+        blob_ids = []  # type: List[str]
+
+        # listing a tree only needs the trees, which even partial clones have
+        for line in self.repo.git.ls_tree('-r', '-z', self.commit_a.hexsha).split('\0'):
+            if line.endswith('\t.gitattributes') or line.endswith('/.gitattributes'):
+                blob_ids.append(line.split()[2])
 
-        # pull the file contents out from commit a and store them in path a
-        self.pull_files_from_commit(self.commit_a, a_files, self.a_path)
+        return blob_ids
 
-        # pull the file contents out from commit b and store them in path b
-        self.pull_files_from_commit(self.commit_b, b_files, self.b_path)
+    def retrieve_changed_hunks_from_commit(self, only: Optional[Set[str]] = None):
+        """Gets the hunks changed between the last merge and previous commit.
+
+        They are handed to the process handler, keyed by filename in commit a.
+        Once the changed files have been retrieved, only their hunks are.
+
+        :param only: If given, only the hunks of the changed files in this set are retrieved
+        :return:
+        """
+
+        changed = self.changed
+
+        if changed is None:
+            changed = self.get_changed_files_between_commits(self.commit_a, self.commit_b)
+        else:
+            # just the files being linted, so that partial clones don't fetch the rest
+            changed = [changed_file for changed_file in changed if changed_file.a_path in self.files]
+
+        if only is not None:
+            changed = [changed_file for changed_file in changed if changed_file.a_path in only]
+
+        hunks = self.get_hunks_between_commits(self.commit_a, self.commit_b, changed=changed)
+
+        self.process_handler.retrieve_changed_hunks(hunks)
 
         return
 
     def pull_files_from_commit(self, commit: Commit, files: Iterable[str],
-                               path: str):
+                               path: str, file_filter: Optional[FileFilter] = None,
+                               write_files: bool = True, blob_reader: Optional[BlobReader] = None,
+                               blob_ids: Optional[Dict[str, str]] = None) -> Set[str]:
         """Pulls a iterable of files from a commit and stores them in the path.
 
+        Files that aren't blobs, like submodules, are left out.
+
         :param commit: The commit to pull from
         :param files: The files to pull.
         :param path: The directory path to save the pulled files to.
-        :return:
+        :param file_filter: If given, files it finds to be binary are skipped rather than saved
+        :param write_files: If False, the contents are handed to the process handler instead of saved
+        :param blob_reader: The BlobReader to read the files with, by default one of its own
+        :param blob_ids: If given, the files are read by these blob ids, keyed by filename,
+                         rather than being looked up in the commit
+        :return Set[str]: The files that were pulled
         """
 
-        for filename in files:
-            # this will pull out the given filename from a commit by its sha1
-            contents = self.repo.git.show(
-                '{sha1}:{filename}'.format(sha1=commit.hexsha,
-                                           filename=filename))
+        if blob_reader is None:
+            with BlobReader(self.repo) as blob_reader:
+                return self.pull_files_from_commit(commit, files, path, file_filter, write_files, blob_reader,
+                                                   blob_ids)
+
+        pulled = set()  # type: Set[str]
+
+        # this will pull out every file from a commit by its sha1, in one batch
+        if blob_ids is not None:
+            blobs = blob_reader.read_blobs((filename, blob_ids[filename]) for filename in sorted(files))
+        else:
+            blobs = blob_reader.read(commit.hexsha, sorted(files))
+
+        for filename, blob_id, contents in blobs:
+            if contents is None:
+                continue
+
+            if file_filter is not None and file_filter.is_binary(contents):
+                self.process_handler.skip_file(filename, commit, BINARY)
+                continue
+
+            pulled.add(filename)
+
+            if not write_files:
+                self.process_handler.retrieve_file_from_commit(filename, commit, blob_id=blob_id,
+                                                               contents=contents)
+                continue
+
             file = os.path.join(path, filename)
-            self.process_handler.retrieve_file_from_commit(filename, commit)
+            self.process_handler.retrieve_file_from_commit(filename, commit, blob_id=blob_id)
             dir_path = os.path.dirname(filename)
 
             # if the target directory doesn't exist, make it
@@ -179,10 +338,10 @@ class GitHandler(object):
                 os.makedirs(os.path.join(path, dir_path))
 
             # save the file
-            with open(file, 'w+') as output:
+            with open(file, 'wb') as output:
                 output.write(contents)
 
-        return
+        return pulled
 
     @staticmethod
     def get_files_changed_between_commits(commit_a: Commit, commit_b: Commit)-> (Set[str], Set[str]):
@@ -190,6 +349,9 @@ class GitHandler(object):
         Those files should be added to a_files and if they are present in commit b,
         added to b_files
 
+        Files that were renamed or copied count as present in commit b, and
+        are added to b_files by their name in commit a.
+
         :param commit_a:
         :param commit_b:
         :return: a pair of sets, the first set is the files in commit a
@@ -197,19 +359,61 @@ class GitHandler(object):
         ":rtype (Set[str], Set[str]):
         """
 
-        diffs = commit_b.diff(other=commit_a)
-
-        a_files = set()  # type: Set[str]
-        b_files = set()  # type: Set[str]
+        changed = GitHandler.get_changed_files_between_commits(commit_a, commit_b)
 
-        for diff in diffs:
-            if diff.new_file or (diff.a_blob and diff.b_blob and diff.a_blob != diff.b_blob):
-                a_files.add(diff.a_path)
-                if not diff.new_file:
-                    b_files.add(diff.b_path)
+        a_files = set(changed_file.a_path for changed_file in changed)  # type: Set[str]
+        b_files = set(changed_file.a_path for changed_file in changed
+                      if changed_file.b_path is not None)  # type: Set[str]
 
         return a_files, b_files
 
+    @staticmethod
+    def get_changed_files_between_commits(commit_a: Commit, commit_b: Commit) -> List[ChangedFile]:
+        """Determine what files have been added or modified between commits b and a, with their blob ids.
+
+        This is a single git diff-tree, whose raw output is parsed as it is,
+        so it scales to the largest diffs. Renames and copies are detected, so
+        files that were only renamed or copied are left out, and the others
+        carry the path and blob they came from in commit b.
+
+        :param commit_a:
+        :param commit_b:
+        :return List[ChangedFile]: the added and modified files, ordered by their path in commit a
+        """
+
+        output = commit_a.repo.git.diff_tree('-r', '-z', '--no-abbrev', '-M', '-C', commit_b.hexsha, commit_a.hexsha,
+                                             stdout_as_string=False)
+
+        return sorted(parse_raw_diff(output), key=lambda changed_file: changed_file.a_path)
+
+    @staticmethod
+    def get_hunks_between_commits(commit_a: Commit, commit_b: Commit,
+                                  changed: Optional[List[ChangedFile]] = None) -> Dict[str, List[Hunk]]:
+        """Determine which lines changed between commits b and a, for each file in commit a.
+
+        Files are paired up as by get_changed_files_between_commits, so renamed
+        and copied files have the hunks against the file they came from. The
+        files it leaves out have no hunks, and binary files have empty ones.
+
+        :param commit_a:
+        :param commit_b:
+        :param changed: If given, only these files, and the files they came from, are diffed
+        :return: a dictionary of the hunks in each file, keyed by the filename in commit a
+        :rtype Dict[str, List[Hunk]]:
+        """
+
+        hunks = {}  # type: Dict[str, List[Hunk]]
+
+        for pathspec in split_pathspec(changed):
+            # paths are taken as they are, rather than as globs
+            with commit_a.repo.git.custom_environment(GIT_LITERAL_PATHSPECS='1'):
+                output = commit_a.repo.git.diff('--patch-with-raw', '-z', '-U0', '--no-abbrev', '-M', '-C',
+                                                '--no-color', '--no-ext-diff', commit_b.hexsha, commit_a.hexsha,
+                                                '--', *pathspec, stdout_as_string=False)
+            hunks.update(parse_patch_with_raw(output))
+
+        return hunks
+
     def get_last_merge(self) -> Commit:
         """Gets the last merge in the repo.
 
@@ -219,3 +423,42 @@ class GitHandler(object):
         last_merge = self.repo.git.log('--merges', n=1, format='%H')
 
         return self.repo.commit(last_merge)
+
+
+# the longest list of paths given to a single git diff, in bytes, well below ARG_MAX
+MAX_PATHSPEC_LENGTH = 128 * 1024
+
+
+def split_pathspec(changed: Optional[List[ChangedFile]]) -> Iterator[List[str]]:
+    """Split the paths of changed files into lists short enough for a command line.
+
+    Each file's path in commit a is kept with the path it came from in
+    commit b, so that git still pairs them up. Without any files, a single
+    empty list diffs every file.
+    """
+
+    if changed is None:
+        yield []
+        return
+
+    pathspec = []  # type: List[str]
+    length = 0
+
+    for changed_file in changed:
+        paths = [changed_file.a_path]
+
+        if changed_file.b_path is not None and changed_file.b_path != changed_file.a_path:
+            paths.append(changed_file.b_path)
+
+        paths_length = sum(len(path.encode('utf-8', errors='surrogateescape')) + 1 for path in paths)
+
+        if pathspec and length + paths_length > MAX_PATHSPEC_LENGTH:
+            yield pathspec
+            pathspec = []
+            length = 0
+
+        pathspec.extend(paths)
+        length += paths_length
+
+    if pathspec:
+        yield pathspec
@@ -0,0 +1,92 @@
+"""Hunk type describing a changed range of lines between two commits."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+from typing import Dict, List, NamedTuple
+
+from lintable_git.changed_file import parse_raw_entries
+
+# Line numbers are 1-based, commit a is the commit being checked and commit b
+# is the commit it is compared against, as in GitHandler. A hunk with a length
+# of 0 on one side starts after the given line on that side.
+Hunk = NamedTuple('Hunk', [('a_start', int), ('a_length', int), ('b_start', int), ('b_length', int)])
+
+hunk_header_regex = re.compile(rb'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@', re.MULTILINE)
+
+# starts the patch of each file; lines of the files themselves start with +, - or a space
+patch_header_regex = re.compile(rb'^diff --git ', re.MULTILINE)
+
+
+def parse_hunks(patch: bytes) -> List[Hunk]:
+    """Parse the hunk headers out of a unified diff of commit b to commit a.
+
+    :param patch: The patch text, where '-' lines are from b and '+' lines from a
+    :return List[Hunk]:
+    """
+
+    hunks = []
+
+    for match in hunk_header_regex.finditer(patch):
+        b_start, b_length, a_start, a_length = match.groups()
+        hunks.append(Hunk(a_start=int(a_start),
+                          a_length=int(a_length) if a_length is not None else 1,
+                          b_start=int(b_start),
+                          b_length=int(b_length) if b_length is not None else 1))
+
+    return hunks
+
+
+def parse_patch_with_raw(output: bytes) -> Dict[str, List[Hunk]]:
+    """Parse the hunks of each added or changed file out of git diff --patch-with-raw -z --no-abbrev.
+
+    The raw part of the output says which file, by its name in commit a, each
+    patch is for, so renamed and copied files are found without parsing the
+    patches' headers. Each entry has a patch of its own, except typechanges,
+    like a file replaced by a symlink, which have two: the old file's
+    deletion and then the new one's creation.
+
+    :param output: The output of git diff from commit b to commit a
+    :return Dict[str, List[Hunk]]: The hunks of each file, keyed by the filename in commit a
+    """
+
+    entries, index = parse_raw_entries(output)
+
+    # the patches come after an empty field, one for each entry in the same order
+    patches = patch_header_regex.split(output[index + 1:])[1:]
+    hunks = {}  # type: Dict[str, List[Hunk]]
+
+    patch_index = 0
+
+    for letter, changed_file in entries:
+        patch_index += 2 if letter == 'T' else 1
+
+        if changed_file is not None and patch_index <= len(patches):
+            # the hunks of commit a's version, which is a typechange's second patch
+            hunks[changed_file.a_path] = parse_hunks(patches[patch_index - 1])
+
+    return hunks
+
+
+def a_ranges(hunks: List[Hunk]) -> List[range]:
+    """The ranges of line numbers in commit a touched by the hunks."""
+
+    return [range(hunk.a_start, hunk.a_start + hunk.a_length) for hunk in hunks if hunk.a_length]
+
+
+def b_ranges(hunks: List[Hunk]) -> List[range]:
+    """The ranges of line numbers in commit b touched by the hunks."""
+
+    return [range(hunk.b_start, hunk.b_start + hunk.b_length) for hunk in hunks if hunk.b_length]
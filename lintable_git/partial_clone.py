@@ -0,0 +1,130 @@
+"""Clones of just the commits being compared, without their history or unneeded files."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import shutil
+import subprocess
+from typing import Iterable, List, Optional
+
+from git import Repo
+from git.exc import GitCommandError
+
+from lintable_git.repo_cache import describe_error, strip_credentials
+from lintable_settings.settings import LINTBALL_SETTINGS
+
+
+class PartialClone(object):
+    """Clones a repo blobless and shallow, fetching just the commits it's given.
+
+    Only the commits and their trees are fetched at first; the blobs of the
+    files that are needed are fetched afterwards, all at once, by fetch_blobs.
+    Anything else that turns out to be needed is fetched lazily by git, from
+    the clone's origin. Servers that can't fetch commits by their sha1 or to
+    a depth get a full clone instead.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, depth: int = 1):
+        """
+        :param depth: How many commits of history to fetch from each commit, 0 for all of it
+        :return:
+        """
+
+        self.depth = depth  # type: int
+
+    def clone(self, url: str, sha1s: List[str], to_path: str) -> Repo:
+        """Clone the given commits of a repo.
+
+        :param url: The URL of the repo
+        :param sha1s: The commits to fetch
+        :param to_path: Where to clone the repo to
+        :return Repo: The clone, which is bare
+        """
+
+        try:
+            return self.fetch_commits(url, sha1s, to_path)
+        except GitCommandError as e:
+            # the error's command line and output have the URL, and its credentials, in them
+            self.logger.error('Falling back to a full clone of {url}: {error}'.format(url=strip_credentials(url),
+                                                                                      error=describe_error(e)))
+            shutil.rmtree(to_path, ignore_errors=True)
+
+        return Repo.clone_from(url=url, to_path=to_path, bare=True)
+
+    def fetch_commits(self, url: str, sha1s: List[str], to_path: str) -> Repo:
+        """Fetch the given commits, without their blobs, into a new partial clone."""
+
+        repo = Repo.init(path=to_path, bare=True)
+
+        # the same configuration git clone --filter leaves, so that git
+        # fetches missing blobs from origin by itself
+        config = repo.config_writer()
+
+        try:
+            config.set_value('core', 'repositoryformatversion', '1')
+            config.set_value('extensions', 'partialClone', 'origin')
+            config.set_value('remote "origin"', 'url', url)
+            config.set_value('remote "origin"', 'promisor', 'true')
+            config.set_value('remote "origin"', 'partialclonefilter', 'blob:none')
+        finally:
+            config.release()
+
+        depth = ['--depth={depth}'.format(depth=self.depth)] if self.depth > 0 else []
+        repo.git.fetch('--no-tags', '--filter=blob:none', *(depth + ['origin'] + list(sha1s)))
+
+        return repo
+
+
+def is_partial(repo: Repo) -> bool:
+    """Whether a repo is a partial clone, which may be missing blobs."""
+
+    status, _, _ = repo.git.config('--get', 'extensions.partialClone',
+                                   with_extended_output=True, with_exceptions=False)
+
+    return status == 0
+
+
+def fetch_blobs(repo: Repo, blob_ids: Iterable[str]):
+    """Fetch the given blobs into a partial clone with one request, rather than a request each.
+
+    :param repo: The repo to fetch into
+    :param blob_ids: The sha1s of the blobs to fetch
+    :return:
+    """
+
+    blob_ids = sorted(set(blob_ids))
+
+    if not blob_ids:
+        return
+
+    # the fetch git makes for each missing blob by itself, for all of them at once
+    subprocess.run(['git', '-C', repo.git_dir, '-c', 'fetch.negotiationAlgorithm=noop',
+                    'fetch', '--no-tags', '--no-write-fetch-head', '--recurse-submodules=no',
+                    '--filter=blob:none', '--stdin', 'origin'],
+                   input='\n'.join(blob_ids).encode('ascii') + b'\n',
+                   check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+
+def default_partial_clone() -> Optional[PartialClone]:
+    """The PartialClone configured in LINTBALL_SETTINGS, or None if remote repos are cloned in full."""
+
+    settings = LINTBALL_SETTINGS['clone']
+
+    if settings['strategy'] != 'partial':
+        return None
+
+    return PartialClone(depth=settings['depth'])
@@ -0,0 +1,357 @@
+"""A worker-wide cache of bare mirrors of the repos being linted."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import fcntl
+import hashlib
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import IO, List, Optional, Tuple
+from urllib.parse import urlparse, urlunparse
+
+from git import Repo
+from git.exc import GitCommandError, InvalidGitRepositoryError, NoSuchPathError
+
+from lintable_metrics.metrics import REPO_CACHE_UPDATES
+from lintable_settings.settings import LINTBALL_SETTINGS
+
+# errors that mean a mirror may be broken, rather than its commits being missing
+MIRROR_ERRORS = (GitCommandError, InvalidGitRepositoryError, NoSuchPathError)
+
+
+class RepoCache(object):
+    """A directory of bare mirrors, one per repo, shared by every process of a worker.
+
+    Each job clones from the mirror of its repo instead of from the remote.
+    The mirror is only fetched from when it is missing one of the job's
+    commits, and then only those commits are fetched. The clone itself is a
+    local one, hard linking the mirror's objects, so that it's unaffected by
+    later fetches or the mirror being evicted.
+
+    Each mirror has a lock file beside it, locked while it's updated or cloned
+    from, so that the jobs on a repo queue up behind the one fetching it. The
+    mirrors that were used the longest ago are removed, along with their lock
+    files, once they take up more than max_bytes, and a mirror that turns out
+    to be broken is cloned again.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, path: str, max_bytes: int):
+        """
+        :param path: The directory to keep the mirrors in; it should be on the
+                     same filesystem as the jobs' clones for them to be linked
+        :param max_bytes: How much space the mirrors may take up, 0 means no limit
+        :return:
+        """
+
+        self.path = path  # type: str
+        self.max_bytes = max_bytes  # type: int
+        os.makedirs(path, exist_ok=True)
+
+    def mirror_path(self, key: str) -> str:
+        """The directory of the mirror of a repo."""
+
+        return os.path.join(self.path, key + '.git')
+
+    def lock_path(self, key: str) -> str:
+        """The lock file of the mirror of a repo."""
+
+        return os.path.join(self.path, key + '.lock')
+
+    @contextmanager
+    def lock(self, key: str, blocking: bool = True):
+        """Hold the lock on the mirror of a repo for the duration of a with block.
+
+        Without blocking, the block is given False instead of waiting for the
+        lock if someone else holds it.
+        """
+
+        lock_file = self.acquire(key, blocking)
+
+        if lock_file is None:
+            yield False
+            return
+
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+    def acquire(self, key: str, blocking: bool = True) -> Optional[IO]:
+        """Open and lock the lock file of the mirror of a repo.
+
+        Evicting a mirror removes its lock file while holding the lock, so a
+        lock file that's no longer at the lock path once it's locked is given
+        up, and the one there now is locked instead.
+
+        :param key: Identifies the repo within the cache
+        :param blocking: Whether to wait for the lock if someone else holds it
+        :return Optional[IO]: The locked lock file, or None if someone else holds it and blocking is False
+        """
+
+        path = self.lock_path(key)
+
+        while True:
+            lock_file = open(path, 'a')
+
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock_file.close()
+                return None
+
+            if is_open_at(lock_file, path):
+                return lock_file
+
+            lock_file.close()
+
+    def clone(self, url: str, key: str, sha1s: List[str], to_path: str) -> Repo:
+        """Clone a repo from its mirror, making sure the mirror has the given commits first.
+
+        :param url: The URL of the repo, which may include credentials; they aren't stored
+        :param key: Identifies the repo within the cache, see cache_key
+        :param sha1s: The commits the clone needs
+        :param to_path: Where to clone the repo to
+        :return Repo: The clone, which is bare
+        """
+
+        with self.lock(key):
+            mirror = self.mirror_path(key)
+
+            try:
+                repo = self.update(url, mirror, sha1s)
+                clone = Repo.clone_from(url=repo.git_dir, to_path=to_path, bare=True, local=True)
+            except MIRROR_ERRORS as e:
+                if os.path.isdir(mirror) and self.healthy(mirror):
+                    raise
+
+                # the error's command line and output have the URL, and its credentials, in them
+                self.logger.error('Recloning broken mirror {key}: {error}'.format(key=key, error=describe_error(e)))
+                REPO_CACHE_UPDATES.labels(outcome='recover').inc()
+                shutil.rmtree(mirror, ignore_errors=True)
+                shutil.rmtree(to_path, ignore_errors=True)
+
+                repo = self.update(url, mirror, sha1s)
+                clone = Repo.clone_from(url=repo.git_dir, to_path=to_path, bare=True, local=True)
+
+            # the mirror's modification time orders the mirrors for eviction
+            os.utime(mirror)
+
+        self.evict(keep=key)
+
+        return clone
+
+    def update(self, url: str, mirror: str, sha1s: List[str]) -> Repo:
+        """Create the mirror of a repo if it's missing, or fetch the given commits if it doesn't have them."""
+
+        if not os.path.isdir(mirror):
+            REPO_CACHE_UPDATES.labels(outcome='clone').inc()
+            return self.create_mirror(url, mirror)
+
+        repo = Repo(mirror)
+        missing = [sha1 for sha1 in sha1s if not has_commit(repo, sha1)]
+
+        if not missing:
+            REPO_CACHE_UPDATES.labels(outcome='hit').inc()
+            return repo
+
+        REPO_CACHE_UPDATES.labels(outcome='fetch').inc()
+
+        try:
+            # just the commits that are needed, and what they're built on
+            repo.git.fetch('--no-tags', url, *missing)
+        except GitCommandError:
+            # not every server lets commits be fetched by their sha1
+            repo.git.fetch('--prune', url, '+refs/*:refs/*')
+
+        return repo
+
+    def create_mirror(self, url: str, mirror: str) -> Repo:
+        """Clone a new mirror of a repo.
+
+        The mirror is cloned beside where it goes and then moved into place,
+        so that a clone that's cut short is never mistaken for a mirror.
+        """
+
+        tmp_path = tempfile.mkdtemp(dir=self.path, prefix='.clone-')
+
+        try:
+            Repo.clone_from(url=url, to_path=tmp_path, mirror=True)
+            # the credentials in the URL are given to each fetch, rather than left on disk
+            Repo(tmp_path).git.remote('set-url', 'origin', strip_credentials(url))
+            os.rename(tmp_path, mirror)
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+        return Repo(mirror)
+
+    @staticmethod
+    def healthy(mirror: str) -> bool:
+        """Check a mirror's objects are intact, after a command on it has failed.
+
+        This reads every commit and tree in the mirror, so it's kept for when
+        something has already gone wrong.
+        """
+
+        try:
+            Repo(mirror).git.fsck('--connectivity-only', '--no-dangling')
+        except MIRROR_ERRORS:
+            return False
+
+        return True
+
+    def mirrors(self) -> List[Tuple[float, int, str]]:
+        """When each mirror was last used, how many bytes it takes up, and its key."""
+
+        mirrors = []
+
+        for name in os.listdir(self.path):
+            if not name.endswith('.git'):
+                continue
+
+            path = os.path.join(self.path, name)
+
+            try:
+                mirrors.append((os.stat(path).st_mtime, directory_size(path), name[:-len('.git')]))
+            except FileNotFoundError:
+                continue
+
+        return mirrors
+
+    def evict(self, keep: Optional[str] = None):
+        """Remove the mirrors that were used the longest ago until they fit within max_bytes.
+
+        Mirrors being used by another job are skipped.
+
+        :param keep: A mirror to never remove, like the one that was just used
+        """
+
+        if self.max_bytes <= 0:
+            return
+
+        mirrors = sorted(self.mirrors())
+        total = sum(size for _, size, _ in mirrors)
+
+        for _, size, key in mirrors:
+            if total <= self.max_bytes:
+                break
+
+            if key == keep:
+                continue
+
+            with self.lock(key, blocking=False) as locked:
+                if not locked:
+                    continue
+
+                self.logger.info('Evicting mirror {key} of {size} bytes'.format(key=key, size=size))
+                REPO_CACHE_UPDATES.labels(outcome='evict').inc()
+                shutil.rmtree(self.mirror_path(key), ignore_errors=True)
+                os.remove(self.lock_path(key))
+                total -= size
+
+
+def is_open_at(file: IO, path: str) -> bool:
+    """Whether an open file is still the one at a path, rather than removed or replaced."""
+
+    try:
+        at_path = os.stat(path)
+    except FileNotFoundError:
+        return False
+
+    opened = os.fstat(file.fileno())
+
+    return (opened.st_dev, opened.st_ino) == (at_path.st_dev, at_path.st_ino)
+
+
+def describe_error(error: Exception) -> str:
+    """The type of an error, and a git command's exit status, without the command line or output."""
+
+    if isinstance(error, GitCommandError):
+        return '{name} with exit status {status}'.format(name=type(error).__name__, status=error.status)
+
+    return type(error).__name__
+
+
+def has_commit(repo: Repo, sha1: str) -> bool:
+    """Whether a repo has a commit, without raising if it doesn't."""
+
+    status, _, _ = repo.git.cat_file('-e', sha1 + '^{commit}', with_extended_output=True, with_exceptions=False)
+
+    return status == 0
+
+
+def directory_size(path: str) -> int:
+    """The bytes taken up by the files in a directory and its subdirectories."""
+
+    size = 0
+
+    for dir_path, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                size += os.lstat(os.path.join(dir_path, filename)).st_size
+            except FileNotFoundError:
+                continue
+
+    return size
+
+
+def strip_credentials(url: str) -> str:
+    """A URL without any username or password in it."""
+
+    parsed = urlparse(url)
+
+    if '@' not in parsed.netloc:
+        return url
+
+    return urlunparse(parsed._replace(netloc=parsed.netloc.rsplit('@', 1)[1]))
+
+
+def cache_key(url: str, repo_id: Optional[str] = None) -> str:
+    """Identifies a repo within the cache, by its id if it has one or else by its URL.
+
+    URLs are hashed without their credentials, so that the same repo is found
+    whichever user's token it's cloned with.
+    """
+
+    if repo_id is not None:
+        return re.sub(r'[^\w.-]', '_', str(repo_id))
+
+    return hashlib.sha1(strip_credentials(url).encode('utf-8')).hexdigest()
+
+
+DEFAULT_REPO_CACHE = None  # type: Optional[RepoCache]
+
+
+def default_repo_cache() -> Optional[RepoCache]:
+    """The worker-wide repo cache configured in LINTBALL_SETTINGS, or None if it's disabled."""
+
+    global DEFAULT_REPO_CACHE
+
+    settings = LINTBALL_SETTINGS['repo_cache']
+
+    if not settings['enabled']:
+        return None
+
+    if DEFAULT_REPO_CACHE is None:
+        DEFAULT_REPO_CACHE = RepoCache(path=settings['path'], max_bytes=settings['max_bytes'])
+
+    return DEFAULT_REPO_CACHE
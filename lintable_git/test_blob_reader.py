@@ -0,0 +1,102 @@
+"""Tests for BlobReader."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from git import Repo
+
+from lintable_git.blob_reader import BlobReader
+
+
+class BlobReaderTests(unittest.TestCase):
+    """Tests for BlobReader."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.repo = Repo.init(path=self.tmp_dir)
+
+        config = self.repo.config_writer()
+
+        try:
+            config.set_value('user', 'name', 'Lintable')
+            config.set_value('user', 'email', 'lintable@example.com')
+        finally:
+            config.release()
+
+        self.files = {'text.txt': b'line \r\nline\n',
+                      'binary.bin': bytes(range(256)) * 64,
+                      'empty.txt': b'',
+                      'with space.txt': b'space\n',
+                      'with\nnewline.txt': b'newline\n',
+                      'sub/dir/deep.py': b'print()\n'}
+
+        for filename, contents in self.files.items():
+            os.makedirs(os.path.dirname(os.path.join(self.tmp_dir, filename)), exist_ok=True)
+
+            with open(os.path.join(self.tmp_dir, filename), 'wb') as file:
+                file.write(contents)
+
+        self.repo.index.add(list(self.files))
+        self.commit = self.repo.index.commit('commit of every file')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_reads_exact_bytes(self):
+        """Make sure every file is read byte for byte, in order, with its blob id, through one process."""
+
+        filenames = sorted(self.files) * 2
+
+        with BlobReader(self.repo) as reader:
+            results = list(reader.read(self.commit.hexsha, filenames))
+            process = reader.process
+
+            self.assertEqual(list(reader.read(self.commit.hexsha, ['text.txt']))[0][2], self.files['text.txt'])
+            self.assertIs(reader.process, process)
+
+        self.assertIsNone(reader.process)
+        self.assertEqual([filename for filename, _, _ in results], filenames)
+
+        for filename, blob_id, contents in results:
+            self.assertEqual(contents, self.files[filename])
+            self.assertEqual(blob_id, self.commit.tree[filename].hexsha)
+
+    def test_missing_files(self):
+        """Make sure files that aren't in the commit are given as None, without upsetting the rest."""
+
+        with BlobReader(self.repo) as reader:
+            results = list(reader.read(self.commit.hexsha, ['text.txt', 'no such file', 'sub', 'empty.txt']))
+
+        self.assertEqual(results, [('text.txt', self.commit.tree['text.txt'].hexsha, self.files['text.txt']),
+                                   ('no such file', None, None),
+                                   ('sub', None, None),
+                                   ('empty.txt', self.commit.tree['empty.txt'].hexsha, b'')])
+
+    def test_stopping_early(self):
+        """Make sure a reader that's stopped part way through can still be read from."""
+
+        with BlobReader(self.repo) as reader:
+            for _ in reader.read(self.commit.hexsha, sorted(self.files)):
+                break
+
+            self.assertEqual([contents for _, _, contents in reader.read(self.commit.hexsha, ['binary.bin'])],
+                             [self.files['binary.bin']])
+
+if __name__ == '__main__':
+    unittest.main()
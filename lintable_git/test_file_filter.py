@@ -0,0 +1,89 @@
+"""Tests for FileFilter."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+import unittest
+from uuid import uuid4
+
+from git import Repo
+
+from lintable_git.file_filter import BINARY, GENERATED, TOO_LARGE, VENDORED, FileFilter
+from lintable_git.git_handler import GitHandler
+from lintable_processes.process_handler import ProcessHandler
+
+
+class FileFilterTests(unittest.TestCase):
+    """Tests for FileFilter."""
+
+    def setUp(self):
+        self.tmp_repo = tempfile.mkdtemp()
+        self.repo = Repo.init(path=self.tmp_repo)
+
+        self.write('base.txt', b'base\n')
+        self.commit_b = self.commit('commit b')
+
+        self.write('.gitattributes', b'*.dat -diff\nbuild/* linguist-generated\nvendor/* linguist-vendored=false\n')
+        self.write('app.txt', b'text\n')
+        self.write('image.png', b'\x89PNG\r\n\x1a\n\0\0\0')
+        self.write('data.dat', b'plain text, but marked binary\n')
+        self.write('build/out.txt', b'generated\n')
+        self.write('node_modules/lib/index.js', b'vendored\n')
+        self.write('vendor/ours.txt', b'not vendored after all\n')
+        self.write('big.txt', b'x' * 100 + b'\n')
+        self.commit_a = self.commit('commit a')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_repo)
+
+    def write(self, filename: str, contents: bytes):
+        path = os.path.join(self.tmp_repo, filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, 'wb') as file:
+            file.write(contents)
+
+        self.repo.index.add([filename])
+
+    def commit(self, msg: str):
+        return self.repo.index.commit(message=msg)
+
+    def test_classify(self):
+        """Make sure files are skipped by their attributes, paths and sizes, without reading them."""
+
+        file_filter = FileFilter(self.repo, self.commit_a, max_size=64, sniff_size=8000)
+        skipped = file_filter.classify(['app.txt', 'image.png', 'data.dat', 'build/out.txt',
+                                        'node_modules/lib/index.js', 'vendor/ours.txt', 'big.txt'])
+
+        self.assertDictEqual(skipped, {'data.dat': BINARY,
+                                       'build/out.txt': GENERATED,
+                                       'node_modules/lib/index.js': VENDORED,
+                                       'big.txt': TOO_LARGE})
+
+    def test_retrieve_skips_filtered_files(self):
+        """Make sure skipped files, including sniffed binaries, are never written or linted."""
+
+        process_handler = ProcessHandler(repo=self.tmp_repo, uuid=uuid4(), handlers=[])
+        git_handler = GitHandler(process_handler, self.tmp_repo, self.commit_a.hexsha, self.commit_b.hexsha)
+        git_handler.clone_repo()
+        git_handler.retrieve_changed_files_from_commit()
+
+        self.assertSetEqual(set(process_handler.files), {'.gitattributes', 'app.txt', 'big.txt', 'vendor/ours.txt'})
+        self.assertFalse(os.path.exists(os.path.join(git_handler.a_path, 'image.png')))
+
+if __name__ == '__main__':
+    unittest.main()
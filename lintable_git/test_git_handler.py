@@ -24,7 +24,9 @@ from uuid import uuid4
 from git import Commit, Repo
 import rstr
 
+from lintable_git.changed_file import ChangedFile, parse_raw_diff
 from lintable_git.git_handler import GitHandler
+from lintable_git.hunk import Hunk, parse_hunks
 from lintable_processes.process_handler import ProcessHandler
 
 logging.basicConfig(filename='./git_handler_tests.log', level=logging.DEBUG)
@@ -137,5 +139,124 @@ class GitHandlerTests(unittest.TestCase):
         # b_files should contain the files add/modified since commit b and were present in commit b
         self.assertTrue(b_files == {'a_file.txt'})
 
+    def test_get_hunks_between_commits(self):
+        """Make sure that the function gets the changed line ranges of each file in commit a"""
+        hunks = self.git_handler.get_hunks_between_commits(self.commit_a, self.commit_b)
+
+        # only the files added/modified since commit b should have hunks
+        self.assertSetEqual(set(hunks.keys()), {'a_file.txt', 'c_file.txt'})
+        # c_file.txt was added, so its single hunk covers every line in commit a and none in commit b
+        self.assertListEqual(hunks['c_file.txt'], [Hunk(a_start=1, a_length=9, b_start=0, b_length=0)])
+
+    def test_retrieve_files_in_memory(self):
+        """Make sure that files can be handed to the process handler instead of written to disk"""
+        self.git_handler.clone_repo()
+        self.git_handler.retrieve_changed_files_from_commit(write_files=False)
+
+        process_handler = self.git_handler.process_handler
+
+        self.assertListEqual(os.listdir(self.git_handler.a_path), [])
+        self.assertListEqual(os.listdir(self.git_handler.b_path), [])
+        self.assertEqual(process_handler.file_contents(self.git_handler.commit_a, 'c_file.txt'),
+                         self.commit_a.tree['c_file.txt'].data_stream.read())
+        self.assertEqual(process_handler.file_contents(self.git_handler.commit_b, 'a_file.txt'),
+                         self.commit_b.tree['a_file.txt'].data_stream.read())
+        self.assertIsNone(process_handler.file_contents(self.git_handler.commit_b, 'c_file.txt'))
+
+    def test_parse_hunks(self):
+        """Make sure that hunk headers are parsed, including those with implicit lengths"""
+        patch = b'@@ -2 +2 @@ a\n-b\n+B\n@@ -4,0 +5,2 @@ d\n+e\n+f\n'
+
+        self.assertListEqual(parse_hunks(patch), [Hunk(a_start=2, a_length=1, b_start=2, b_length=1),
+                                                  Hunk(a_start=5, a_length=2, b_start=4, b_length=0)])
+
+    def test_renamed_files(self):
+        """Make sure renamed files are only retrieved if they changed, and are compared with where they came from"""
+        a_contents = self.commit_a.tree['a_file.txt'].data_stream.read()
+
+        self.repo.index.move(['b_file.txt', 'b_renamed.txt'])
+        self.repo.index.move(['a_file.txt', 'a_renamed.txt'])
+
+        with open(os.path.join(self.tmp_repo, 'a_renamed.txt'), 'ab') as a_renamed:
+            a_renamed.write(b'one more line\n')
+
+        commit = self.commit_files(os.path.join(self.tmp_repo, 'a_renamed.txt'), msg='commit of renames')
+
+        a_files, b_files = self.git_handler.get_files_changed_between_commits(commit, self.commit_a)
+        self.assertSetEqual(a_files, {'a_renamed.txt'})
+        self.assertSetEqual(b_files, {'a_renamed.txt'})
+
+        changed_file, = self.git_handler.get_changed_files_between_commits(commit, self.commit_a)
+        self.assertEqual((changed_file.status, changed_file.b_path), ('R', 'a_file.txt'))
+
+        git_handler = GitHandler(ProcessHandler(repo=self.tmp_repo, uuid=uuid4(), handlers=[]),
+                                 self.tmp_repo, commit.hexsha, self.commit_a.hexsha)
+        git_handler.clone_repo()
+        git_handler.retrieve_changed_files_from_commit(write_files=False)
+
+        process_handler = git_handler.process_handler
+        self.assertEqual(process_handler.file_contents(git_handler.commit_b, 'a_renamed.txt'), a_contents)
+        self.assertEqual(process_handler.file_contents(git_handler.commit_a, 'a_renamed.txt'),
+                         a_contents + b'one more line\n')
+
+        # renamed files are diffed against the file they came from, even when only they are asked for
+        git_handler.retrieve_changed_hunks_from_commit(only={'a_renamed.txt'})
+        self.assertDictEqual(process_handler.hunks,
+                             {'a_renamed.txt': [Hunk(a_start=10, a_length=1, b_start=9, b_length=0)]})
+
+    def test_typechanged_files(self):
+        """Make sure the two patches of a typechange don't shift the hunks of the files after it"""
+        link = os.path.join(self.tmp_repo, 'link')
+        z_file = os.path.join(self.tmp_repo, 'z.txt')
+
+        with open(link, 'w') as output:
+            output.write('a file for now\n')
+
+        with open(z_file, 'w') as output:
+            output.write('one\ntwo\n')
+
+        before = self.commit_files(link, z_file, msg='commit of a file and z.txt')
+
+        os.remove(link)
+        os.symlink('a_file.txt', link)
+
+        with open(z_file, 'w') as output:
+            output.write('ONE\ntwo\n')
+
+        after = self.commit_files(link, z_file, msg='commit of a symlink and z.txt')
+
+        hunks = self.git_handler.get_hunks_between_commits(after, before)
+        self.assertListEqual(hunks['z.txt'], [Hunk(a_start=1, a_length=1, b_start=1, b_length=1)])
+        self.assertNotIn('link', hunks)
+        self.assertNotIn('link', [changed.a_path for changed in
+                                  self.git_handler.get_changed_files_between_commits(after, before)])
+
+    def test_parse_raw_diff(self):
+        """Make sure only the files whose contents were added or changed are parsed out of a raw diff"""
+        blob_1, blob_2, blob_3, zero = '1' * 40, '2' * 40, '3' * 40, '0' * 40
+        output = '\0'.join([':000000 100644 {zero} {blob_1} A'.format(zero=zero, blob_1=blob_1), 'added file.txt',
+                            ':100644 100644 {blob_1} {blob_2} M'.format(blob_1=blob_1, blob_2=blob_2), 'modified.py',
+                            ':100644 100755 {blob_1} {blob_1} M'.format(blob_1=blob_1), 'mode_only.sh',
+                            ':100644 100644 {blob_1} {blob_1} R100'.format(blob_1=blob_1), 'old.txt', 'moved.txt',
+                            ':100644 100644 {blob_1} {blob_3} R087'.format(blob_1=blob_1, blob_3=blob_3),
+                            'was.txt', 'is.txt',
+                            ':100644 100644 {blob_2} {blob_3} C075'.format(blob_2=blob_2, blob_3=blob_3),
+                            'source.txt', 'copy.txt',
+                            ':100644 000000 {blob_1} {zero} D'.format(blob_1=blob_1, zero=zero), 'deleted.txt',
+                            ':160000 160000 {blob_1} {blob_2} M'.format(blob_1=blob_1, blob_2=blob_2), 'submodule',
+                            ':120000 120000 {blob_1} {blob_2} M'.format(blob_1=blob_1, blob_2=blob_2), 'symlink',
+                            ':100644 120000 {blob_2} {blob_3} T'.format(blob_2=blob_2, blob_3=blob_3), 'now_a_link',
+                            '']).encode('utf-8')
+
+        self.assertListEqual(parse_raw_diff(output), [
+            ChangedFile(status='A', a_path='added file.txt', a_blob_id=blob_1, b_path=None, b_blob_id=None,
+                        score=None),
+            ChangedFile(status='M', a_path='modified.py', a_blob_id=blob_2, b_path='modified.py', b_blob_id=blob_1,
+                        score=None),
+            ChangedFile(status='R', a_path='is.txt', a_blob_id=blob_3, b_path='was.txt', b_blob_id=blob_1, score=87),
+            ChangedFile(status='C', a_path='copy.txt', a_blob_id=blob_3, b_path='source.txt', b_blob_id=blob_2,
+                        score=75)])
+        self.assertListEqual(parse_raw_diff(b''), [])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,150 @@
+"""Tests for PartialClone."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from uuid import uuid4
+
+from git import Repo
+
+from lintable_git.git_handler import GitHandler
+from lintable_git.partial_clone import PartialClone, is_partial
+from lintable_processes.process_handler import ProcessHandler
+from lintable_settings.settings import LINTBALL_SETTINGS
+
+
+class PartialCloneTests(unittest.TestCase):
+    """Tests for PartialClone, against a local bare repo standing in for GitHub."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        work_path = os.path.join(self.tmp_dir, 'work')
+        self.work = Repo.init(path=work_path)
+
+        config = self.work.config_writer()
+
+        try:
+            config.set_value('user', 'name', 'Lintable')
+            config.set_value('user', 'email', 'lintable@example.com')
+        finally:
+            config.release()
+
+        self.commit_files({'.gitattributes': 'gen.txt linguist-generated\n', 'unchanged.txt': 'same\n',
+                           'changed.txt': 'before\n'})
+        self.commit_b = self.commit_files({'gen.txt': 'generated\n'})
+        self.commit_a = self.commit_files({'changed.txt': 'after \n', 'gen.txt': 'regenerated\n',
+                                           'added.txt': 'new\n'})
+
+        self.server_path = os.path.join(self.tmp_dir, 'server.git')
+        server = Repo.clone_from(url=work_path, to_path=self.server_path, bare=True)
+
+        config = server.config_writer()
+
+        try:
+            config.set_value('uploadpack', 'allowFilter', 'true')
+        finally:
+            config.release()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def commit_files(self, files: dict):
+        """Write files to the work repo and commit them."""
+
+        for filename, contents in files.items():
+            with open(os.path.join(self.work.working_dir, filename), 'w') as file:
+                file.write(contents)
+
+        self.work.index.add(list(files))
+        return self.work.index.commit('commit of {files}'.format(files=sorted(files)))
+
+    def git_handler(self) -> GitHandler:
+        """A GitHandler that clones the two commits from the server."""
+
+        git_handler = GitHandler(ProcessHandler(repo=self.server_path, uuid=uuid4(), handlers=[]),
+                                 self.server_path, self.commit_a.hexsha, self.commit_b.hexsha,
+                                 partial_clone=PartialClone(depth=1))
+        git_handler.clone_repo()
+
+        return git_handler
+
+    @staticmethod
+    def object_types(repo: Repo) -> set:
+        """The types of the objects a repo has, without fetching any it's missing."""
+
+        output = repo.git.cat_file('--batch-all-objects', '--batch-check=%(objecttype)')
+
+        return set(output.split())
+
+    def test_fetches_only_needed_blobs(self):
+        """Make sure only the two commits are fetched, and then just the blobs of the changed files."""
+
+        git_handler = self.git_handler()
+        repo = git_handler.repo
+
+        self.assertTrue(is_partial(repo))
+        self.assertTrue(os.path.exists(os.path.join(repo.git_dir, 'shallow')))
+        self.assertNotIn('blob', self.object_types(repo))
+
+        git_handler.retrieve_changed_files_from_commit(write_files=False)
+        process_handler = git_handler.process_handler
+
+        self.assertSetEqual(git_handler.files, {'added.txt', 'changed.txt'})
+        self.assertEqual(process_handler.file_contents(git_handler.commit_a, 'changed.txt'), b'after \n')
+        self.assertEqual(process_handler.file_contents(git_handler.commit_b, 'changed.txt'), b'before\n')
+
+        blobs = repo.git.cat_file('--batch-all-objects', '--batch-check=%(objectname)').split()
+        self.assertNotIn(self.commit_a.tree['unchanged.txt'].hexsha, blobs)
+        self.assertIn(self.commit_a.tree['.gitattributes'].hexsha, blobs)
+
+        # skipped files are classified before their blobs are fetched
+        self.assertNotIn(self.commit_a.tree['gen.txt'].hexsha, blobs)
+
+    def test_skips_large_files_once_fetched(self):
+        """Make sure the sizes of a partial clone's files are still checked, once their blobs are fetched."""
+
+        git_handler = self.git_handler()
+
+        with mock.patch.dict(LINTBALL_SETTINGS['filter'], max_size=5):
+            git_handler.retrieve_changed_files_from_commit(write_files=False)
+
+        self.assertSetEqual(git_handler.files, {'added.txt'})
+
+    def test_falls_back_to_full_clone(self):
+        """Make sure servers that won't send commits by their sha1 get a full clone."""
+
+        environ = dict(os.environ)
+        # the original protocol only allows fetching what the server advertises
+        os.environ.update(GIT_CONFIG_COUNT='1', GIT_CONFIG_KEY_0='protocol.version', GIT_CONFIG_VALUE_0='0')
+
+        try:
+            with self.assertLogs('lintable_git.partial_clone', level='ERROR'):
+                git_handler = self.git_handler()
+        finally:
+            os.environ.clear()
+            os.environ.update(environ)
+
+        self.assertFalse(is_partial(git_handler.repo))
+        self.assertIn('blob', self.object_types(git_handler.repo))
+
+        git_handler.retrieve_changed_files_from_commit(write_files=False)
+        self.assertSetEqual(git_handler.files, {'added.txt', 'changed.txt'})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,204 @@
+"""Tests for RepoCache."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import fcntl
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from uuid import uuid4
+
+from git import Repo
+from git.exc import GitCommandError
+
+from lintable_git.git_handler import GitHandler
+from lintable_git.repo_cache import RepoCache, cache_key, describe_error, is_open_at, strip_credentials
+from lintable_metrics.metrics import REPO_CACHE_UPDATES
+from lintable_processes.process_handler import ProcessHandler
+
+
+class RepoCacheTests(unittest.TestCase):
+    """Tests for RepoCache."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.repo_path = os.path.join(self.tmp_dir, 'repo')
+        self.repo = Repo.init(path=self.repo_path)
+        self.cache = RepoCache(path=os.path.join(self.tmp_dir, 'cache'), max_bytes=0)
+
+        config = self.repo.config_writer()
+
+        try:
+            config.set_value('user', 'name', 'Lintable')
+            config.set_value('user', 'email', 'lintable@example.com')
+        finally:
+            config.release()
+
+        self.commit_b = self.commit_file('a_file.txt', 'first\n')
+        self.commit_a = self.commit_file('a_file.txt', 'second \n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def commit_file(self, filename: str, contents: str):
+        """Write a file to the test repo and commit it."""
+
+        with open(os.path.join(self.repo_path, filename), 'w') as file:
+            file.write(contents)
+
+        self.repo.index.add([filename])
+        return self.repo.index.commit('commit of {filename}'.format(filename=filename))
+
+    def clone(self, key: str = 'repo', *commits):
+        """Clone the test repo through the cache, needing the given commits."""
+
+        to_path = tempfile.mkdtemp(dir=self.tmp_dir)
+        os.rmdir(to_path)
+
+        return self.cache.clone(self.repo_path, key, [commit.hexsha for commit in commits], to_path)
+
+    def outcomes(self) -> dict:
+        """How many of each outcome the cache has counted."""
+
+        return dict((sample.labels['outcome'], sample.value) for metric in REPO_CACHE_UPDATES.collect()
+                    for sample in metric.samples if sample.name.endswith('_total'))
+
+    def assertOutcome(self, outcome: str, clone):
+        """Make sure cloning counts as the given outcome."""
+
+        before = self.outcomes()
+        clone()
+        after = self.outcomes()
+
+        self.assertEqual(after.get(outcome, 0) - before.get(outcome, 0), 1)
+
+    def test_fetches_only_missing_commits(self):
+        """Make sure the remote is only cloned once, and then only fetched from for new commits."""
+
+        self.assertOutcome('clone', lambda: self.clone('repo', self.commit_a, self.commit_b))
+        self.assertOutcome('hit', lambda: self.clone('repo', self.commit_a, self.commit_b))
+
+        commit_c = self.commit_file('b_file.txt', 'third\n')
+        self.assertOutcome('fetch', lambda: self.clone('repo', commit_c, self.commit_a))
+
+        clone = self.clone('repo', commit_c, self.commit_a)
+        self.assertTrue(clone.bare)
+        self.assertEqual(clone.commit(commit_c.hexsha).tree['b_file.txt'].data_stream.read(), b'third\n')
+
+    def test_clones_are_independent(self):
+        """Make sure clones keep working once their mirror is gone."""
+
+        clone = self.clone('repo', self.commit_a)
+        shutil.rmtree(self.cache.mirror_path('repo'))
+
+        self.assertEqual(clone.commit(self.commit_a.hexsha).tree['a_file.txt'].data_stream.read(), b'second \n')
+
+    def test_recovers_broken_mirror(self):
+        """Make sure a mirror with corrupt objects is cloned again."""
+
+        self.clone('repo', self.commit_b)
+
+        for dir_path, _, filenames in os.walk(os.path.join(self.cache.mirror_path('repo'), 'objects')):
+            for filename in filenames:
+                # objects are hard linked from the test repo, so they're replaced rather than overwritten
+                path = os.path.join(dir_path, filename)
+                os.remove(path)
+
+                with open(path, 'wb') as file:
+                    file.write(b'garbage')
+
+        self.assertOutcome('recover', lambda: self.clone('repo', self.commit_a, self.commit_b))
+
+        clone = self.clone('repo', self.commit_a, self.commit_b)
+        self.assertEqual(clone.commit(self.commit_b.hexsha).tree['a_file.txt'].data_stream.read(), b'first\n')
+
+    def test_evicts_least_recently_used(self):
+        """Make sure the mirrors used the longest ago are evicted first, unless they're in use."""
+
+        self.clone('old', self.commit_a)
+        self.clone('older', self.commit_a)
+        self.clone('new', self.commit_a)
+        os.utime(self.cache.mirror_path('older'), (0, 0))
+        os.utime(self.cache.mirror_path('old'), (1, 1))
+
+        self.cache.max_bytes = max(size for _, size, _ in self.cache.mirrors()) * 2
+
+        with self.cache.lock('older'):
+            self.cache.evict(keep='new')
+
+        self.assertEqual(sorted(key for _, _, key in self.cache.mirrors()), ['new', 'older'])
+        self.assertFalse(os.path.exists(self.cache.lock_path('old')))
+        self.assertTrue(os.path.exists(self.cache.lock_path('older')))
+
+        self.cache.max_bytes = 1
+        self.clone('new', self.commit_a)
+
+        self.assertEqual([key for _, _, key in self.cache.mirrors()], ['new'])
+
+    def test_lock_outlives_eviction(self):
+        """Make sure a job waiting on a mirror's lock while it's evicted locks the lock file that replaces it."""
+
+        held = self.cache.acquire('repo')
+        acquired = []
+
+        def wait_for_lock():
+            lock_file = self.cache.acquire('repo')
+            acquired.append(is_open_at(lock_file, self.cache.lock_path('repo')))
+            lock_file.close()
+
+        thread = threading.Thread(target=wait_for_lock)
+        thread.start()
+        time.sleep(0.1)
+
+        # as evicting the mirror does, while holding the lock
+        os.remove(self.cache.lock_path('repo'))
+        fcntl.flock(held, fcntl.LOCK_UN)
+        held.close()
+
+        thread.join(10)
+        self.assertEqual(acquired, [True])
+
+    def test_credentials_are_not_stored(self):
+        """Make sure the same repo is found whoever's token it's cloned with, and tokens aren't kept."""
+
+        self.assertEqual(strip_credentials('https://token@github.com/a/b.git'), 'https://github.com/a/b.git')
+        self.assertEqual(cache_key('https://one@github.com/a/b.git'), cache_key('https://two@github.com/a/b.git'))
+        self.assertEqual(cache_key('https://one@github.com/a/b.git', '42'), '42')
+        self.assertEqual(cache_key('', '../42'), '.._42')
+
+        error = GitCommandError(['git', 'fetch', 'https://token@github.com/a/b.git'], 128, b'fatal: token')
+        self.assertEqual(describe_error(error), 'GitCommandError with exit status 128')
+
+    def test_git_handler_uses_cache(self):
+        """Make sure a GitHandler given a repo cache retrieves the changed files from its clone."""
+
+        process_handler = ProcessHandler(repo=self.repo_path, uuid=uuid4(), handlers=[])
+        git_handler = GitHandler(process_handler, self.repo_path, self.commit_a.hexsha, self.commit_b.hexsha,
+                                 repo_id='1', repo_cache=self.cache)
+
+        git_handler.clone_repo()
+        git_handler.retrieve_changed_files_from_commit()
+
+        self.assertTrue(os.path.isdir(self.cache.mirror_path('1')))
+        self.assertSetEqual(git_handler.files, {'a_file.txt'})
+
+        with open(os.path.join(git_handler.a_path, 'a_file.txt'), 'r') as file:
+            self.assertEqual(file.read(), 'second \n')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+"""Array backed storage for the errors of a LintReport."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Dict, Iterable, Iterator, List
+
+from lintable_lintball.lint_error import LintError
+
+
+class CompactLintErrors(Mapping):
+    """The errors of every file of a report, stored column by column.
+
+    Rather than a list of LintError tuples per file, each with its own int
+    and str objects, the line numbers, columns and messages of every error
+    are kept in typed arrays, with each distinct message stored once in a
+    table. The errors of a file are a contiguous run of rows, and are turned
+    back into LintErrors as they are read, so this can stand in for the
+    Dict[str, List[LintError]] of a LintReport.
+
+    Files are added, in order, with add; a file can only be added once.
+    """
+
+    def __init__(self, errors: Dict[str, Iterable[LintError]] = None):
+        self.line_numbers = array('i')  # type: array
+        self.columns = array('i')  # type: array
+        self.message_indexes = array('I')  # type: array
+        self.messages = []  # type: List[str]
+        self.message_table = {}  # type: Dict[str, int]
+        # the rows of each file run from its start to the start of the next file
+        self.files = {}  # type: Dict[str, int]
+        self.starts = array('Q')  # type: array
+
+        for filename, file_errors in (errors or {}).items():
+            self.add(filename, file_errors)
+
+    def add(self, filename: str, errors: Iterable[LintError]):
+        """Append the errors of a file."""
+
+        if filename in self.files:
+            raise ValueError('{filename} has already been added'.format(filename=filename))
+
+        self.files[filename] = len(self.starts)
+        self.starts.append(len(self.line_numbers))
+
+        for line_number, column, msg in errors:
+            index = self.message_table.get(msg)
+
+            if index is None:
+                index = self.message_table[msg] = len(self.messages)
+                self.messages.append(msg)
+
+            self.line_numbers.append(line_number)
+            self.columns.append(column)
+            self.message_indexes.append(index)
+
+    def rows(self, filename: str) -> range:
+        """The rows holding the errors of a file."""
+
+        position = self.files[filename]
+        stop = self.starts[position + 1] if position + 1 < len(self.starts) else len(self.line_numbers)
+
+        return range(self.starts[position], stop)
+
+    def error(self, row: int) -> LintError:
+        """Rebuild the LintError stored in a row."""
+
+        return LintError(line_number=self.line_numbers[row],
+                         column=self.columns[row],
+                         msg=self.messages[self.message_indexes[row]])
+
+    def __getitem__(self, filename: str) -> 'CompactErrorList':
+        return CompactErrorList(self, self.rows(filename))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.files)
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def __repr__(self):
+        return '{name}({errors})'.format(name=type(self).__name__, errors=dict((k, list(v)) for k, v in self.items()))
+
+    def error_count(self) -> int:
+        """The number of errors in every file."""
+
+        return len(self.line_numbers)
+
+    def nbytes(self) -> int:
+        """Roughly how many bytes the errors take up, not counting the filenames."""
+
+        return sum(column.itemsize * len(column) for column in (self.line_numbers, self.columns,
+                                                                self.message_indexes, self.starts)) + \
+            sum(len(msg) for msg in self.messages)
+
+
+class CompactErrorList(Sequence):
+    """The errors of a single file of a CompactLintErrors, read as LintErrors."""
+
+    def __init__(self, errors: CompactLintErrors, rows: range):
+        self.errors = errors  # type: CompactLintErrors
+        self.rows = rows  # type: range
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.errors.error(row) for row in self.rows[index]]
+
+        return self.errors.error(self.rows[index])
+
+    def __iter__(self) -> Iterator[LintError]:
+        return (self.errors.error(row) for row in self.rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (list, tuple, Sequence)) or isinstance(other, str):
+            return NotImplemented
+
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self):
+        return repr(list(self))
@@ -0,0 +1,177 @@
+"""Finds the lint errors introduced between two versions of a file."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import bisect
+import io
+import locale
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from lintable_git.hunk import Hunk
+from lintable_lintball.lint_error import LintError
+from lintable_linters.whitespace_file_linter import text_lines
+
+
+def new_errors(a_errors: List[LintError],
+               b_errors: List[LintError],
+               hunks: Optional[List[Hunk]] = None,
+               a_file: Optional[str] = None,
+               b_file: Optional[str] = None,
+               a_data: Optional[bytes] = None,
+               b_data: Optional[bytes] = None) -> List[LintError]:
+    """Find the errors in version a of a file that were not already in version b.
+
+    Errors are matched in two passes, each a linear pass over hash maps:
+
+    1. b's line numbers are mapped through the hunks onto a's line numbers, and
+       errors with the same line, column and message are matched. Without hunks
+       the line numbers are compared as they are.
+    2. The errors left over are matched by their fingerprint, the message and
+       the whitespace-normalized source line, so errors on lines that moved
+       are still recognised. This needs the files, and is skipped without them.
+
+    :param a_errors: The errors found in version a
+    :param b_errors: The errors found in version b
+    :param hunks: The hunks changed between b and a
+    :param a_file: The path of version a, to fingerprint errors
+    :param b_file: The path of version b, to fingerprint errors
+    :param a_data: The contents of version a, to fingerprint errors without reading a_file
+    :param b_data: The contents of version b, to fingerprint errors without reading b_file
+    :return List[LintError]: The errors of a without a match in b, in their original order
+    """
+
+    if not b_errors:
+        return list(a_errors)
+
+    line_map = make_line_map(hunks) if hunks is not None else lambda line: line
+
+    b_positions = Counter()  # type: Counter
+    for error in b_errors:
+        line_number = line_map(error.line_number)
+        if line_number is not None:
+            b_positions[(line_number, error.column, error.msg)] += 1
+
+    unmatched_a = []  # type: List[LintError]
+    for error in a_errors:
+        position = (error.line_number, error.column, error.msg)
+        if b_positions[position] > 0:
+            b_positions[position] -= 1
+        else:
+            unmatched_a.append(error)
+
+    if not unmatched_a or (a_file is None and a_data is None) or (b_file is None and b_data is None):
+        return unmatched_a
+
+    # the b errors that weren't matched by position are candidates for moved lines
+    unmatched_b = []  # type: List[LintError]
+    for error in b_errors:
+        line_number = line_map(error.line_number)
+        position = (line_number, error.column, error.msg)
+        if line_number is None:
+            unmatched_b.append(error)
+        elif b_positions[position] > 0:
+            b_positions[position] -= 1
+            unmatched_b.append(error)
+
+    if not unmatched_b:
+        return unmatched_a
+
+    a_source = read_lines(a_file, (error.line_number for error in unmatched_a), a_data)
+    b_source = read_lines(b_file, (error.line_number for error in unmatched_b), b_data)
+
+    b_fingerprints = Counter(fingerprint(error, b_source) for error in unmatched_b)
+
+    result = []
+    for error in unmatched_a:
+        error_fingerprint = fingerprint(error, a_source)
+        if b_fingerprints[error_fingerprint] > 0:
+            b_fingerprints[error_fingerprint] -= 1
+        else:
+            result.append(error)
+
+    return result
+
+
+def make_line_map(hunks: List[Hunk]) -> Callable[[int], Optional[int]]:
+    """Make a function mapping line numbers in b to line numbers in a.
+
+    Lines within a hunk were changed, so they have no line in a and map to None.
+
+    :param hunks: The hunks changed between b and a
+    :return Callable[[int], Optional[int]]:
+    """
+
+    starts = []  # type: List[int]
+    ends = []  # type: List[int]
+    offsets = [0]  # type: List[int]
+
+    for hunk in sorted(hunks, key=lambda h: h.b_start):
+        # a hunk that only adds lines sits between line b_start and the next one
+        start = hunk.b_start if hunk.b_length else hunk.b_start + 1
+        starts.append(start)
+        ends.append(start + hunk.b_length)
+        offsets.append(offsets[-1] + hunk.a_length - hunk.b_length)
+
+    def line_map(line_number: int) -> Optional[int]:
+        # the hunks ending at or before this line have shifted it
+        index = bisect.bisect_right(ends, line_number)
+
+        if index < len(starts) and starts[index] <= line_number:
+            return None
+
+        return line_number + offsets[index]
+
+    return line_map
+
+
+def fingerprint(error: LintError, source: Dict[int, str]) -> Tuple[str, str]:
+    """Identify an error independently of where its line is in the file."""
+
+    return error.msg, ' '.join(source.get(error.line_number, '').split())
+
+
+def read_lines(filename: Optional[str], line_numbers: Iterable[int], data: Optional[bytes] = None) -> Dict[int, str]:
+    """Read the given lines of a file, keyed by line number.
+
+    :param filename: The path of the file to read
+    :param line_numbers: The line numbers to read
+    :param data: The contents of the file, read instead of filename if given
+    :return Dict[int, str]:
+    """
+
+    wanted = set(line_numbers)
+    lines = {}  # type: Dict[int, str]
+
+    if not wanted:
+        return lines
+
+    last_line_number = max(wanted)
+
+    try:
+        # decoded and numbered as the linters do, with the locale's encoding and str.splitlines
+        with (open(filename, 'r') if data is None else
+              io.StringIO(data.decode(locale.getpreferredencoding(False)), newline=None)) as file:
+            for line_number, line in enumerate(text_lines(file), start=1):
+                if line_number > last_line_number:
+                    break
+
+                if line_number in wanted:
+                    lines[line_number] = line
+    except (OSError, UnicodeDecodeError):
+        # without the source, errors can still be matched by message alone
+        pass
+
+    return lines
@@ -0,0 +1,307 @@
+"""Content-addressed cache of lint results."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import List, Optional
+
+import redis
+
+from lintable_lintball.lint_error import LintError
+from lintable_lintball.lint_pool import LintPool
+from lintable_lintball.lint_wrapper import LintWrapper
+from lintable_settings.settings import LINTBALL_SETTINGS
+
+
+def dump_errors(errors: List[LintError]) -> bytes:
+    """Serialize a list of LintErrors for a store that holds bytes."""
+
+    return json.dumps([list(error) for error in errors]).encode('utf-8')
+
+
+def load_errors(data: bytes) -> List[LintError]:
+    """Deserialize a list of LintErrors written by dump_errors."""
+
+    return [LintError(*error) for error in json.loads(data.decode('utf-8'))]
+
+
+class LintCacheStore(ABC):
+    """Abstract base class for a contract for lint cache stores."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[List[LintError]]:
+        """Get the errors stored under key, or None if there are none."""
+
+        return None
+
+    @abstractmethod
+    def set(self, key: str, errors: List[LintError]):
+        """Store the errors under key, evicting older entries if needed."""
+
+        return
+
+
+class MemoryStore(LintCacheStore):
+    """In-process LRU store, bounded by its number of entries."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries  # type: int
+        self.entries = OrderedDict()  # type: OrderedDict
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[List[LintError]]:
+        with self.lock:
+            errors = self.entries.get(key)
+
+            if errors is not None:
+                self.entries.move_to_end(key)
+
+            return errors
+
+    def set(self, key: str, errors: List[LintError]):
+        with self.lock:
+            self.entries[key] = errors
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+class DiskStore(LintCacheStore):
+    """On-disk LRU store, bounded by the total size of its entries.
+
+    Each entry is a file named after its key; reading an entry touches it so
+    that the least recently used entries have the oldest modification times.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path  # type: str
+        self.max_bytes = max_bytes  # type: int
+        self.lock = threading.Lock()
+
+        os.makedirs(self.path, exist_ok=True)
+        self.size = sum(size for _, _, size in self.scan())  # type: int
+
+    def entry_path(self, key: str) -> str:
+        return os.path.join(self.path, key)
+
+    def scan(self):
+        """Yield (modification time, path, size) for every entry in the store."""
+
+        for entry in os.scandir(self.path):
+            if entry.is_file():
+                stat = entry.stat()
+                yield stat.st_mtime, entry.path, stat.st_size
+
+    def get(self, key: str) -> Optional[List[LintError]]:
+        path = self.entry_path(key)
+
+        try:
+            with open(path, 'rb') as entry:
+                errors = load_errors(entry.read())
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.error('Unreadable lint cache entry {path}: {e}'.format(path=path, e=e))
+            return None
+
+        return errors
+
+    def set(self, key: str, errors: List[LintError]):
+        data = dump_errors(errors)
+
+        # write to a temporary file first so readers never see a partial entry
+        descriptor, tmp_path = tempfile.mkstemp(dir=self.path, prefix='.')
+        with os.fdopen(descriptor, 'wb') as entry:
+            entry.write(data)
+        os.replace(tmp_path, self.entry_path(key))
+
+        with self.lock:
+            self.size += len(data)
+
+            if self.size > self.max_bytes:
+                self.evict()
+
+    def evict(self):
+        """Remove the least recently used entries until the store fits in max_bytes."""
+
+        entries = sorted(self.scan())
+        self.size = sum(size for _, _, size in entries)
+
+        for _, path, size in entries:
+            if self.size <= self.max_bytes:
+                break
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+            self.size -= size
+
+
+class RedisStore(LintCacheStore):
+    """Redis backed store, shared by every worker using the same server.
+
+    Entries expire after ttl seconds; size-bounded eviction is left to the
+    server's maxmemory-policy, which should be one of the LRU policies.
+    """
+
+    def __init__(self, url: str, ttl: int, prefix: str = 'lintable:lint-cache:'):
+        self.client = redis.StrictRedis.from_url(url)
+        self.ttl = ttl  # type: int
+        self.prefix = prefix  # type: str
+
+    def get(self, key: str) -> Optional[List[LintError]]:
+        data = self.client.get(self.prefix + key)
+        return load_errors(data) if data is not None else None
+
+    def set(self, key: str, errors: List[LintError]):
+        self.client.setex(self.prefix + key, self.ttl, dump_errors(errors))
+
+
+class LintCache(object):
+    """Caches lint results by blob sha1 and linter identity.
+
+    A blob's contents never change, so a linter with the same identity will
+    always find the same errors in it. Linters without an identity are never
+    cached.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, store: LintCacheStore):
+        self.store = store  # type: LintCacheStore
+
+    @staticmethod
+    def key(blob_id: Optional[str], linter: LintWrapper) -> Optional[str]:
+        """Build the cache key for a blob and linter, or None if it can't be cached."""
+
+        identity = linter.identity()
+
+        if blob_id is None or identity is None:
+            return None
+
+        return hashlib.sha1('{blob_id}\0{identity}'.format(blob_id=blob_id,
+                                                          identity=identity).encode('utf-8')).hexdigest()
+
+    def get(self, blob_id: Optional[str], linter: LintWrapper) -> Optional[List[LintError]]:
+        key = self.key(blob_id, linter)
+        return self.store.get(key) if key is not None else None
+
+    def set(self, blob_id: Optional[str], linter: LintWrapper, errors: List[LintError]):
+        key = self.key(blob_id, linter)
+
+        if key is not None:
+            self.store.set(key, errors)
+
+    def submit(self, pool: LintPool, linter: LintWrapper, filename: str, blob_id: Optional[str],
+               lines: Optional[List[range]] = None, data: Optional[bytes] = None) -> Future:
+        """Lint a file through the pool, unless the results are already cached.
+
+        Only whole-file results are cached, so jobs limited to some of the
+        file's lines always go to the pool.
+
+        :param pool: The pool to run the linter in on a cache miss
+        :param linter: The linter to run
+        :param filename: The path of the file to lint
+        :param blob_id: The sha1 of the blob the file was retrieved from, if known
+        :param lines: The ranges of line numbers to lint, or None for the whole file
+        :param data: The contents of the file, or None to read it from filename
+        :return Future: A future resolving to the List[LintError] found
+        """
+
+        if lines is not None:
+            return pool.submit(linter, filename, lines, data)
+
+        key = self.key(blob_id, linter)
+        errors = self.lookup(key) if key is not None else None
+
+        if errors is not None:
+            future = Future()
+            future.set_result(errors)
+            return future
+
+        future = pool.submit(linter, filename, data=data)
+
+        if key is not None:
+            future.add_done_callback(lambda done: self.store_result(key, done))
+
+        return future
+
+    def lookup(self, key: str) -> Optional[List[LintError]]:
+        """Get the errors stored under key, treating a broken store as a miss."""
+
+        try:
+            return self.store.get(key)
+        except Exception as e:
+            # a broken cache shouldn't break the job
+            self.logger.error('Unable to look up lint results: {e}'.format(e=e))
+            return None
+
+    def store_result(self, key: str, future: Future):
+        """Store the result of a finished lint job, ignoring failed jobs."""
+
+        if future.cancelled() or future.exception() is not None:
+            return
+
+        try:
+            self.store.set(key, future.result())
+        except Exception as e:
+            # a broken cache shouldn't break the job
+            self.logger.error('Unable to store lint results: {e}'.format(e=e))
+
+
+def create_lint_cache() -> Optional[LintCache]:
+    """Create a LintCache from LINTBALL_SETTINGS['cache'], or None if disabled."""
+
+    settings = LINTBALL_SETTINGS['cache']
+    store_type = settings['store']
+
+    if store_type == 'memory':
+        store = MemoryStore(max_entries=settings['max_entries'])
+    elif store_type == 'disk':
+        store = DiskStore(path=settings['path'], max_bytes=settings['max_bytes'])
+    elif store_type == 'redis':
+        store = RedisStore(url=settings['url'], ttl=settings['ttl'])
+    else:
+        return None
+
+    return LintCache(store)
+
+
+DEFAULT_LINT_CACHE = None  # type: Optional[LintCache]
+
+
+def default_lint_cache() -> Optional[LintCache]:
+    """The worker-wide LintCache, created on first use so it lives across jobs."""
+
+    global DEFAULT_LINT_CACHE
+
+    if DEFAULT_LINT_CACHE is None:
+        DEFAULT_LINT_CACHE = create_lint_cache()
+
+    return DEFAULT_LINT_CACHE
@@ -0,0 +1,323 @@
+"""Long running linter processes, kept warm and reused between files and jobs."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import atexit
+import json
+import logging
+import os
+import select
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from lintable_lintball.lint_limits import LintTimeout, limit_process
+from lintable_metrics.metrics import LINTER_PROCESSES
+from lintable_settings.settings import LINTBALL_SETTINGS
+
+
+class LintDaemonError(Exception):
+    """Raised when a linter daemon crashes, times out or breaks the protocol."""
+
+    pass
+
+
+class LintDaemonTimeout(LintDaemonError, LintTimeout):
+    """Raised when a linter daemon doesn't answer a request in time.
+
+    It's a LintTimeout, so the file is reported as timed out rather than as
+    failed, and a LintDaemonError, so the daemon is retired.
+    """
+
+    pass
+
+
+class LintDaemonRequestError(Exception):
+    """Raised when a linter daemon answers a request with an error."""
+
+    pass
+
+
+class LintDaemon(object):
+    """A single long running linter process.
+
+    The daemon speaks a line based JSON-RPC style protocol: each request is a
+    JSON object {"id": ..., "method": ..., "params": ...} on its own line of
+    stdin, and is answered by a JSON object {"id": ..., "result": ...} or
+    {"id": ..., "error": ...} on its own line of stdout.
+    """
+
+    def __init__(self, command: List[str], timeout: float, cpu: Optional[int] = None):
+        """
+        :param command: The command line that starts the daemon
+        :param timeout: How long to wait, in seconds, for each response
+        :param cpu: The most CPU time, in seconds, the daemon may use over its
+                    life, defaults to LINTBALL_SETTINGS['limits']['cpu']
+        :return:
+        """
+
+        self.command = command  # type: List[str]
+        self.timeout = timeout  # type: float
+        self.requests = 0  # type: int
+        self.last_used = time.monotonic()  # type: float
+        self.buffer = b''  # type: bytes
+        LINTER_PROCESSES.labels(command=os.path.basename(command[0])).inc()
+        self.process = subprocess.Popen(command,
+                                        stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL)
+        limit_process(self.process.pid, cpu=cpu)
+
+    def alive(self) -> bool:
+        """Whether the daemon's process is still running."""
+
+        return self.process.poll() is None
+
+    def request(self, method: str, params: dict):
+        """Send a request to the daemon and wait for its result.
+
+        :param method: The method to call, e.g. 'lint'
+        :param params: The parameters of the method
+        :return: The result of the call, as decoded from JSON
+        """
+
+        self.requests += 1
+        self.last_used = time.monotonic()
+
+        message = json.dumps({'id': self.requests, 'method': method, 'params': params}) + '\n'
+
+        try:
+            self.process.stdin.write(message.encode('utf-8'))
+            self.process.stdin.flush()
+        except OSError as e:
+            raise LintDaemonError('Unable to write to linter daemon {command}: {e}'.format(command=self.command, e=e))
+
+        try:
+            response = json.loads(self.read_line().decode('utf-8'))
+        except ValueError as e:
+            raise LintDaemonError('Malformed response from linter daemon {command}: {e}'.format(command=self.command,
+                                                                                                 e=e))
+
+        if response.get('id') != self.requests:
+            raise LintDaemonError('Out of order response from linter daemon {command}'.format(command=self.command))
+
+        if 'error' in response:
+            raise LintDaemonRequestError('Linter daemon {command} failed: {error}'.format(command=self.command,
+                                                                                         error=response['error']))
+
+        return response.get('result')
+
+    def read_line(self) -> bytes:
+        """Read the next line of the daemon's stdout, waiting at most timeout seconds."""
+
+        deadline = time.monotonic() + self.timeout
+        descriptor = self.process.stdout.fileno()
+
+        while b'\n' not in self.buffer:
+            remaining = deadline - time.monotonic()
+
+            if remaining <= 0 or not select.select([descriptor], [], [], remaining)[0]:
+                raise LintDaemonTimeout('Timed out after {timeout} seconds waiting for linter daemon {command}'.format(
+                    timeout=self.timeout, command=self.command))
+
+            chunk = os.read(descriptor, 65536)
+
+            if not chunk:
+                raise LintDaemonError('Linter daemon {command} exited'.format(command=self.command))
+
+            self.buffer += chunk
+
+        line, self.buffer = self.buffer.split(b'\n', 1)
+        return line
+
+    def healthy(self) -> bool:
+        """Check the daemon is running and still answering requests."""
+
+        if not self.alive():
+            return False
+
+        try:
+            self.request('ping', {})
+        except (LintDaemonError, LintDaemonRequestError):
+            return False
+
+        return True
+
+    def close(self):
+        """Stop the daemon, killing it if it doesn't exit on its own."""
+
+        if self.alive():
+            try:
+                self.process.stdin.close()
+                self.process.wait(timeout=1)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+                self.process.wait()
+
+        self.process.stdout.close()
+
+
+class LintDaemonPool(object):
+    """A pool of warm daemons for one linter command.
+
+    Daemons are handed out one request at a time and returned to the pool
+    afterwards. Daemons that have been idle for a while are health checked
+    before being reused, daemons that crash are replaced, and daemons that
+    have served max_requests requests are recycled to bound any leaks.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self,
+                 command: List[str],
+                 max_processes: int,
+                 max_requests: int,
+                 health_check_interval: float,
+                 timeout: float):
+        self.command = command  # type: List[str]
+        self.max_processes = max_processes  # type: int
+        self.max_requests = max_requests  # type: int
+        self.health_check_interval = health_check_interval  # type: float
+        self.timeout = timeout  # type: float
+        self.idle = []  # type: List[LintDaemon]
+        self.started = 0  # type: int
+        self.condition = threading.Condition()
+
+    def start(self) -> LintDaemon:
+        # the CPU limit is per file, and a daemon lints up to max_requests of them
+        return LintDaemon(self.command, self.timeout, cpu=LINTBALL_SETTINGS['limits']['cpu'] * self.max_requests)
+
+    def acquire(self) -> LintDaemon:
+        """Take a healthy daemon out of the pool, starting one if there's room."""
+
+        with self.condition:
+            while not self.idle and self.started >= self.max_processes:
+                self.condition.wait()
+
+            if self.idle:
+                daemon = self.idle.pop()
+            else:
+                self.started += 1
+                daemon = None
+
+        if daemon is not None and time.monotonic() - daemon.last_used > self.health_check_interval \
+                and not daemon.healthy():
+            self.logger.error('Restarting unhealthy linter daemon {command}'.format(command=self.command))
+            daemon.close()
+            daemon = None
+
+        if daemon is None:
+            try:
+                daemon = self.start()
+            except OSError:
+                # give the slot back so the pool doesn't shrink
+                with self.condition:
+                    self.started -= 1
+                    self.condition.notify()
+                raise
+
+        return daemon
+
+    def release(self, daemon: LintDaemon, broken: bool = False):
+        """Put a daemon back into the pool, or retire it if it's broken or worn out."""
+
+        retire = broken or not daemon.alive() or daemon.requests >= self.max_requests
+
+        if retire:
+            daemon.close()
+
+        with self.condition:
+            if retire:
+                self.started -= 1
+            else:
+                self.idle.append(daemon)
+
+            self.condition.notify()
+
+    @contextmanager
+    def daemon(self):
+        """Borrow a daemon for the duration of a with block."""
+
+        daemon = self.acquire()
+
+        try:
+            yield daemon
+        except LintDaemonError:
+            self.release(daemon, broken=True)
+            raise
+        except BaseException:
+            self.release(daemon)
+            raise
+        else:
+            self.release(daemon)
+
+    def request(self, method: str, params: dict):
+        """Send a request to a pooled daemon, retrying once on a fresh daemon if it crashes."""
+
+        try:
+            with self.daemon() as daemon:
+                return daemon.request(method, params)
+        except LintDaemonTimeout:
+            # the file would most likely time out again
+            raise
+        except LintDaemonError as e:
+            self.logger.error('Retrying request on a fresh linter daemon: {e}'.format(e=e))
+
+        with self.daemon() as daemon:
+            return daemon.request(method, params)
+
+    def close(self):
+        """Stop every idle daemon in the pool."""
+
+        with self.condition:
+            idle, self.idle = self.idle, []
+            self.started -= len(idle)
+
+        for daemon in idle:
+            daemon.close()
+
+
+DAEMON_POOLS = {}  # type: Dict[Tuple[str, ...], LintDaemonPool]
+DAEMON_POOLS_LOCK = threading.Lock()
+
+
+def daemon_pool(command: List[str]) -> LintDaemonPool:
+    """The worker-wide pool of daemons for a command, created on first use."""
+
+    key = tuple(command)
+
+    with DAEMON_POOLS_LOCK:
+        if key not in DAEMON_POOLS:
+            settings = LINTBALL_SETTINGS['daemon']
+            DAEMON_POOLS[key] = LintDaemonPool(command,
+                                               max_processes=settings['max_processes'],
+                                               max_requests=settings['max_requests'],
+                                               health_check_interval=settings['health_check_interval'],
+                                               timeout=settings['timeout'])
+
+        return DAEMON_POOLS[key]
+
+
+@atexit.register
+def close_daemon_pools():
+    """Stop every pooled daemon when the worker exits."""
+
+    with DAEMON_POOLS_LOCK:
+        for pool in DAEMON_POOLS.values():
+            pool.close()
+
+        DAEMON_POOLS.clear()
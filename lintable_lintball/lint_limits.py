@@ -0,0 +1,75 @@
+"""Time and resource limits for linters."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import resource
+from typing import Optional
+
+from lintable_settings.settings import LINTBALL_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+
+class LintTimeout(Exception):
+    """Raised when a linter runs past its deadline."""
+
+    pass
+
+
+class LintSkipped(Exception):
+    """Raised when a linter declines to lint a file, e.g. because it is too large."""
+
+    pass
+
+
+def limit_process(pid: int, memory: Optional[int] = None, cpu: Optional[int] = None):
+    """Cap the address space, in bytes, and CPU time, in seconds, of a running process.
+
+    Limits are applied with prlimit right after the process is spawned, rather
+    than with a preexec_fn, which isn't safe to use from the thread pools
+    linters run in.
+
+    :param pid: The process to limit
+    :param memory: The most memory it may map, defaults to LINTBALL_SETTINGS['limits']['memory']
+    :param cpu: The most CPU time it may use, defaults to LINTBALL_SETTINGS['limits']['cpu']
+    :return:
+    """
+
+    memory = memory if memory is not None else LINTBALL_SETTINGS['limits']['memory']
+    cpu = cpu if cpu is not None else LINTBALL_SETTINGS['limits']['cpu']
+
+    try:
+        if memory:
+            resource.prlimit(pid, resource.RLIMIT_AS, (memory, memory))
+        if cpu:
+            resource.prlimit(pid, resource.RLIMIT_CPU, (cpu, cpu))
+    except ProcessLookupError:
+        pass  # the process has already exited
+    except (OSError, ValueError) as e:
+        logger.error('Unable to limit linter process {pid}: {e}'.format(pid=pid, e=e))
+
+    return
+
+
+def limit_current_process_memory():
+    """Cap the address space of the current process, used by the jobs run in process pool workers."""
+
+    memory = LINTBALL_SETTINGS['limits']['memory']
+
+    if memory:
+        resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+
+    return
@@ -0,0 +1,24 @@
+"""Enum for how linting a file turned out, when it wasn't linted normally."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from enum import Enum
+
+class LintOutcome(Enum):
+    """Enum for how linting a file turned out, when it wasn't linted normally."""
+
+    TIMED_OUT = 1  # a linter ran out of time, so the file's errors may be incomplete
+    FAILED = 2  # a linter crashed, so the file's errors may be incomplete
+    SKIPPED = 3  # a linter declined to lint the file, e.g. because it is too large
@@ -0,0 +1,415 @@
+"""Worker pools for fanning lint jobs out across cores."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import concurrent.futures
+import multiprocessing
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from lintable_lintball.lint_error import LintError
+from lintable_lintball.lint_limits import limit_current_process_memory
+from lintable_lintball.lint_wrapper import LintWrapper
+from lintable_lintball.pool_type import PoolType
+from lintable_settings.settings import LINTBALL_SETTINGS
+from lintable_tracing.tracer import Span
+from lintable_tracing.tracing import TRACER
+
+# asyncio.all_tasks and current_task are 3.7+, and the Task methods they replace are gone in 3.9
+all_tasks = getattr(asyncio, 'all_tasks', None) or asyncio.Task.all_tasks
+current_task = getattr(asyncio, 'current_task', None) or asyncio.Task.current_task
+
+# before Python 3.8, asyncio has no child watcher for loops outside the main thread, so
+# starting a linter from the event loop's background thread fails or hangs; linters
+# asking for PoolType.ASYNC run their blocking lint in the thread pool instead
+ASYNC_SUBPROCESSES = sys.version_info >= (3, 8)
+
+# resolving a cancelled future only raises InvalidStateError from 3.8; before
+# that it goes unchecked, so there is nothing to catch
+InvalidStateError = getattr(concurrent.futures, 'InvalidStateError', ())
+
+
+class SerialExecutor(Executor):
+    """Executor that runs each job immediately in the calling thread.
+
+    Used when only a single worker is configured, so that a pool of one does
+    not pay for the overhead of handing jobs to another thread or process.
+    """
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Run fn right away and return a Future holding its outcome."""
+
+        future = Future()
+
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+
+        return future
+
+
+class AsyncExecutor(Executor):
+    """Executor that runs coroutines on an event loop in a background thread.
+
+    Coroutines run concurrently, at most max_concurrency at a time, so linters
+    that spend their time waiting on subprocesses overlap without needing a
+    thread each.
+    """
+
+    def __init__(self, max_concurrency: int):
+        if not ASYNC_SUBPROCESSES:
+            raise RuntimeError('The asyncio engine needs Python 3.8 or later, which can start subprocesses '
+                               'from an event loop outside the main thread')
+
+        self.max_concurrency = max_concurrency  # type: int
+        self.semaphore = None  # type: Optional[asyncio.Semaphore]
+        self.futures = set()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.run_loop, name='lintball-async', daemon=True)
+        self.thread.start()
+
+    def run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    async def limited(self, coroutine):
+        """Await a coroutine once there are fewer than max_concurrency running."""
+
+        # created on the loop's own thread so it binds to the right loop
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async with self.semaphore:
+            return await coroutine
+
+    async def cancel_all(self):
+        """Cancel every other task on the loop, and wait for them to clean up."""
+
+        tasks = [task for task in all_tasks(self.loop) if task is not current_task(self.loop)]
+
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Schedule the coroutine fn(*args, **kwargs) on the event loop."""
+
+        future = asyncio.run_coroutine_threadsafe(self.limited(fn(*args, **kwargs)), self.loop)
+        self.futures.add(future)
+        future.add_done_callback(self.futures.discard)
+
+        return future
+
+    def shutdown(self, wait: bool = True):
+        """Stop the event loop, waiting for the scheduled coroutines first or cancelling them."""
+
+        if wait and self.futures:
+            concurrent.futures.wait(list(self.futures))
+        elif self.futures:
+            # cancelling kills the linters the coroutines are waiting on
+            asyncio.run_coroutine_threadsafe(self.cancel_all(), self.loop).result()
+
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+class LintPool(object):
+    """Fans lint jobs out to thread, process or asyncio pools, chosen per linter.
+
+    Each LintWrapper declares the kind of pool it wants through its pool_type
+    attribute. Executors are created lazily, so a job that only uses thread
+    based linters never forks a process pool.
+
+    Each job is timed where it runs, and the futures it returns carry how long
+    it took, in seconds, in their lint_seconds attribute once they're done.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        :param max_workers: The number of workers per pool, defaults to LINTBALL_SETTINGS['pool']['workers']
+        :return:
+        """
+
+        if max_workers is None:
+            max_workers = LINTBALL_SETTINGS['pool']['workers']
+
+        self.max_workers = max(1, max_workers)  # type: int
+        self.executors = {}  # type: Dict[PoolType, Executor]
+        self.batches = OrderedDict()  # type: OrderedDict
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+    def executor(self, pool_type: PoolType) -> Executor:
+        """Get, or create, the executor backing the given pool type.
+
+        :param pool_type: The kind of pool the linter asked for
+        :return Executor:
+        """
+
+        if pool_type == PoolType.ASYNC:
+            # coroutines have their own concurrency limit, and can't run without a loop
+            pass
+
+        elif self.max_workers == 1:
+            # one worker means no parallelism, so skip the pools altogether
+            pool_type = None
+
+        elif pool_type == PoolType.PROCESS and multiprocessing.current_process().daemon:
+            # daemonic processes, such as prefork Celery workers, can't have
+            # children of their own so fall back to threads
+            pool_type = PoolType.THREAD
+
+        if pool_type not in self.executors:
+            if pool_type == PoolType.PROCESS:
+                self.executors[pool_type] = ProcessPoolExecutor(max_workers=self.max_workers)
+            elif pool_type == PoolType.THREAD:
+                self.executors[pool_type] = ThreadPoolExecutor(max_workers=self.max_workers)
+            elif pool_type == PoolType.ASYNC:
+                self.executors[pool_type] = AsyncExecutor(max_concurrency=LINTBALL_SETTINGS['async']['max_processes'])
+            else:
+                self.executors[pool_type] = SerialExecutor()
+
+        return self.executors[pool_type]
+
+    def submit(self, linter: LintWrapper, filename: str, lines: Optional[List[range]] = None,
+               data: Optional[bytes] = None) -> Future:
+        """Queue up a single file to be linted by a single linter.
+
+        :param linter: The linter to run
+        :param filename: The path of the file to lint
+        :param lines: The ranges of line numbers to lint, or None for the whole file
+        :param data: The contents of the file, or None to read it from filename; linters
+                     without reads_bytes lint it from a temporary file
+        :return Future: A future resolving to the List[LintError] found
+        """
+
+        if data is not None:
+            return self.run(self.blocking_pool_type(linter), lint_bytes, linter, filename, data, lines)
+
+        if lines is not None:
+            return self.run(self.blocking_pool_type(linter), linter.lint_lines, filename, lines)
+
+        if linter.batch_size > 1:
+            return self.defer(linter, filename)
+
+        if linter.pool_type == PoolType.ASYNC and ASYNC_SUBPROCESSES:
+            return timed_future(self.executor(PoolType.ASYNC).submit(timed_coroutine, linter.lint_async, filename))
+
+        return self.run(self.blocking_pool_type(linter), linter.lint, filename)
+
+    def run(self, pool_type: PoolType, fn, *args) -> Future:
+        """Run fn(*args) on the given kind of pool, timing it where it runs.
+
+        :return Future: A future resolving to the result of fn, with its lint_seconds
+        """
+
+        executor = self.executor(pool_type)
+
+        if isinstance(executor, ProcessPoolExecutor):
+            return timed_future(executor.submit(limited_call, fn, *args))
+
+        if isinstance(executor, ThreadPoolExecutor):
+            return timed_future(executor.submit(traced_call, TRACER.current(), fn, *args))
+
+        return timed_future(executor.submit(timed_call, fn, *args))
+
+    @staticmethod
+    def blocking_pool_type(linter: LintWrapper) -> PoolType:
+        """The pool to run the linter's blocking methods, like lint_lines and lint_many, in."""
+
+        return PoolType.THREAD if linter.pool_type == PoolType.ASYNC else linter.pool_type
+
+    def defer(self, linter: LintWrapper, filename: str) -> Future:
+        """Add a file to the linter's next batch, which is submitted once it is full or flushed.
+
+        :param linter: The linter to run
+        :param filename: The path of the file to lint
+        :return Future: A future resolving to the List[LintError] found
+        """
+
+        future = Future()
+        future.lint_seconds = None
+        batch = self.batches.setdefault(linter, [])
+        batch.append((filename, future))
+
+        if len(batch) >= linter.batch_size:
+            self.submit_batch(linter, self.batches.pop(linter))
+
+        return future
+
+    def flush(self):
+        """Submit every batch that is still waiting to fill up.
+
+        This must be called before waiting on the futures of batched linters.
+
+        :return:
+        """
+
+        while self.batches:
+            linter, batch = self.batches.popitem(last=False)
+            self.submit_batch(linter, batch)
+
+        return
+
+    def submit_batch(self, linter: LintWrapper, batch: List[Tuple[str, Future]]):
+        """Lint a batch of files with a single call to lint_many, resolving each file's future."""
+
+        batch_future = self.run(self.blocking_pool_type(linter), linter.lint_many, [filename for filename, _ in batch])
+
+        def resolve(done: Future):
+            exception = done.exception()
+            lint_errors = done.result() if exception is None else {}
+
+            for filename, future in batch:
+                if exception is not None:
+                    future.set_exception(exception)
+                else:
+                    # the files of a batch share its time evenly
+                    future.lint_seconds = done.lint_seconds / len(batch)
+                    future.set_result(lint_errors.get(filename, []))
+
+        batch_future.add_done_callback(resolve)
+
+    def submit_all(self, linters: List[LintWrapper], filename: str,
+                   lines: Optional[List[range]] = None, data: Optional[bytes] = None) -> List[Future]:
+        """Queue up a single file to be linted by each of the linters.
+
+        :param linters: The linters to run, in order
+        :param filename: The path of the file to lint
+        :param lines: The ranges of line numbers for line-local linters to lint, or None for the whole file
+        :param data: The contents of the file, or None to read it from filename
+        :return List[Future]: One future per linter, in the same order as linters
+        """
+
+        return [self.submit(linter, filename, lines if linter.line_local else None, data) for linter in linters]
+
+    def shutdown(self, wait: bool = True):
+        """Shut down every executor this pool has created.
+
+        :param wait: Whether to wait for pending jobs to finish
+        :return:
+        """
+
+        self.flush()
+
+        for executor in self.executors.values():
+            executor.shutdown(wait=wait)
+
+        self.executors = {}
+        return
+
+
+def timed_call(fn, *args):
+    """Call fn(*args), returning its result and how long, in seconds, it took.
+
+    A module level function, so it can be sent to a process pool.
+    """
+
+    start = time.monotonic()
+    result = fn(*args)
+
+    return result, time.monotonic() - start
+
+
+def limited_call(fn, *args):
+    """Cap the memory of the process pool worker it runs in, then timed_call fn(*args).
+
+    ProcessPoolExecutor only takes an initializer from Python 3.7, so each job
+    sets the limit itself; setting it again in the same worker is harmless.
+    """
+
+    limit_current_process_memory()
+
+    return timed_call(fn, *args)
+
+
+def traced_call(span: Optional[Span], fn, *args):
+    """timed_call fn(*args) in a pool thread, under the span that was current when it was submitted."""
+
+    token = TRACER.activate(span)
+
+    try:
+        return timed_call(fn, *args)
+    finally:
+        TRACER.deactivate(token)
+
+
+async def timed_coroutine(fn, *args):
+    """Await fn(*args), returning its result and how long, in seconds, it took."""
+
+    start = time.monotonic()
+    result = await fn(*args)
+
+    return result, time.monotonic() - start
+
+
+def timed_future(timed: Future) -> Future:
+    """Unwrap the future of a timed_call or timed_coroutine.
+
+    The returned future resolves to the call's result, and has how long the
+    call took in its lint_seconds attribute. Cancelling it cancels the call.
+    """
+
+    future = Future()
+    future.lint_seconds = None
+
+    def resolve(done: Future):
+        if future.cancelled():
+            return
+
+        try:
+            if done.cancelled():
+                future.cancel()
+            elif done.exception() is not None:
+                future.set_exception(done.exception())
+            else:
+                result, future.lint_seconds = done.result()
+                future.set_result(result)
+        except InvalidStateError:
+            # cancelled by the time the call finished
+            pass
+
+    def cancel(done: Future):
+        if done.cancelled():
+            timed.cancel()
+
+    future.add_done_callback(cancel)
+    timed.add_done_callback(resolve)
+
+    return future
+
+
+def lint_bytes(linter: LintWrapper, filename: str, data: bytes, lines: Optional[List[range]]) -> List[LintError]:
+    """Lint the contents of a file, only the given ranges of line numbers if given.
+
+    A module level function, so it can be sent to a process pool.
+    """
+
+    if lines is None:
+        return linter.lint_bytes(filename, data)
+
+    return linter.lint_bytes_lines(filename, data, lines)
@@ -14,12 +14,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import NamedTuple, Dict, List
+from types import MappingProxyType
+from typing import NamedTuple, Dict, Iterable, List
 
+from lintable_lintball.compact_lint_errors import CompactLintErrors
 from lintable_lintball.lint_error import LintError
+from lintable_lintball.lint_outcome import LintOutcome
 
-# The keys in the errors dictionary are the file names of the files linted
-LintReport = NamedTuple('LintReport', [('errors', Dict[str, List[LintError]])])
+# The keys in the errors dictionary are the file names of the files linted.
+# Large reports keep their errors in a CompactLintErrors, which reads the same.
+# Files that weren't fully linted, because a linter timed out, failed or
+# skipped them, are also in the outcomes dictionary, and their errors may be
+# incomplete.
+LintReport = NamedTuple('LintReport', [('errors', Dict[str, List[LintError]]),
+                                       ('outcomes', Dict[str, LintOutcome])])
+LintReport.__new__.__defaults__ = (MappingProxyType({}),)
 
 
 def create_from_db_query(rows)-> LintReport:
@@ -31,3 +40,48 @@ def create_from_db_query(rows)-> LintReport:
                                                               msg=row.error_message))
 
     return LintReport(errors=errors)
+
+
+def create_from_dict(data: dict) -> LintReport:
+    """Rebuild a LintReport from the output of to_dict, e.g. after a trip through JSON."""
+
+    errors = CompactLintErrors()
+
+    for file_name, rows in data['errors'].items():
+        errors.add(file_name, rows)
+
+    outcomes = dict((file_name, LintOutcome[outcome]) for file_name, outcome in data.get('outcomes', {}).items())
+
+    return LintReport(errors=errors, outcomes=outcomes)
+
+
+def to_dict(report: LintReport) -> dict:
+    """Convert a LintReport into plain, JSON serializable, dicts and lists."""
+
+    return {'errors': dict((file_name, [list(error) for error in errors])
+                           for file_name, errors in report.errors.items()),
+            'outcomes': dict((file_name, outcome.name) for file_name, outcome in report.outcomes.items())}
+
+
+def merge_reports(reports: Iterable[LintReport]) -> LintReport:
+    """Merge the reports of disjoint sets of files into a single report."""
+
+    errors = CompactLintErrors()
+    outcomes = {}
+
+    for report in reports:
+        for file_name, file_errors in report.errors.items():
+            errors.add(file_name, file_errors)
+
+        outcomes.update(report.outcomes)
+
+    return LintReport(errors=errors, outcomes=outcomes)
+
+
+def compact(report: LintReport) -> LintReport:
+    """Move a report's errors into a CompactLintErrors."""
+
+    if isinstance(report.errors, CompactLintErrors):
+        return report
+
+    return report._replace(errors=CompactLintErrors(report.errors))
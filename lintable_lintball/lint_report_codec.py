@@ -0,0 +1,364 @@
+"""A compact, versioned binary encoding for LintReports and the Celery messages carrying them."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import struct
+import sys
+import zlib
+from array import array
+from typing import List, Tuple
+
+from lintable_lintball.compact_lint_errors import CompactLintErrors
+from lintable_lintball.lint_outcome import LintOutcome
+from lintable_lintball.lint_report import LintReport, compact
+from lintable_settings.settings import LINTBALL_SETTINGS
+
+# every encoding starts with MAGIC, FORMAT_VERSION and a byte of flags
+MAGIC = b'LNT'
+FORMAT_VERSION = 1
+COMPRESSED = 0x01
+
+HEADER = struct.Struct('<3sBB')
+REPORT_COUNTS = struct.Struct('<IIII')
+LENGTH = struct.Struct('<I')
+INT = struct.Struct('<q')
+FLOAT = struct.Struct('<d')
+
+CONTENT_TYPE = 'application/x-lintable'
+SERIALIZER_NAME = 'lintable'
+
+
+class LintReportCodecError(ValueError):
+    """Raised when data can't be decoded, because it is corrupt or from an unknown version."""
+
+    pass
+
+
+def encode_report(report: LintReport, compress: bool = None) -> bytes:
+    """Encode a LintReport as bytes.
+
+    The messages and filenames go into string tables, and the line numbers,
+    columns and message indexes of every error are written as packed arrays,
+    straight from the report's CompactLintErrors.
+
+    :param report: The report to encode
+    :param compress: Whether to zlib compress the encoding, defaults to compressing
+                     encodings over LINTBALL_SETTINGS['codec']['compress_threshold'] bytes
+    :return bytes:
+    """
+
+    return frame(report_body(report), compress)
+
+
+def decode_report(data: bytes) -> LintReport:
+    """Decode a LintReport encoded by encode_report."""
+
+    body = unframe(bytes(data))
+    report, offset = read_report(body, 0)
+
+    if offset != len(body):
+        raise LintReportCodecError('Trailing data after report')
+
+    return report
+
+
+def dumps(obj, compress: bool = None) -> bytes:
+    """Encode a Celery message body, or any other structure of JSON-like values and LintReports.
+
+    Tuples are encoded as lists, as they would be in JSON.
+    """
+
+    chunks = []  # type: List[bytes]
+    write_value(obj, chunks)
+
+    return frame(b''.join(chunks), compress)
+
+
+def loads(data: bytes):
+    """Decode a structure encoded by dumps."""
+
+    body = unframe(bytes(data))
+    obj, offset = read_value(body, 0)
+
+    if offset != len(body):
+        raise LintReportCodecError('Trailing data after message')
+
+    return obj
+
+
+def register_serializer():
+    """Register dumps and loads as the 'lintable' Celery serializer."""
+
+    from kombu.serialization import register
+
+    register(SERIALIZER_NAME, dumps, loads, content_type=CONTENT_TYPE, content_encoding='binary')
+
+
+def frame(body: bytes, compress: bool = None) -> bytes:
+    """Put the header on an encoding, compressing it if asked to or if it is large."""
+
+    settings = LINTBALL_SETTINGS['codec']
+
+    if compress is None:
+        compress = len(body) > settings['compress_threshold']
+
+    if compress:
+        return HEADER.pack(MAGIC, FORMAT_VERSION, COMPRESSED) + zlib.compress(body, settings['compress_level'])
+
+    return HEADER.pack(MAGIC, FORMAT_VERSION, 0) + body
+
+
+def unframe(data: bytes) -> bytes:
+    """Check an encoding's header, and return its body, decompressed."""
+
+    if len(data) < HEADER.size:
+        raise LintReportCodecError('Truncated header')
+
+    magic, version, flags = HEADER.unpack_from(data)
+
+    if magic != MAGIC:
+        raise LintReportCodecError('Not a lintable encoding')
+
+    if version != FORMAT_VERSION:
+        raise LintReportCodecError('Unsupported format version {version}'.format(version=version))
+
+    body = data[HEADER.size:]
+
+    if flags & COMPRESSED:
+        try:
+            body = zlib.decompress(body)
+        except zlib.error as e:
+            raise LintReportCodecError('Corrupt compressed data: {e}'.format(e=e))
+
+    return body
+
+
+def report_body(report: LintReport) -> bytes:
+    """Encode a report, without a header."""
+
+    errors = compact(report).errors  # type: CompactLintErrors
+
+    filenames = [filename.encode('utf-8', errors='surrogateescape') for filename in errors]
+    messages = [msg.encode('utf-8', errors='surrogateescape') for msg in errors.messages]
+    outcome_files = [filename.encode('utf-8', errors='surrogateescape') for filename in report.outcomes]
+    error_counts = array('I', (len(errors.rows(filename)) for filename in errors))
+
+    return b''.join([REPORT_COUNTS.pack(len(messages), len(filenames), errors.error_count(), len(outcome_files)),
+                     packed('I', (len(msg) for msg in messages)),
+                     packed('I', (len(filename) for filename in filenames)),
+                     packed('I', error_counts),
+                     packed('I', (len(filename) for filename in outcome_files)),
+                     packed('B', (outcome.value for outcome in report.outcomes.values())),
+                     b''.join(messages),
+                     b''.join(filenames),
+                     b''.join(outcome_files),
+                     packed('i', errors.line_numbers),
+                     packed('i', errors.columns),
+                     packed('I', errors.message_indexes)])
+
+
+def read_report(body: bytes, offset: int) -> Tuple[LintReport, int]:
+    """Decode a report, without a header, starting at offset.
+
+    :return: The report, and the offset just past it
+    """
+
+    try:
+        message_count, file_count, error_count, outcome_count = REPORT_COUNTS.unpack_from(body, offset)
+        offset += REPORT_COUNTS.size
+
+        message_lengths, offset = unpacked('I', body, offset, message_count)
+        filename_lengths, offset = unpacked('I', body, offset, file_count)
+        error_counts, offset = unpacked('I', body, offset, file_count)
+        outcome_lengths, offset = unpacked('I', body, offset, outcome_count)
+        outcome_values, offset = unpacked('B', body, offset, outcome_count)
+        messages, offset = strings(body, offset, message_lengths)
+        filenames, offset = strings(body, offset, filename_lengths)
+        outcome_files, offset = strings(body, offset, outcome_lengths)
+        line_numbers, offset = unpacked('i', body, offset, error_count)
+        columns, offset = unpacked('i', body, offset, error_count)
+        message_indexes, offset = unpacked('I', body, offset, error_count)
+
+        if sum(error_counts) != error_count or any(index >= message_count for index in message_indexes):
+            raise LintReportCodecError('Inconsistent report')
+
+        outcomes = dict((filename, LintOutcome(value)) for filename, value in zip(outcome_files, outcome_values))
+    except (struct.error, ValueError) as e:
+        if isinstance(e, LintReportCodecError):
+            raise
+        raise LintReportCodecError('Corrupt report: {e}'.format(e=e))
+
+    errors = CompactLintErrors()
+    errors.messages = messages
+    errors.message_table = dict((msg, index) for index, msg in enumerate(messages))
+    errors.line_numbers = line_numbers
+    errors.columns = columns
+    errors.message_indexes = message_indexes
+
+    start = 0
+    for filename, count in zip(filenames, error_counts):
+        errors.files[filename] = len(errors.starts)
+        errors.starts.append(start)
+        start += count
+
+    return LintReport(errors=errors, outcomes=outcomes), offset
+
+
+def packed(typecode: str, values) -> bytes:
+    """Pack values into a little endian array."""
+
+    values = values if isinstance(values, array) and values.typecode == typecode else array(typecode, values)
+
+    if sys.byteorder == 'big':
+        values = array(typecode, values)
+        values.byteswap()
+
+    return values.tobytes()
+
+
+def unpacked(typecode: str, body: bytes, offset: int, count: int) -> Tuple[array, int]:
+    """Unpack count values of a little endian array starting at offset."""
+
+    values = array(typecode)
+    end = offset + values.itemsize * count
+
+    if end > len(body):
+        raise LintReportCodecError('Truncated data')
+
+    values.frombytes(body[offset:end])
+
+    if sys.byteorder == 'big':
+        values.byteswap()
+
+    return values, end
+
+
+def strings(body: bytes, offset: int, lengths: array) -> Tuple[List[str], int]:
+    """Read a table of UTF-8 strings of the given lengths starting at offset."""
+
+    result = []  # type: List[str]
+
+    for length in lengths:
+        end = offset + length
+
+        if end > len(body):
+            raise LintReportCodecError('Truncated data')
+
+        result.append(body[offset:end].decode('utf-8', errors='surrogateescape'))
+        offset = end
+
+    return result, offset
+
+
+def write_value(value, chunks: List[bytes]):
+    """Encode a value, tagged with its type."""
+
+    if value is None:
+        chunks.append(b'N')
+    elif value is True:
+        chunks.append(b'T')
+    elif value is False:
+        chunks.append(b'F')
+    elif isinstance(value, int) and -2 ** 63 <= value < 2 ** 63:
+        chunks.append(b'i' + INT.pack(value))
+    elif isinstance(value, int):
+        write_sized(b'I', str(value).encode('ascii'), chunks)
+    elif isinstance(value, float):
+        chunks.append(b'f' + FLOAT.pack(value))
+    elif isinstance(value, str):
+        write_sized(b's', value.encode('utf-8', errors='surrogateescape'), chunks)
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        write_sized(b'y', bytes(value), chunks)
+    elif isinstance(value, LintReport):
+        write_sized(b'R', report_body(value), chunks)
+    elif isinstance(value, (list, tuple)):
+        chunks.append(b'l' + LENGTH.pack(len(value)))
+        for item in value:
+            write_value(item, chunks)
+    elif isinstance(value, dict):
+        chunks.append(b'd' + LENGTH.pack(len(value)))
+        for key, item in value.items():
+            write_value(key, chunks)
+            write_value(item, chunks)
+    else:
+        raise TypeError('Unable to encode {type}'.format(type=type(value).__name__))
+
+
+def write_sized(tag: bytes, data: bytes, chunks: List[bytes]):
+    chunks.append(tag + LENGTH.pack(len(data)))
+    chunks.append(data)
+
+
+def read_value(body: bytes, offset: int):
+    """Decode a value written by write_value starting at offset.
+
+    :return: The value, and the offset just past it
+    """
+
+    try:
+        tag = body[offset:offset + 1]
+        offset += 1
+
+        if tag == b'N':
+            return None, offset
+        if tag == b'T':
+            return True, offset
+        if tag == b'F':
+            return False, offset
+        if tag == b'i':
+            return INT.unpack_from(body, offset)[0], offset + INT.size
+        if tag == b'f':
+            return FLOAT.unpack_from(body, offset)[0], offset + FLOAT.size
+
+        length, = LENGTH.unpack_from(body, offset)
+        offset += LENGTH.size
+
+        if tag in (b'I', b's', b'y', b'R'):
+            end = offset + length
+
+            if end > len(body):
+                raise LintReportCodecError('Truncated data')
+
+            if tag == b'I':
+                return int(body[offset:end]), end
+            if tag == b's':
+                return body[offset:end].decode('utf-8', errors='surrogateescape'), end
+            if tag == b'y':
+                return body[offset:end], end
+
+            report, report_end = read_report(body[:end], offset)
+
+            if report_end != end:
+                raise LintReportCodecError('Inconsistent report length')
+
+            return report, end
+
+        if tag == b'l':
+            items = []
+            for _ in range(length):
+                item, offset = read_value(body, offset)
+                items.append(item)
+            return items, offset
+
+        if tag == b'd':
+            items = {}
+            for _ in range(length):
+                key, offset = read_value(body, offset)
+                items[key], offset = read_value(body, offset)
+            return items, offset
+    except struct.error as e:
+        raise LintReportCodecError('Corrupt data: {e}'.format(e=e))
+
+    raise LintReportCodecError('Unknown type tag {tag!r}'.format(tag=tag))
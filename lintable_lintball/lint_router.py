@@ -0,0 +1,172 @@
+"""Routes each file to just the linters that can handle it."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import fnmatch
+import os
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+from lintable_lintball.lint_wrapper import LintWrapper
+
+# the file names, and the interpreters named in shebang lines, of each language
+LANGUAGES = {
+    'c': (['*.c', '*.h'], []),
+    'c++': (['*.cc', '*.cpp', '*.cxx', '*.hh', '*.hpp', '*.hxx'], []),
+    'css': (['*.css'], []),
+    'go': (['*.go'], []),
+    'html': (['*.htm', '*.html'], []),
+    'java': (['*.java'], []),
+    'javascript': (['*.js', '*.jsx', '*.mjs'], ['node', 'nodejs']),
+    'json': (['*.json'], []),
+    'markdown': (['*.md', '*.markdown'], []),
+    'perl': (['*.pl', '*.pm'], ['perl']),
+    'python': (['*.py', '*.pyi'], ['python', 'python2', 'python3']),
+    'ruby': (['*.rb', 'Gemfile', 'Rakefile'], ['ruby']),
+    'shell': (['*.sh', '*.bash'], ['sh', 'bash', 'dash', 'zsh']),
+    'typescript': (['*.ts', '*.tsx'], []),
+    'yaml': (['*.yml', '*.yaml'], []),
+}  # type: Dict[str, Tuple[List[str], List[str]]]
+
+# matches globs that only look at the extension, like *.py; globs with more
+# than one dot, like *.d.ts, aren't what os.path.splitext gives, so they are
+# matched like any other glob
+EXTENSION_GLOB = re.compile(r'^\*(\.[^*?\[\]/.]+)$')
+
+# the most of a file read to find its shebang line
+MAX_SHEBANG_LENGTH = 256
+
+
+class LintRouter(object):
+    """Routes each file to the linters that declared they can handle it.
+
+    Linters declare what they handle with their globs, languages and shebangs
+    attributes; linters that declare none of them handle every file. The
+    routing table is built once, up front, so that most files are routed with
+    a single dictionary lookup on their extension. Only files that a linter
+    could still want by their shebang line are opened.
+    """
+
+    def __init__(self, linters: List[LintWrapper]):
+        self.linters = linters  # type: List[LintWrapper]
+        self.catch_all = set()  # type: Set[int]
+        self.extensions = {}  # type: Dict[str, Set[int]]
+        self.globs = []  # type: List[Tuple[str, int]]
+        self.shebangs = {}  # type: Dict[str, Set[int]]
+
+        for index, linter in enumerate(linters):
+            globs, shebangs = self.declared(linter)
+
+            if globs is None:
+                self.catch_all.add(index)
+                continue
+
+            for glob in globs:
+                match = EXTENSION_GLOB.match(glob)
+
+                if match:
+                    self.extensions.setdefault(match.group(1), set()).add(index)
+                else:
+                    self.globs.append((glob, index))
+
+            for shebang in shebangs:
+                self.shebangs.setdefault(shebang, set()).add(index)
+
+    @staticmethod
+    def declared(linter: LintWrapper) -> Tuple[Optional[List[str]], List[str]]:
+        """The globs and shebang interpreters a linter handles, or None for globs if it handles every file."""
+
+        if linter.globs is None and linter.languages is None and linter.shebangs is None:
+            return None, []
+
+        globs = list(linter.globs or [])
+        shebangs = list(linter.shebangs or [])
+
+        for language in linter.languages or []:
+            language_globs, language_shebangs = LANGUAGES[language]
+            globs.extend(language_globs)
+            shebangs.extend(language_shebangs)
+
+        return globs, shebangs
+
+    def route(self, filename: str, path: Optional[str] = None, data: Optional[bytes] = None) -> List[LintWrapper]:
+        """Find the linters for a file, in the order they were given.
+
+        :param filename: The path of the file within the repo, matched against the globs
+        :param path: Where the file can be read from, to check its shebang line, if it
+                     could still be wanted for one
+        :param data: The contents of the file, to check its shebang line without reading it
+        :return List[LintWrapper]:
+        """
+
+        wanted = set(self.catch_all)
+        wanted.update(self.extensions.get(os.path.splitext(filename)[1], ()))
+
+        basename = os.path.basename(filename)
+        for glob, index in self.globs:
+            # globs without a directory match the file's name wherever it is
+            if index not in wanted and fnmatch.fnmatchcase(filename if '/' in glob else basename, glob):
+                wanted.add(index)
+
+        if (path is not None or data is not None) and self.shebangs and not self.all_wanted(wanted):
+            interpreter = parse_interpreter(data[:MAX_SHEBANG_LENGTH]) if data is not None else read_interpreter(path)
+
+            if interpreter is not None:
+                wanted.update(self.shebangs.get(interpreter, ()))
+
+        return [linter for index, linter in enumerate(self.linters) if index in wanted]
+
+    def all_wanted(self, wanted: Set[int]) -> bool:
+        """Whether every linter that routes on shebangs already has the file."""
+
+        return all(indexes <= wanted for indexes in self.shebangs.values())
+
+
+def read_interpreter(path: str) -> Optional[str]:
+    """Read the name of the interpreter from a file's shebang line, if it has one.
+
+    Both '#!/usr/bin/python3' and '#!/usr/bin/env python3' give 'python3'.
+
+    :param path: The path of the file to read
+    :return Optional[str]:
+    """
+
+    try:
+        with open(path, 'rb') as file:
+            first_line = file.readline(MAX_SHEBANG_LENGTH)
+    except OSError:
+        return None
+
+    return parse_interpreter(first_line)
+
+
+def parse_interpreter(first_line: bytes) -> Optional[str]:
+    """Parse the name of the interpreter from the start of a file, if it has a shebang line."""
+
+    first_line = first_line.split(b'\n', 1)[0]
+
+    if not first_line.startswith(b'#!'):
+        return None
+
+    words = first_line[2:].decode('utf-8', errors='replace').split()
+
+    if words and os.path.basename(words[0]) == 'env':
+        # skip env's own options, like -S
+        words = [word for word in words[1:] if not word.startswith('-')]
+
+    if not words:
+        return None
+
+    return os.path.basename(words[0])
@@ -14,22 +14,143 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import json
+import os
 import subprocess
-from typing import List
+import tempfile
+from typing import Dict, Iterator, List, Optional
 
 from abc import ABC, abstractmethod
 
+from lintable_lintball.lint_daemon import daemon_pool
 from lintable_lintball.lint_error import LintError
+from lintable_lintball.lint_limits import LintTimeout, limit_process
+from lintable_lintball.pool_type import PoolType
+from lintable_metrics.metrics import LINTER_PROCESSES, LINTER_PROCESSES_RUNNING
+from lintable_settings.settings import LINTBALL_SETTINGS
 
 class LintWrapper(ABC):
     """Abstract base class for a contract for linters. No implementation."""
 
+    # the kind of worker pool lintball should run this linter in
+    pool_type = PoolType.THREAD
+
+    # bump this whenever the linter's output changes; linters without a
+    # version never have their results cached
+    version = None  # type: Optional[str]
+
+    # line-local linters judge each line on its own, so they can be limited
+    # to just the lines that changed
+    line_local = False
+
+    # the most files lintball hands to lint_many at once; 1 lints each file
+    # with its own call to lint
+    batch_size = 1
+
+    # how long, in seconds, the linter may spend on a single file; None uses
+    # LINTBALL_SETTINGS['limits']['timeout']
+    timeout = None  # type: Optional[float]
+
+    # linters that implement lint_bytes themselves can be handed a file's
+    # contents straight from git, without the file being written to disk
+    reads_bytes = False
+
+    # the files the linter handles, as globs like '*.py', names of languages
+    # in lint_router.LANGUAGES, and interpreters named in shebang lines; a
+    # linter that declares none of them handles every file
+    globs = None  # type: Optional[List[str]]
+    languages = None  # type: Optional[List[str]]
+    shebangs = None  # type: Optional[List[str]]
+
     @abstractmethod
     def lint(self, filename: str) -> List[LintError]:
         """Lint a given file by filename."""
 
         return None
 
+    async def lint_async(self, filename: str) -> List[LintError]:
+        """Lint a given file by filename, as a coroutine.
+
+        Linters with a pool_type of PoolType.ASYNC should override this to
+        await their IO; this implementation runs lint in the loop's default
+        executor. Before Python 3.8 LintPool calls lint in its thread pool
+        instead, so those linters need a working lint too.
+        """
+
+        return await asyncio.get_event_loop().run_in_executor(None, self.lint, filename)
+
+    def lint_many(self, filenames: List[str]) -> Dict[str, List[LintError]]:
+        """Lint several files at once, returning the errors of each file by filename.
+
+        Linters with a batch_size above 1 should override this to lint the
+        files together; this implementation lints them one at a time.
+        """
+
+        return dict((filename, self.lint(filename)) for filename in filenames)
+
+    def lint_bytes(self, filename: str, data: bytes) -> List[LintError]:
+        """Lint the contents of a file, given the file's path in the repo.
+
+        Linters with reads_bytes set should override this to lint the data in
+        memory; this implementation writes it to a temporary file, with the
+        same name, and lints that.
+        """
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, os.path.basename(filename))
+
+            with open(path, 'wb') as file:
+                file.write(data)
+
+            return self.lint(path)
+
+    def lint_lines(self, filename: str, lines: List[range]) -> List[LintError]:
+        """Lint only the given ranges of line numbers of a given file.
+
+        Line-local linters should override this to skip the other lines; this
+        implementation lints the whole file and drops errors outside the ranges.
+        """
+
+        return [error for error in self.lint(filename)
+                if any(error.line_number in line_range for line_range in lines)]
+
+    def lint_bytes_lines(self, filename: str, data: bytes, lines: List[range]) -> List[LintError]:
+        """Lint only the given ranges of line numbers of the contents of a file.
+
+        Line-local linters with reads_bytes set should override this to skip
+        the other lines; this implementation lints all of the contents and
+        drops errors outside the ranges.
+        """
+
+        return [error for error in self.lint_bytes(filename, data)
+                if any(error.line_number in line_range for line_range in lines)]
+
+    def lint_timeout(self) -> float:
+        """How long, in seconds, the linter may spend on a single file."""
+
+        return self.timeout if self.timeout is not None else LINTBALL_SETTINGS['limits']['timeout']
+
+    def config(self) -> dict:
+        """The settings that can change what this linter reports."""
+
+        return {}
+
+    def identity(self) -> Optional[str]:
+        """Identifies the linter, its version and its configuration.
+
+        Two linters with the same identity must report the same errors for the
+        same file contents, so that their results can be cached.
+        """
+
+        if self.version is None:
+            return None
+
+        return '{module}.{name}:{version}:{config}'.format(module=type(self).__module__,
+                                                           name=type(self).__name__,
+                                                           version=self.version,
+                                                           config=json.dumps(self.config(), sort_keys=True))
+
 class FileLintWrapper(LintWrapper):
     """Abstract base class for file-based linters.
 
@@ -38,23 +159,185 @@ class FileLintWrapper(LintWrapper):
 
     lint_command = "/bin/echo"
 
+    # the longest command line, in bytes, lint_files will build; well below
+    # ARG_MAX, which also has to hold the environment
+    max_command_length = 128 * 1024
+
+    # the command line that starts the linter as a daemon, for linters that
+    # support it; lint_file then sends files to a pool of warm daemons instead
+    # of starting a process for each file
+    daemon_command = None  # type: Optional[List[str]]
+
+    # the longest line of output lint_file_async will read from the linter
+    max_line_length = 1024 * 1024
+
+    def config(self) -> dict:
+        """The settings that can change what this linter reports."""
+
+        return {'lint_command': self.lint_command, 'daemon_command': self.daemon_command}
+
     def lint_file(self, filename: str, optional_parameters: List[str] = None) -> List[LintError]:
         """Have the linter lint a given file."""
 
+        if self.daemon_command is not None:
+            result = daemon_pool(self.daemon_command).request('lint', {'filename': filename,
+                                                                       'parameters': optional_parameters or []})
+            return self.parse_daemon_output(result)
+
         call_parameters = [self.lint_command, filename]
 
         if optional_parameters is not None:
             call_parameters.extend(optional_parameters)
 
-        lint_result = subprocess.run(call_parameters,
-                                     stdout=subprocess.PIPE,
-                                     stderr=subprocess.PIPE,
-                                     universal_newlines=True)
+        lint_result = self.run_linter(call_parameters, self.lint_timeout())
 
         return self.parse_linter_output(lint_result)
 
+    def run_linter(self, call_parameters: List[str], timeout: float) -> subprocess.CompletedProcess:
+        """Run the linter within its resource limits, killing it if it runs past timeout seconds."""
+
+        command = os.path.basename(call_parameters[0])
+        LINTER_PROCESSES.labels(command=command).inc()
+        running = LINTER_PROCESSES_RUNNING.labels(command=command)
+
+        with subprocess.Popen(call_parameters,
+                              stdout=subprocess.PIPE,
+                              stderr=subprocess.PIPE,
+                              universal_newlines=True) as process, running.track_inprogress():
+            limit_process(process.pid)
+
+            try:
+                stdout, stderr = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.communicate()
+                raise LintTimeout('{linter} timed out after {timeout} seconds'.format(linter=self, timeout=timeout))
+
+        return subprocess.CompletedProcess(call_parameters, process.returncode, stdout, stderr)
+
     @abstractmethod
     def parse_linter_output(self, output: str) -> List[LintError]:
         """Process output from the linter."""
 
         return None
+
+    async def lint_file_async(self, filename: str, optional_parameters: List[str] = None) -> List[LintError]:
+        """Have the linter lint a given file without blocking the event loop.
+
+        The linter's stdout is handed to parse_linter_line one line at a time
+        as it is produced, rather than being collected in memory first.
+        """
+
+        call_parameters = [self.lint_command, filename]
+
+        if optional_parameters is not None:
+            call_parameters.extend(optional_parameters)
+
+        command = os.path.basename(call_parameters[0])
+        LINTER_PROCESSES.labels(command=command).inc()
+
+        process = await asyncio.create_subprocess_exec(*call_parameters,
+                                                       stdout=subprocess.PIPE,
+                                                       stderr=subprocess.DEVNULL,
+                                                       limit=self.max_line_length)
+
+        limit_process(process.pid)
+        LINTER_PROCESSES_RUNNING.labels(command=command).inc()
+
+        lint_errors = []
+
+        async def read_output():
+            while True:
+                line = await process.stdout.readline()
+
+                if not line:
+                    break
+
+                lint_errors.extend(self.parse_linter_line(line.decode('utf-8', errors='replace')))
+
+            await process.wait()
+
+        try:
+            await asyncio.wait_for(read_output(), timeout=self.lint_timeout())
+        except BaseException as e:
+            # a timeout, a failing parser or a cancelled job shouldn't leave the linter behind
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+
+            if isinstance(e, asyncio.TimeoutError):
+                raise LintTimeout('{linter} timed out after {timeout} seconds'.format(linter=self,
+                                                                                     timeout=self.lint_timeout()))
+            raise
+        finally:
+            LINTER_PROCESSES_RUNNING.labels(command=command).dec()
+
+        return lint_errors
+
+    def parse_linter_line(self, line: str) -> List[LintError]:
+        """Process a single line of output from the linter.
+
+        Linters that support lint_file_async must override this.
+        """
+
+        raise NotImplementedError('{linter} does not support streaming its output'.format(linter=self))
+
+    def parse_daemon_output(self, result) -> List[LintError]:
+        """Process the result of a daemon's lint request.
+
+        By default the result is expected to be a list of [line_number, column, msg].
+        """
+
+        return [LintError(line_number=line_number, column=column, msg=msg) for line_number, column, msg in result]
+
+    def lint_files(self, filenames: List[str], optional_parameters: List[str] = None) -> Dict[str, List[LintError]]:
+        """Have the linter lint several files, with as few linter processes as possible.
+
+        The linter is called with the optional parameters followed by as many
+        filenames as fit in max_command_length, and its output is split back up
+        by parse_batch_linter_output.
+        """
+
+        base_parameters = [self.lint_command]
+
+        if optional_parameters is not None:
+            base_parameters.extend(optional_parameters)
+
+        lint_errors = dict((filename, []) for filename in filenames)
+
+        for batch in self.split_command_line(base_parameters, filenames):
+            lint_result = self.run_linter(base_parameters + batch, self.lint_timeout() * len(batch))
+
+            lint_errors.update(self.parse_batch_linter_output(lint_result, batch))
+
+        return lint_errors
+
+    def split_command_line(self, base_parameters: List[str], filenames: List[str]) -> Iterator[List[str]]:
+        """Split filenames into batches that fit on a command line after base_parameters."""
+
+        # each argument also costs a pointer and a terminating NUL
+        base_length = sum(len(parameter.encode()) + 9 for parameter in base_parameters)
+        batch = []  # type: List[str]
+        length = base_length
+
+        for filename in filenames:
+            filename_length = len(filename.encode()) + 9
+
+            if batch and length + filename_length > self.max_command_length:
+                yield batch
+                batch = []
+                length = base_length
+
+            batch.append(filename)
+            length += filename_length
+
+        if batch:
+            yield batch
+
+    def parse_batch_linter_output(self, output: str, filenames: List[str]) -> Dict[str, List[LintError]]:
+        """Process output from the linter for several files, splitting it up by filename.
+
+        Linters that support lint_files must override this.
+        """
+
+        raise NotImplementedError('{linter} does not support linting files in batches'.format(linter=self))
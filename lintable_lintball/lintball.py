@@ -14,27 +14,44 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import concurrent.futures
 import json
 import logging
 import os
-from typing import List
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
 from urllib.parse import urljoin
 
 import github
+from celery import chord
 
 from lintable_db.database import DatabaseHandler
 from lintable_db.models import User, Repo
 from lintable_git.git_handler import GitHandler
+from lintable_git.hunk import a_ranges, b_ranges
+from lintable_lintball.compact_lint_errors import CompactLintErrors
+from lintable_lintball.error_diff import new_errors
+from lintable_lintball.lint_cache import LintCache, default_lint_cache
 from lintable_lintball.lint_error import LintError
-from lintable_lintball.lint_report import LintReport
+from lintable_lintball.lint_limits import LintSkipped, LintTimeout
+from lintable_lintball.lint_outcome import LintOutcome
+from lintable_lintball.lint_pool import LintPool
+from lintable_lintball.lint_report import LintReport, merge_reports
+from lintable_lintball.lint_report_codec import SERIALIZER_NAME
+from lintable_lintball.lint_router import LintRouter
 from lintable_lintball.lint_wrapper import LintWrapper
 from lintable_lintball.runner import runner
 from lintable_linters.whitespace_file_linter import WhitespaceFileLinter
 from lintable_processes.db_handler import DBHandler
 from lintable_processes.log_handler import LogHandler
+from lintable_processes.metrics_handler import MetricsHandler
 from lintable_processes.process_handler import ProcessHandler
 from lintable_processes.status_handler import StatusHandler
-from lintable_settings.settings import LINTWEB_SETTINGS
+from lintable_processes.tracing_handler import TracingHandler
+from lintable_settings.settings import LINTBALL_SETTINGS, LINTWEB_SETTINGS
+from lintable_tracing.tracing import TRACER
 
 
 @runner.task(bind=True, serializer='json')
@@ -64,9 +81,6 @@ def lint_github(context, payload: json, target_url: str):
         return
 
     full_name = payload['repository']['full_name']
-    repo_url = 'https://{oauth_key}@github.com/{full_name}.git'.format(
-        oauth_key=oauth_key,
-        full_name=full_name)
 
     sha1_a = payload['pull_request']['head']['sha']
     sha1_b = payload['pull_request']['base']['sha']
@@ -81,36 +95,157 @@ def lint_github(context, payload: json, target_url: str):
     target_url = target_url + '/'
     target_url = urljoin(target_url, str(task_id))
 
+    # everything the tasks of a sharded job need to pick it up again; the
+    # oauth token is looked up by each task so it never goes through the broker
+    job = dict(uuid=str(task_id),
+               github_id=github_id,
+               full_name=full_name,
+               repo_id=repo_id,
+               sha1_a=sha1_a,
+               sha1_b=sha1_b,
+               target_url=target_url)
+
+    process_handler = github_process_handler(job, oauth_key, logger)
+
+    git_handler = GitHandler(process_handler=process_handler,
+                             repo_url=github_repo_url(job, oauth_key),
+                             sha1_a=sha1_a,
+                             sha1_b=sha1_b,
+                             repo_id=str(repo_id))
+
+    if LINTBALL_SETTINGS['chord']['batch_size'] > 0:
+        lint_chord(git_handler, process_handler, job)
+    else:
+        lint_process(git_handler, process_handler)
+
+    return
+
+
+@runner.task(bind=True, serializer=SERIALIZER_NAME)
+def lint_batch(context, job: dict, files: List[str]) -> Tuple[LintReport, dict]:
+    """Receive a task to lint a batch of the changed files of a sharded job.
+
+    :return Tuple[LintReport, dict]: The partial LintReport for the batch, and the to_dict of its ProcessTimings
+    """
+
+    logger = logging.getLogger()
+    oauth_key = github_oauth_key(job)
+    repo_url = github_repo_url(job, oauth_key)
+
+    process_handler = ProcessHandler(repo=repo_url,
+                                     uuid=job['uuid'],
+                                     handlers=[LogHandler(logger),
+                                               DBHandler(repo_id=job['repo_id']),
+                                               MetricsHandler(),
+                                               TracingHandler()])
+
+    git_handler = GitHandler(process_handler=process_handler,
+                             repo_url=repo_url,
+                             sha1_a=job['sha1_a'],
+                             sha1_b=job['sha1_b'],
+                             repo_id=str(job['repo_id']))
+
+    process_handler.resume()
+
+    git_handler.clone_repo()
+
+    linters = default_linters()
+
+    git_handler.retrieve_changed_files_from_commit(only=set(files), write_files=needs_files(linters))
+
+    # the hunks are only needed to lint just the changed lines
+    if LINTBALL_SETTINGS['lint']['hunks_only']:
+        git_handler.retrieve_changed_hunks_from_commit(only=set(files))
+
+    report = lint_files(process_handler, linters)
+
+    # the batch doesn't finish the job, so its timings go to merge_batches
+    process_handler.timings.stop()
+
+    return report, process_handler.timings.to_dict()
+
+
+@runner.task(bind=True, serializer=SERIALIZER_NAME)
+def merge_batches(context, results: List[Tuple[LintReport, dict]], job: dict, timings: Optional[dict] = None):
+    """Receive the partial reports of a sharded job, then report and finish it.
+
+    The timings of each batch, and of the task that split the job up, are
+    added to this task's, so the job is timed as a whole once it finishes.
+
+    :param timings: The to_dict of the ProcessTimings of the task that split the job into batches
+    """
+
+    logger = logging.getLogger()
+
+    process_handler = github_process_handler(job, github_oauth_key(job), logger)
+
+    process_handler.resume()
+
+    for part_timings in [timings] + [batch_timings for _, batch_timings in results]:
+        if part_timings is not None:
+            process_handler.timings.merge(part_timings)
+
+    process_handler.report(merge_reports(report for report, _ in results))
+
+    process_handler.finish()
+
+    return
+
+
+def github_oauth_key(job: dict) -> str:
+    """Look up the oauth token of the owner of a job's repo."""
+
+    return DatabaseHandler.get_user(job['github_id']).get_oauth_token()
+
+
+def github_repo_url(job: dict, oauth_key: str) -> str:
+    """The URL to clone a job's repo from, authenticated with oauth_key."""
+
+    return 'https://{oauth_key}@github.com/{full_name}.git'.format(
+        oauth_key=oauth_key,
+        full_name=job['full_name'])
+
+
+def github_process_handler(job: dict, oauth_key: str, logger: logging.Logger) -> ProcessHandler:
+    """Create a ProcessHandler reporting a job to GitHub, the log and the database."""
+
     client_id = LINTWEB_SETTINGS['github']['CLIENT_ID']
     client_secret = LINTWEB_SETTINGS['github']['CLIENT_SECRET']
 
     github_api = github.Github(login_or_token=oauth_key, client_id=client_id,
                                client_secret=client_secret)
 
-    logger.error('getting repo for {full_name}'.format(full_name=full_name))
+    logger.error('getting repo for {full_name}'.format(full_name=job['full_name']))
 
-    github_repo = github_api.get_repo(full_name_or_id=full_name, lazy=False)
+    with TRACER.span('github.get_repo'):
+        github_repo = github_api.get_repo(full_name_or_id=job['full_name'], lazy=False)
 
     logger.error('repo: {repo}'.format(repo=github_repo.id))
 
-    github_commit = github_repo.get_commit(sha1_a)
+    with TRACER.span('github.get_commit'):
+        github_commit = github_repo.get_commit(job['sha1_a'])
 
-    logger.error('target_url for status: {target_url}'.format(target_url=target_url))
+    logger.error('target_url for status: {target_url}'.format(target_url=job['target_url']))
 
-    process_handler = ProcessHandler(repo=repo_url,
-                                     uuid=task_id,
-                                     handlers=[StatusHandler(github_commit=github_commit, target_url=target_url),
-                                               LogHandler(logger),
-                                               DBHandler(repo_id=repo_id)])
+    return ProcessHandler(repo=github_repo_url(job, oauth_key),
+                          uuid=job['uuid'],
+                          handlers=[StatusHandler(github_commit=github_commit, target_url=job['target_url']),
+                                    LogHandler(logger),
+                                    DBHandler(repo_id=job['repo_id']),
+                                    MetricsHandler(),
+                                    TracingHandler()])
 
-    git_handler = GitHandler(process_handler=process_handler,
-                             repo_url=repo_url,
-                             sha1_a=sha1_a,
-                             sha1_b=sha1_b)
 
-    lint_process(git_handler, process_handler)
+def default_linters() -> List[LintWrapper]:
+    """The linters to run when none are given."""
 
-    return
+    return [WhitespaceFileLinter()]
+
+
+def needs_files(linters: List[LintWrapper]) -> bool:
+    """Whether any of the linters needs the changed files written to disk, rather than kept in memory."""
+
+    return not all(linter.reads_bytes for linter in linters)
 
 
 def lint_process(git_handler: GitHandler,
@@ -118,57 +253,263 @@ def lint_process(git_handler: GitHandler,
                  linters=None):
     """Get the files we're interested in, then start the linter."""
 
+    git_handler.started()
+
+    git_handler.clone_repo()
+
+    lint_cloned(git_handler, process_handler, linters)
+
+    return
+
+
+def lint_cloned(git_handler: GitHandler,
+                process_handler: ProcessHandler,
+                linters=None):
+    """Get the files we're interested in from a cloned repo, then start the linter."""
+
     if linters is None:
-        linters = [WhitespaceFileLinter()]
+        linters = default_linters()
+
+    git_handler.retrieve_changed_files_from_commit(write_files=needs_files(linters))
+
+    # the hunks are only needed to lint just the changed lines
+    if LINTBALL_SETTINGS['lint']['hunks_only']:
+        git_handler.retrieve_changed_hunks_from_commit()
+
+    lintball(process_handler, linters)
+
+    return
+
+
+def lint_chord(git_handler: GitHandler,
+               process_handler: ProcessHandler,
+               job: dict):
+    """Split a job's changed files into batches and lint them across the workers.
+
+    Each batch is linted by a lint_batch task, and merge_batches reports the
+    merged results once every batch is done. Jobs that fit in a single batch
+    are linted right here instead.
+    """
+
+    batch_size = LINTBALL_SETTINGS['chord']['batch_size']
 
     git_handler.started()
 
     git_handler.clone_repo()
 
-    git_handler.retrieve_changed_files_from_commit()
+    a_files, _ = git_handler.get_files_changed_between_commits(git_handler.commit_a, git_handler.commit_b)
 
-    lintball(process_handler, linters)
+    if len(a_files) <= batch_size:
+        lint_cloned(git_handler, process_handler)
+        return
+
+    process_handler.retrieve_changed_file_set(git_handler.commit_a, git_handler.commit_b)
+
+    # pin the job to the resolved commits, so every batch lints the same ones
+    job = dict(job, sha1_a=git_handler.commit_a.hexsha, sha1_b=git_handler.commit_b.hexsha)
+
+    files = sorted(a_files)
+    batches = [files[start:start + batch_size] for start in range(0, len(files), batch_size)]
+
+    chord(lint_batch.s(job, batch) for batch in batches)(merge_batches.s(job, process_handler.timings.to_dict()))
 
     return
 
 
-def lintball(handler: ProcessHandler, linters: List[LintWrapper]):
-    """Run a linter or linters."""
+def lintball(handler: ProcessHandler, linters: List[LintWrapper], pool: Optional[LintPool] = None,
+             cache: Optional[LintCache] = None):
+    """Run a linter or linters.
 
-    lint_errors = {}
-    LOGGER = logging.getLogger()
+    Each file is only linted by the linters that handle it, as routed by a
+    LintRouter. Files are fanned out across a LintPool, but their results are collected,
+    and reported to the handler, in the order of handler.files. Blobs that
+    have already been linted are served from the LintCache instead.
 
-    for filename in handler.files:
-        a_file = os.path.join(handler.a_path, filename)
-        b_file = os.path.join(handler.b_path, filename)
-
-        a_results = lint(a_file, linters, handler) if os.path.exists(
-            a_file) else []
-        b_results = lint(b_file, linters, handler) if os.path.exists(
-            b_file) else []
-
-        LOGGER.error('a_results: {}'.format(a_results))
-        LOGGER.error('b_results: {}'.format(b_results))
-        lint_errors[filename] = [results for results in a_results if
-                                 results not in b_results]
-        LOGGER.error('filename: {}'.format(filename))
-        LOGGER.error('lint_errors[filename]: {}'.format(lint_errors[filename]))
-    lint_report = LintReport(errors=lint_errors)
-    LOGGER.error('lint_report: {}'.format(lint_report))
-    handler.report(lint_report)
+    If the handler has the changed hunks of each file, they are used to tell
+    which errors were already present in b, and in hunks_only mode line-local
+    linters only lint the changed lines.
+    """
+
+    handler.report(lint_files(handler, linters, pool, cache))
 
     handler.finish()
 
     return
 
 
+def lint_files(handler: ProcessHandler, linters: List[LintWrapper], pool: Optional[LintPool] = None,
+               cache: Optional[LintCache] = None) -> LintReport:
+    """Lint the files retrieved by the handler, without reporting the results.
+
+    Each linter has its own per-file timeout, and the whole job has
+    LINTBALL_SETTINGS['limits']['job_timeout'] seconds. Linters that time out
+    or fail don't fail the job: the errors of the other linters are still
+    reported, and the file is marked with a LintOutcome in the report.
+
+    How long each linter took on each file is recorded in the handler's timings.
+    """
+
+    lint_errors = CompactLintErrors()
+    outcomes = {}
+    LOGGER = logging.getLogger()
+
+    lint_pool = pool if pool is not None else LintPool()
+    lint_cache = cache if cache is not None else default_lint_cache()
+    deadline = time.monotonic() + LINTBALL_SETTINGS['limits']['job_timeout']
+
+    handler.lint_files()
+
+    try:
+        # handler.files holds a file once per commit it was retrieved from
+        filenames = list(OrderedDict.fromkeys(handler.files))
+        router = LintRouter(linters)
+        pending = []
+
+        for filename in filenames:
+            a_file = os.path.join(handler.a_path, filename)
+            b_file = os.path.join(handler.b_path, filename)
+
+            # files kept in memory are linted from their contents, without touching the disk
+            a_data = handler.file_contents(handler.a_commit, filename)
+            b_data = handler.file_contents(handler.b_commit, filename)
+            a_exists = a_data is not None or os.path.exists(a_file)
+            b_exists = b_data is not None or os.path.exists(b_file)
+
+            file_linters = router.route(filename, a_file if a_exists else b_file, a_data if a_exists else b_data)
+
+            if not file_linters:
+                continue
+
+            a_blob_id = handler.blob_id(handler.a_commit, filename)
+            b_blob_id = handler.blob_id(handler.b_commit, filename)
+
+            hunks = handler.hunks.get(filename, []) if handler.hunks is not None else None
+            hunks_only = hunks is not None and LINTBALL_SETTINGS['lint']['hunks_only']
+            a_lines = a_ranges(hunks) if hunks_only else None
+            b_lines = b_ranges(hunks) if hunks_only else None
+
+            a_futures = submit(a_file, a_blob_id, a_lines, file_linters, lint_pool, lint_cache,
+                               a_data) if a_exists else []
+            b_futures = submit(b_file, b_blob_id, b_lines, file_linters, lint_pool, lint_cache,
+                               b_data) if b_exists else []
+
+            pending.append((filename, file_linters, hunks, a_file, a_data, a_futures, b_file, b_data, b_futures))
+
+        lint_pool.flush()
+
+        for filename, file_linters, hunks, a_file, a_data, a_futures, b_file, b_data, b_futures in pending:
+            a_linter_results, a_outcome = collect(a_file, file_linters, a_futures, handler, deadline)
+            b_linter_results, b_outcome = collect(b_file, file_linters, b_futures, handler, deadline)
+
+            record_times(filename, file_linters, a_futures, handler)
+            record_times(filename, file_linters, b_futures, handler)
+
+            if a_outcome is not None or b_outcome is not None:
+                outcomes[filename] = a_outcome or b_outcome
+
+            # without b's errors there is no telling which of a's errors are new
+            a_results = [error for index, errors in enumerate(a_linter_results)
+                         if index >= len(b_linter_results) or b_linter_results[index] is not None
+                         for error in errors or []]
+            b_results = [error for errors in b_linter_results for error in errors or []]
+
+            LOGGER.error('a_results: {}'.format(a_results))
+            LOGGER.error('b_results: {}'.format(b_results))
+            lint_errors.add(filename, new_errors(a_results, b_results, hunks=hunks, a_file=a_file, b_file=b_file,
+                                                 a_data=a_data, b_data=b_data))
+            LOGGER.error('filename: {}'.format(filename))
+            LOGGER.error('lint_errors[filename]: {}'.format(lint_errors[filename]))
+    finally:
+        if pool is None:
+            # don't wait on linters that have already run out of time
+            lint_pool.shutdown(wait=LintOutcome.TIMED_OUT not in outcomes.values())
+
+    lint_report = LintReport(errors=lint_errors, outcomes=outcomes)
+    LOGGER.error('lint_report: {}'.format(lint_report))
+
+    return lint_report
+
+
 def lint(filename: str, linters: List[LintWrapper], handler: ProcessHandler) -> List[LintError]:
     """Run a linter or linters."""
 
     lint_errors = []
 
-    for linter in linters:
+    for linter in LintRouter(linters).route(filename, filename):
         handler.lint_file(linter=str(linter), file=filename)
         lint_errors.extend(linter.lint(filename))
 
     return lint_errors
+
+
+def submit(filename: str, blob_id: Optional[str], lines: Optional[List[range]], linters: List[LintWrapper],
+           pool: LintPool, cache: Optional[LintCache], data: Optional[bytes] = None) -> List[Future]:
+    """Queue a file up on a LintPool for each linter, unless its results are cached.
+
+    When lines is given, line-local linters only lint those ranges of lines.
+    When data is given, the linters lint the file's contents rather than reading filename.
+    """
+
+    if cache is None:
+        return pool.submit_all(linters, filename, lines, data)
+
+    return [cache.submit(pool, linter, filename, blob_id, lines if linter.line_local else None, data)
+            for linter in linters]
+
+
+def record_times(filename: str, linters: List[LintWrapper], futures: List[Future], handler: ProcessHandler):
+    """Record how long each linter took on a file, for the futures that ran to completion.
+
+    :param filename: The path of the file within the repo
+    :param linters: The linters the file was queued up for
+    :param futures: The futures of each linter, in the same order as linters
+    :param handler: The handler whose timings to record them in
+    """
+
+    for linter, future in zip(linters, futures):
+        seconds = getattr(future, 'lint_seconds', None)
+
+        if seconds is not None and future.done() and not future.cancelled():
+            handler.lint_file_time(linter=str(linter), file=filename, seconds=seconds)
+
+
+def collect(filename: str, linters: List[LintWrapper], futures: List[Future], handler: ProcessHandler,
+            deadline: Optional[float] = None) -> Tuple[List[Optional[List[LintError]]], Optional[LintOutcome]]:
+    """Gather the results of a file queued up on a LintPool, in linter order.
+
+    :param filename: The path of the file that was linted
+    :param linters: The linters the file was queued up for
+    :param futures: The futures of each linter, in the same order as linters
+    :param handler: The handler to notify as each linter's results are collected
+    :param deadline: The time.monotonic() by which the job has to be done, or None to wait indefinitely
+    :return: The errors of each linter, or None for linters that timed out,
+             failed or skipped the file, and the outcome of the file if any linter did
+    """
+
+    linter_results = []  # type: List[Optional[List[LintError]]]
+    file_outcome = None  # type: Optional[LintOutcome]
+
+    for linter, future in zip(linters, futures):
+        handler.lint_file(linter=str(linter), file=filename)
+
+        outcome = None
+
+        try:
+            timeout = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+            linter_results.append(future.result(timeout=timeout))
+        except (LintTimeout, concurrent.futures.TimeoutError):
+            future.cancel()
+            outcome = LintOutcome.TIMED_OUT
+        except LintSkipped as e:
+            logging.getLogger().info('Linter {linter} skipped {file}: {e}'.format(linter=linter, file=filename, e=e))
+            outcome = LintOutcome.SKIPPED
+        except Exception as e:
+            logging.getLogger().error('Linter {linter} failed on {file}: {e}'.format(linter=linter, file=filename, e=e))
+            outcome = LintOutcome.FAILED
+
+        if outcome is not None:
+            linter_results.append(None)
+            handler.lint_file_outcome(linter=str(linter), file=filename, outcome=outcome)
+            file_outcome = file_outcome or outcome
+
+    return linter_results, file_outcome
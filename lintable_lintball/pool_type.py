@@ -0,0 +1,24 @@
+"""Enum for the kind of worker pool a linter should run in."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from enum import Enum
+
+class PoolType(Enum):
+    """Enum for the kind of worker pool a linter should run in."""
+
+    THREAD = 1  # the linter waits on IO or subprocesses, so threads are enough
+    PROCESS = 2  # the linter is CPU bound in Python and needs its own process
+    ASYNC = 3  # the linter implements lint_async, so it runs on an event loop, or threads before Python 3.8
@@ -15,10 +15,21 @@
 # limitations under the License.
 
 import logging
+import os
+import time
 
 from celery import Celery
+from celery.signals import before_task_publish, task_postrun, task_prerun, worker_init, worker_process_shutdown
 
+from lintable_lintball.lint_report_codec import SERIALIZER_NAME, register_serializer
+from lintable_metrics.exporter import start_exporter
+from lintable_metrics.metrics import QUEUE_WAIT_SECONDS
+from lintable_metrics.registry import clear_other_processes, multiprocess_path, process_dead
 from lintable_settings.settings import LINTBALL_SETTINGS
+from lintable_tracing.tracing import finish_task, header, inject, start_task
+
+# LintReports travel between tasks in the compact lint_report_codec encoding
+register_serializer()
 
 runner = Celery('lintable_lintball.runner',
                 broker=LINTBALL_SETTINGS['celery']['broker'],
@@ -28,13 +39,83 @@ runner = Celery('lintable_lintball.runner',
 # Optional configuration, see the application user guide.
 runner.conf.update(
     CELERY_TASK_RESULT_EXPIRES=3600,
-    CELERY_ACCEPT_CONTENT=['json'],
+    CELERY_ACCEPT_CONTENT=['json', SERIALIZER_NAME],
     CELERY_TASK_SERIALIZER='json',
-    CELERY_RESULT_SERIALIZER='json',
+    CELERY_RESULT_SERIALIZER=SERIALIZER_NAME,
     CELERY_IGNORE_RESULT=False,
     CELERY_CHORD_PROPAGATES=True
 )
 
+
+@worker_init.connect
+def start_metrics_exporter(**kwargs):
+    """Serve the worker's metrics, summed across its pool processes, once it starts.
+
+    The pool processes are forked after this, so they share their metrics
+    through the same directory.
+    """
+
+    port = LINTBALL_SETTINGS['metrics']['port']
+
+    if port == 0:
+        return
+
+    path = multiprocess_path()
+
+    if path is None:
+        LOGGER.warning('Not serving metrics: LINTBALL_METRICS_PATH isn\'t set, so the pool processes '
+                       'can\'t share theirs')
+        return
+
+    if not LINTBALL_SETTINGS['metrics']['token']:
+        LOGGER.warning('Not serving metrics: LINTBALL_METRICS_TOKEN isn\'t set')
+        return
+
+    # metrics left by a previous run of the worker would be counted twice
+    clear_other_processes(path)
+
+    start_exporter(port, LINTBALL_SETTINGS['metrics']['token'])
+
+
+@worker_process_shutdown.connect
+def forget_process_gauges(pid=None, **kwargs):
+    """Stop counting what a pool process's gauges say is running once it exits."""
+
+    process_dead(pid or os.getpid())
+
+
+@before_task_publish.connect
+def propagate_trace(headers=None, **kwargs):
+    """Send the current trace along with each task, so the task continues it."""
+
+    if headers is not None:
+        inject(headers)
+
+
+@task_prerun.connect
+def start_task_span(task_id=None, task=None, **kwargs):
+    """Trace each task, in the trace it was sent from or one keyed by its own id."""
+
+    start_task(task_id, task.name, task.request)
+
+
+@task_prerun.connect
+def observe_queue_wait(task=None, **kwargs):
+    """Record how long each task spent on the broker, from the enqueued_at header it was sent with."""
+
+    enqueued_at = header(task.request, 'enqueued_at')
+
+    if enqueued_at is not None:
+        QUEUE_WAIT_SECONDS.labels(task=task.name.rsplit('.', 1)[-1]).observe(max(0.0, time.time() - float(enqueued_at)))
+
+
+@task_postrun.connect
+def finish_task_span(task_id=None, state=None, **kwargs):
+    """Finish tracing each task, sending its spans to the exporter."""
+
+    finish_task(task_id, state)
+
+
 LOG_FORMAT = ('%(levelname) -10s %(asctime)s %(name) -30s %(funcName) '
               '-35s %(lineno) -5d: %(message)s')
 LOGGER = logging.getLogger(__name__)
@@ -0,0 +1,97 @@
+"""Tests for CompactLintErrors."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import tracemalloc
+import unittest
+
+from lintable_lintball.compact_lint_errors import CompactLintErrors
+from lintable_lintball.lint_error import LintError
+from lintable_lintball.lint_report import LintReport, compact
+
+
+def make_errors(files: int, errors_per_file: int):
+    return dict(('file_{}.py'.format(x),
+                 [LintError(line_number=1000 + y, column=300 + y % 80,
+                            msg="Found trailing whitespace: '{}'".format('x' * (y % 10)))
+                  for y in range(errors_per_file)])
+                for x in range(files))
+
+
+class CompactLintErrorsTests(unittest.TestCase):
+    """Tests for CompactLintErrors."""
+
+    def setUp(self):
+        self.errors = make_errors(5, 20)
+        self.errors['clean.py'] = []
+
+    def test_reads_like_a_dict_of_lists(self):
+        """Make sure the compact errors iterate, index and compare like the originals."""
+
+        errors = CompactLintErrors(self.errors)
+
+        self.assertEqual(list(errors.keys()), list(self.errors.keys()))
+        self.assertEqual(errors, self.errors)
+        self.assertEqual(errors['file_3.py'][4], self.errors['file_3.py'][4])
+        self.assertEqual(errors['file_3.py'][-2:], self.errors['file_3.py'][-2:])
+        self.assertEqual(len(errors['clean.py']), 0)
+
+        for line, column, message in errors['file_0.py']:
+            self.assertIsInstance(message, str)
+
+    def test_messages_are_interned(self):
+        """Make sure each distinct message is only stored once."""
+
+        errors = CompactLintErrors(self.errors)
+
+        self.assertEqual(errors.error_count(), 100)
+        self.assertEqual(len(errors.messages), 10)
+
+    def test_files_are_added_once(self):
+        """Make sure a file's rows can't be split."""
+
+        errors = CompactLintErrors(self.errors)
+
+        with self.assertRaises(ValueError):
+            errors.add('file_0.py', [])
+
+    def test_compact_report(self):
+        """Make sure compacting a report keeps it equal."""
+
+        report = LintReport(errors=self.errors)
+
+        self.assertEqual(compact(report), report)
+
+    def test_memory_savings(self):
+        """Make sure the compact errors take a fraction of the memory of LintError lists."""
+
+        def allocated(build):
+            tracemalloc.start()
+            try:
+                result = build()
+                size = tracemalloc.get_traced_memory()[0]
+            finally:
+                tracemalloc.stop()
+            del result
+            return size
+
+        lists = allocated(lambda: make_errors(10, 5000))
+        errors = make_errors(10, 5000)
+        compact_errors = allocated(lambda: CompactLintErrors(errors))
+
+        self.assertLess(compact_errors, lists / 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""Tests for the error diff engine."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from lintable_git.hunk import Hunk
+from lintable_lintball.error_diff import make_line_map, new_errors, read_lines
+from lintable_lintball.lint_error import LintError
+from lintable_linters.whitespace_file_linter import WhitespaceFileLinter
+
+
+class ErrorDiffTests(unittest.TestCase):
+    """Tests for the error diff engine."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.linter = WhitespaceFileLinter()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write_file(self, name: str, content: str) -> str:
+        """Write a test file and return its path."""
+
+        filename = os.path.join(self.tmp_dir, name)
+
+        with open(filename, 'w+') as output:
+            output.write(content)
+
+        return filename
+
+    def test_line_map(self):
+        """Make sure lines are shifted by the hunks before them and changed lines map to None."""
+
+        # line 2 changed, and two lines were inserted after line 4
+        line_map = make_line_map([Hunk(a_start=2, a_length=1, b_start=2, b_length=1),
+                                  Hunk(a_start=5, a_length=2, b_start=4, b_length=0)])
+
+        self.assertEqual([line_map(line) for line in range(1, 7)], [1, None, 3, 4, 7, 8])
+
+    def test_exact_matches_without_hunks(self):
+        """Make sure errors at the same position are matched when there are no hunks."""
+
+        old = LintError(line_number=1, column=2, msg='old')
+        new = LintError(line_number=2, column=2, msg='new')
+
+        self.assertEqual(new_errors([old, new], [old]), [new])
+
+    def test_duplicate_errors_are_counted(self):
+        """Make sure each error in b only matches a single error in a."""
+
+        error = LintError(line_number=1, column=2, msg='error')
+
+        self.assertEqual(new_errors([error, error], [error]), [error])
+
+    def test_inserted_line_shifts_old_errors(self):
+        """Make sure old errors below an inserted line aren't reported as new."""
+
+        b_file = self.write_file('b.txt', 'one \ntwo\nthree \n')
+        a_file = self.write_file('a.txt', 'new \none \ntwo\nthree \n')
+        hunks = [Hunk(a_start=1, a_length=1, b_start=0, b_length=0)]
+
+        errors = new_errors(self.linter.lint(a_file), self.linter.lint(b_file), hunks=hunks)
+
+        self.assertEqual([error.line_number for error in errors], [1])
+
+    def test_moved_lines_are_fingerprinted(self):
+        """Make sure old errors on lines that moved aren't reported as new."""
+
+        b_file = self.write_file('b.txt', 'one \ntwo\nthree \n')
+        a_file = self.write_file('a.txt', 'three \none \ntwo\n')
+        hunks = [Hunk(a_start=1, a_length=1, b_start=0, b_length=0),
+                 Hunk(a_start=3, a_length=0, b_start=3, b_length=1)]
+        a_errors = self.linter.lint(a_file)
+        b_errors = self.linter.lint(b_file)
+
+        # without the source the moved line can't be recognised
+        self.assertEqual(len(new_errors(a_errors, b_errors, hunks=hunks)), 1)
+        self.assertEqual(new_errors(a_errors, b_errors, hunks=hunks, a_file=a_file, b_file=b_file), [])
+
+    def test_read_lines_numbers_lines_like_the_linters(self):
+        """Make sure lines are read by the numbers the linters give them, from a file or from memory."""
+
+        contents = 'a\x0cb  \r\nc\n'
+        filename = self.write_file('a.txt', contents)
+
+        self.assertEqual(read_lines(filename, [2, 3]), {2: 'b  ', 3: 'c'})
+        self.assertEqual(read_lines(None, [2, 3], data=contents.encode('utf-8')), {2: 'b  ', 3: 'c'})
+
+if __name__ == '__main__':
+    unittest.main()
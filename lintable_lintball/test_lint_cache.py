@@ -0,0 +1,118 @@
+"""Tests for LintCache and its stores."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+import unittest
+from typing import List
+
+from lintable_lintball.lint_cache import DiskStore, LintCache, MemoryStore
+from lintable_lintball.lint_error import LintError
+from lintable_lintball.lint_pool import LintPool
+from lintable_lintball.lint_wrapper import LintWrapper
+
+
+class CountingLinter(LintWrapper):
+    """Linter that reports one error per call and counts how often it ran."""
+
+    version = '1'
+
+    def __init__(self):
+        self.calls = 0
+
+    def lint(self, filename: str) -> List[LintError]:
+        self.calls += 1
+        return [LintError(line_number=1, column=1, msg=os.path.basename(filename))]
+
+
+class LintCacheTests(unittest.TestCase):
+    """Tests for LintCache and its stores."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.errors = [LintError(line_number=1, column=2, msg='an error')]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_memory_store_evicts_least_recently_used(self):
+        """Make sure the memory store keeps only its most recently used entries."""
+
+        store = MemoryStore(max_entries=2)
+        store.set('a', self.errors)
+        store.set('b', self.errors)
+        store.get('a')
+        store.set('c', self.errors)
+
+        self.assertEqual(store.get('a'), self.errors)
+        self.assertIsNone(store.get('b'))
+        self.assertEqual(store.get('c'), self.errors)
+
+    def test_disk_store_round_trip(self):
+        """Make sure the disk store gives back the errors it was given."""
+
+        store = DiskStore(path=self.tmp_dir, max_bytes=1024)
+        store.set('a', self.errors)
+
+        self.assertEqual(store.get('a'), self.errors)
+        self.assertIsNone(store.get('b'))
+
+    def test_disk_store_evicts_to_max_bytes(self):
+        """Make sure the disk store stays within its size limit."""
+
+        store = DiskStore(path=self.tmp_dir, max_bytes=100)
+
+        for x in range(0, 10):
+            store.set(str(x), self.errors)
+
+        self.assertLessEqual(store.size, 100)
+        self.assertEqual(store.get('9'), self.errors)
+
+    def test_unversioned_linters_are_not_cached(self):
+        """Make sure a linter without a version has no cache key."""
+
+        linter = CountingLinter()
+        self.assertIsNotNone(LintCache.key('blob', linter))
+
+        linter.version = None
+        self.assertIsNone(LintCache.key('blob', linter))
+
+    def test_key_depends_on_config(self):
+        """Make sure changing a linter's config changes its cache key."""
+
+        linter = CountingLinter()
+        key = LintCache.key('blob', linter)
+        linter.config = lambda: {'max_line_length': 80}
+
+        self.assertNotEqual(key, LintCache.key('blob', linter))
+
+    def test_submit_hits_cache(self):
+        """Make sure a blob is only linted once for the same linter."""
+
+        cache = LintCache(MemoryStore(max_entries=10))
+        linter = CountingLinter()
+
+        with LintPool(max_workers=1) as pool:
+            first = cache.submit(pool, linter, 'a/file.txt', 'blob').result()
+            second = cache.submit(pool, linter, 'b/file.txt', 'blob').result()
+            cache.submit(pool, linter, 'a/file.txt', None).result()
+
+        self.assertEqual(first, second)
+        self.assertEqual(linter.calls, 2)
+
+if __name__ == '__main__':
+    unittest.main()
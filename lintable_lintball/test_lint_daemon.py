@@ -0,0 +1,175 @@
+"""Tests for LintDaemonPool."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+from typing import List
+
+from lintable_lintball.lint_daemon import LintDaemonError, LintDaemonPool, LintDaemonRequestError
+from lintable_lintball.lint_limits import LintTimeout
+from lintable_lintball.lint_error import LintError
+from lintable_lintball.lint_wrapper import FileLintWrapper
+from lintable_settings.settings import LINTBALL_SETTINGS
+
+# a daemon that reports a trailing whitespace error on every line ending in a space
+DAEMON_SCRIPT = '''
+import json
+import os
+import sys
+import time
+
+for line in sys.stdin:
+    request = json.loads(line)
+
+    if request['method'] == 'ping':
+        response = {'id': request['id'], 'result': os.getpid()}
+    elif request['method'] == 'lint':
+        with open(request['params']['filename']) as file:
+            errors = [[number, len(text.rstrip('\\n')), 'trailing space']
+                      for number, text in enumerate(file, start=1) if text.rstrip('\\n').endswith(' ')]
+        response = {'id': request['id'], 'result': errors}
+    elif request['method'] == 'crash':
+        sys.exit(1)
+    elif request['method'] == 'hang':
+        time.sleep(60)
+    else:
+        response = {'id': request['id'], 'error': 'unknown method'}
+
+    sys.stdout.write(json.dumps(response) + '\\n')
+    sys.stdout.flush()
+'''
+
+
+class DaemonLinter(FileLintWrapper):
+    """Lints files through a pooled daemon."""
+
+    def __init__(self, daemon_command: List[str]):
+        self.daemon_command = daemon_command
+
+    def lint(self, filename: str) -> List[LintError]:
+        return self.lint_file(filename)
+
+    def parse_linter_output(self, output: str) -> List[LintError]:
+        return []
+
+
+class LintDaemonPoolTests(unittest.TestCase):
+    """Tests for LintDaemonPool."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.script = os.path.join(self.tmp_dir, 'daemon.py')
+
+        with open(self.script, 'w+') as output:
+            output.write(DAEMON_SCRIPT)
+
+        self.command = [sys.executable, self.script]
+        self.pool = LintDaemonPool(self.command, max_processes=2, max_requests=3,
+                                   health_check_interval=60, timeout=10)
+
+    def tearDown(self):
+        self.pool.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_daemons_are_reused(self):
+        """Make sure consecutive requests go to the same warm daemon."""
+
+        self.assertEqual(self.pool.request('ping', {}), self.pool.request('ping', {}))
+
+    def test_daemons_are_recycled(self):
+        """Make sure a daemon is replaced once it has served max_requests requests."""
+
+        pids = [self.pool.request('ping', {}) for _ in range(0, 4)]
+
+        self.assertEqual(len(set(pids[:3])), 1)
+        self.assertNotEqual(pids[2], pids[3])
+
+    def test_crashed_daemons_are_restarted(self):
+        """Make sure a request that kills its daemon is retried on a fresh one, then fails."""
+
+        pid = self.pool.request('ping', {})
+
+        with self.assertRaises(LintDaemonError):
+            self.pool.request('crash', {})
+
+        self.assertNotEqual(self.pool.request('ping', {}), pid)
+        self.assertLessEqual(self.pool.started, self.pool.max_processes)
+
+    def test_unhealthy_daemons_are_replaced(self):
+        """Make sure idle daemons are health checked before being reused."""
+
+        with self.pool.daemon() as daemon:
+            pid = daemon.request('ping', {})
+
+        daemon.process.kill()
+        daemon.process.wait()
+        self.pool.health_check_interval = 0
+
+        self.assertNotEqual(self.pool.request('ping', {}), pid)
+
+    def test_error_responses_keep_the_daemon(self):
+        """Make sure an error answer raises without retiring the daemon."""
+
+        pid = self.pool.request('ping', {})
+
+        with self.assertRaises(LintDaemonRequestError):
+            self.pool.request('unknown', {})
+
+        self.assertEqual(self.pool.request('ping', {}), pid)
+
+    def test_timeouts_are_lint_timeouts(self):
+        """Make sure a request that takes too long times out the file, without a retry, and retires the daemon."""
+
+        self.pool.timeout = 0.5
+        pid = self.pool.request('ping', {})
+
+        start = time.monotonic()
+
+        with self.assertRaises(LintTimeout):
+            self.pool.request('hang', {})
+
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertNotEqual(self.pool.request('ping', {}), pid)
+
+    def test_daemons_are_limited(self):
+        """Make sure daemons are held to the memory limit when set, and the CPU limit of every file they may lint."""
+
+        limits = LINTBALL_SETTINGS['limits']
+
+        with mock.patch.dict(limits, memory=4 * 1024 * 1024 * 1024), self.pool.daemon() as daemon:
+            self.assertEqual(resource.prlimit(daemon.process.pid, resource.RLIMIT_AS)[1], limits['memory'])
+            self.assertEqual(resource.prlimit(daemon.process.pid, resource.RLIMIT_CPU)[1],
+                             limits['cpu'] * self.pool.max_requests)
+
+    def test_file_lint_wrapper_uses_daemon(self):
+        """Make sure a FileLintWrapper with a daemon_command lints through the daemon."""
+
+        filename = os.path.join(self.tmp_dir, 'file.txt')
+
+        with open(filename, 'w+') as output:
+            output.write('clean\ndirty \n')
+
+        self.assertEqual(DaemonLinter(self.command).lint(filename),
+                         [LintError(line_number=2, column=6, msg='trailing space')])
+
+if __name__ == '__main__':
+    unittest.main()
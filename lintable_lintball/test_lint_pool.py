@@ -0,0 +1,251 @@
+"""Tests for LintPool."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import resource
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List
+
+from lintable_lintball.lint_error import LintError
+from lintable_lintball.lint_pool import ASYNC_SUBPROCESSES, AsyncExecutor, LintPool, SerialExecutor
+from lintable_lintball.lint_wrapper import FileLintWrapper
+from lintable_lintball.pool_type import PoolType
+from lintable_linters.text_file_linter import TextFileLinter
+from lintable_linters.whitespace_file_linter import WhitespaceFileLinter
+from lintable_settings.settings import LINTBALL_SETTINGS
+from lintable_tracing.tracing import TRACER
+
+
+class AsyncGrepLinter(FileLintWrapper):
+    """Finds trailing spaces with grep, on the asyncio engine."""
+
+    lint_command = 'grep'
+    pool_type = PoolType.ASYNC
+
+    def lint(self, filename: str) -> List[LintError]:
+        return self.lint_file(filename, ['-n', '-e', ' $'])
+
+    async def lint_async(self, filename: str) -> List[LintError]:
+        return await self.lint_file_async(filename, ['-n', '-e', ' $'])
+
+    def parse_linter_output(self, output: str) -> List[LintError]:
+        return [lint_error for line in output.stdout.splitlines() for lint_error in self.parse_linter_line(line)]
+
+    def parse_linter_line(self, line: str) -> List[LintError]:
+        line_number, text = line.rstrip('\n').split(':', 1)
+        return [LintError(line_number=int(line_number), column=len(text.rstrip()) + 1,
+                          msg="Found trailing whitespace: '{}'".format(text.rstrip()))]
+
+
+class VisitedWhitespaceLinter(WhitespaceFileLinter):
+    """Remembers the number of every line it checks."""
+
+    def __init__(self):
+        self.visited = []
+
+    def has_trailing_whitespace(self, line_number: int, line: str) -> List[LintError]:
+        self.visited.append(line_number)
+        return super().has_trailing_whitespace(line_number, line)
+
+
+class LintPoolTests(unittest.TestCase):
+    """Tests for LintPool."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.linter = WhitespaceFileLinter()
+        self.files = []
+
+        for x in range(0, 8):
+            filename = os.path.join(self.tmp_dir, 'file_{}.txt'.format(x))
+
+            with open(filename, 'w+') as output:
+                output.write('clean line\n' * x)
+                output.write('dirty line \n' * (8 - x))
+
+            self.files.append(filename)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def lint_with(self, pool: LintPool):
+        """Lint every test file through the given pool, in order."""
+
+        with pool:
+            futures = [pool.submit_all([self.linter], filename) for filename in self.files]
+            return [[future.result() for future in file_futures] for file_futures in futures]
+
+    def test_single_worker_is_serial(self):
+        """Make sure a pool of one runs jobs in the calling thread."""
+
+        pool = LintPool(max_workers=1)
+        self.assertIsInstance(pool.executor(PoolType.PROCESS), SerialExecutor)
+        self.assertIsInstance(pool.executor(PoolType.THREAD), SerialExecutor)
+        pool.shutdown()
+
+    def test_executor_per_pool_type(self):
+        """Make sure each pool type gets its own kind of executor."""
+
+        pool = LintPool(max_workers=2)
+        self.assertIsInstance(pool.executor(PoolType.PROCESS), ProcessPoolExecutor)
+        self.assertIsInstance(pool.executor(PoolType.THREAD), ThreadPoolExecutor)
+        pool.shutdown()
+
+    def test_process_workers_are_limited(self):
+        """Make sure jobs in process pool workers are held to the memory limit when set, and threads aren't."""
+
+        memory = 4 * 1024 * 1024 * 1024
+
+        with mock.patch.dict(LINTBALL_SETTINGS['limits'], memory=memory), LintPool(max_workers=2) as pool:
+            self.assertEqual(pool.run(PoolType.PROCESS, resource.getrlimit, resource.RLIMIT_AS).result()[1], memory)
+            self.assertEqual(pool.run(PoolType.THREAD, resource.getrlimit, resource.RLIMIT_AS).result(),
+                             resource.getrlimit(resource.RLIMIT_AS))
+
+    def test_process_workers_are_not_limited_by_default(self):
+        """Make sure the memory limit is opt-in, leaving process pool workers with the limit they started with."""
+
+        with mock.patch.dict(LINTBALL_SETTINGS['limits'], memory=0), LintPool(max_workers=2) as pool:
+            self.assertEqual(pool.run(PoolType.PROCESS, resource.getrlimit, resource.RLIMIT_AS).result(),
+                             resource.getrlimit(resource.RLIMIT_AS))
+
+    def test_threads_continue_the_current_span(self):
+        """Make sure jobs run in thread pool workers see the span that was current when they were submitted."""
+
+        with LintPool(max_workers=2) as pool, TRACER.span('lint_files') as span:
+            self.assertIs(pool.run(PoolType.THREAD, TRACER.current).result(), span)
+
+        self.assertIsNone(TRACER.current())
+
+    def test_results_match_serial(self):
+        """Make sure parallel linting produces the same results, in the same order."""
+
+        expected = [[self.linter.lint(filename)] for filename in self.files]
+
+        self.assertEqual(self.lint_with(LintPool(max_workers=1)), expected)
+        self.assertEqual(self.lint_with(LintPool(max_workers=4)), expected)
+
+    @unittest.skipUnless(ASYNC_SUBPROCESSES, 'needs Python 3.8 to start subprocesses from the event loop')
+    def test_async_linters_run_on_the_event_loop(self):
+        """Make sure asyncio linters get their own executor and stream the same results."""
+
+        linter = AsyncGrepLinter()
+
+        with LintPool(max_workers=1) as pool:
+            self.assertIsInstance(pool.executor(PoolType.ASYNC), AsyncExecutor)
+            futures = [pool.submit(linter, filename) for filename in self.files]
+            results = [future.result() for future in futures]
+
+        self.assertEqual(results, [self.linter.lint(filename) for filename in self.files])
+
+    def test_async_linters_fall_back_to_threads(self):
+        """Make sure asyncio linters run on threads where the event loop can't start subprocesses."""
+
+        linter = AsyncGrepLinter()
+
+        with mock.patch('lintable_lintball.lint_pool.ASYNC_SUBPROCESSES', False):
+            with self.assertRaises(RuntimeError):
+                AsyncExecutor(max_concurrency=1)
+
+            with LintPool(max_workers=2) as pool:
+                futures = [pool.submit(linter, filename) for filename in self.files]
+                results = [future.result() for future in futures]
+
+                self.assertNotIn(PoolType.ASYNC, pool.executors)
+
+        self.assertEqual(results, [self.linter.lint(filename) for filename in self.files])
+
+    def test_contents_match_files(self):
+        """Make sure linting contents in memory gives the same results as the files, in every pool."""
+
+        contents = []
+
+        for filename in self.files:
+            with open(filename, 'rb') as file:
+                contents.append(file.read())
+
+        expected = [self.linter.lint(filename) for filename in self.files]
+
+        for max_workers in [1, 4]:
+            with LintPool(max_workers=max_workers) as pool:
+                futures = [pool.submit(self.linter, 'file.txt', data=data) for data in contents]
+                self.assertEqual([future.result() for future in futures], expected)
+
+        with LintPool(max_workers=1) as pool:
+            # linters that can't read bytes lint them from a temporary file
+            futures = [pool.submit(AsyncGrepLinter(), 'file.txt', [range(1, 4)], data) for data in contents]
+            self.assertEqual([future.result() for future in futures],
+                             [[error for error in errors if error.line_number < 4] for errors in expected])
+
+    def test_contents_only_lint_lines(self):
+        """Make sure linting contents limited to lines never visits the lines outside them."""
+
+        lines = [range(3, 5), range(9, 10)]
+        ascii_data = b'dirty \n' * 12
+        text_data = 'dirty é \n'.encode('utf-8') * 12
+
+        with LintPool(max_workers=1) as pool:
+            linter = VisitedWhitespaceLinter()
+            errors = pool.submit(linter, 'file.txt', lines, text_data).result()
+
+            self.assertEqual([error.line_number for error in errors], [3, 4, 9])
+            self.assertEqual(linter.visited, [3, 4, 9])
+
+            text_linter = TextFileLinter()
+            text_linter.line_checks.append(lambda line_number, content, ending: linter.visited.append(line_number))
+            linter.visited = []
+
+            for data in [ascii_data, text_data]:
+                errors = pool.submit(text_linter, 'file.txt', lines, data).result()
+
+                self.assertEqual([error.line_number for error in errors], [3, 4, 9])
+
+            self.assertEqual(linter.visited, [3, 4, 9, 3, 4, 9])
+
+    def test_futures_are_timed(self):
+        """Make sure every kind of pool says how long each job took, and cancelling still works."""
+
+        for max_workers in [1, 4]:
+            with LintPool(max_workers=max_workers) as pool:
+                futures = [pool.submit(self.linter, filename) for filename in self.files]
+                futures.append(pool.submit(AsyncGrepLinter(), self.files[0]))
+
+                for future in futures:
+                    future.result()
+                    self.assertGreaterEqual(future.lint_seconds, 0.0)
+
+        with LintPool(max_workers=2) as pool:
+            blocker = pool.executor(PoolType.THREAD).submit(time.sleep, 0.2)
+            pool.executor(PoolType.THREAD).submit(time.sleep, 0.2)
+            future = pool.submit(self.linter, self.files[0])
+
+            self.assertTrue(future.cancel())
+            blocker.result()
+
+    def test_exceptions_are_deferred(self):
+        """Make sure a failing job surfaces its exception from the future."""
+
+        future = SerialExecutor().submit(int, 'not a number')
+
+        with self.assertRaises(ValueError):
+            future.result()
+
+if __name__ == '__main__':
+    unittest.main()
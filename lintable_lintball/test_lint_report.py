@@ -0,0 +1,57 @@
+"""Tests for LintReport helpers."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import unittest
+
+from lintable_lintball.lint_error import LintError
+from lintable_lintball.lint_outcome import LintOutcome
+from lintable_lintball.lint_report import LintReport, create_from_dict, merge_reports, to_dict
+
+
+class LintReportTests(unittest.TestCase):
+    """Tests for LintReport helpers."""
+
+    def setUp(self):
+        self.report = LintReport(errors={'a_file': [LintError(line_number=1, column=2, msg='an error')],
+                                         'b_file': []})
+
+    def test_dict_round_trip(self):
+        """Make sure a report survives a trip through JSON."""
+
+        data = json.loads(json.dumps(to_dict(self.report)))
+
+        self.assertEqual(create_from_dict(data), self.report)
+
+    def test_outcomes_round_trip(self):
+        """Make sure the outcomes of files that weren't fully linted survive a trip through JSON."""
+
+        report = self.report._replace(outcomes={'a_file': LintOutcome.TIMED_OUT})
+        data = json.loads(json.dumps(to_dict(report)))
+
+        self.assertEqual(create_from_dict(data).outcomes, {'a_file': LintOutcome.TIMED_OUT})
+
+    def test_merge_reports(self):
+        """Make sure merging reports keeps the files of every report."""
+
+        other = LintReport(errors={'c_file': [LintError(line_number=3, column=4, msg='another error')]})
+        merged = merge_reports([self.report, other])
+
+        self.assertEqual(sorted(merged.errors.keys()), ['a_file', 'b_file', 'c_file'])
+        self.assertEqual(merged.errors['c_file'], other.errors['c_file'])
+
+if __name__ == '__main__':
+    unittest.main()
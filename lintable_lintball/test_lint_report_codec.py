@@ -0,0 +1,73 @@
+"""Tests for the LintReport codec."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import unittest
+
+from lintable_lintball.lint_error import LintError
+from lintable_lintball.lint_outcome import LintOutcome
+from lintable_lintball.lint_report import LintReport, to_dict
+from lintable_lintball.lint_report_codec import LintReportCodecError, decode_report, dumps, encode_report, loads
+
+
+class LintReportCodecTests(unittest.TestCase):
+    """Tests for the LintReport codec."""
+
+    def setUp(self):
+        self.report = LintReport(errors=dict(('src/file_{}.py'.format(x),
+                                              [LintError(line_number=y + 1, column=y % 7,
+                                                         msg="Found trailing whitespace: '{}'".format(y % 13))
+                                               for y in range(x * 50)])
+                                             for x in range(20)),
+                                 outcomes={'src/file_3.py': LintOutcome.TIMED_OUT})
+
+    def test_round_trip(self):
+        """Make sure reports survive encoding, compressed or not."""
+
+        for compress in (False, True):
+            decoded = decode_report(encode_report(self.report, compress=compress))
+
+            self.assertEqual(decoded, self.report)
+            self.assertEqual(list(decoded.errors.keys()), list(self.report.errors.keys()))
+            self.assertEqual(decoded.outcomes, self.report.outcomes)
+
+    def test_smaller_than_json(self):
+        """Make sure the encoding is smaller than the JSON it replaces."""
+
+        json_size = len(json.dumps(to_dict(self.report)).encode('utf-8'))
+
+        self.assertLess(len(encode_report(self.report, compress=False)), json_size / 2)
+        self.assertLess(len(encode_report(self.report, compress=True)), json_size / 20)
+
+    def test_message_round_trip(self):
+        """Make sure Celery message bodies holding reports survive encoding."""
+
+        message = {'args': [[self.report, LintReport(errors={})], {'uuid': 'abc', 'repo_id': 2 ** 70}],
+                   'kwargs': {}, 'retries': 0, 'eta': None, 'utc': True, 'ratio': 0.5, 'blob': b'\0\1'}
+
+        self.assertEqual(loads(dumps(message)), message)
+
+    def test_corrupt_data(self):
+        """Make sure corrupt, truncated or unknown encodings are rejected."""
+
+        encoded = encode_report(self.report, compress=False)
+
+        for data in (b'', b'JSON', encoded[:len(encoded) // 2], b'LNT\x63\x00' + encoded[5:]):
+            with self.assertRaises(LintReportCodecError):
+                decode_report(data)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+"""Tests for LintRouter."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+import unittest
+from typing import List
+
+from lintable_lintball.lint_error import LintError
+from lintable_lintball.lint_router import LintRouter, read_interpreter
+from lintable_lintball.lint_wrapper import LintWrapper
+
+
+class NamedLinter(LintWrapper):
+    """A linter that finds nothing, handling whatever it's told to."""
+
+    def __init__(self, globs=None, languages=None, shebangs=None):
+        self.globs = globs
+        self.languages = languages
+        self.shebangs = shebangs
+
+    def lint(self, filename: str) -> List[LintError]:
+        return []
+
+
+class LintRouterTests(unittest.TestCase):
+    """Tests for LintRouter."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.everything = NamedLinter()
+        self.python = NamedLinter(languages=['python'])
+        self.docs = NamedLinter(globs=['docs/*.txt', 'README'])
+        self.router = LintRouter([self.everything, self.python, self.docs])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write(self, name: str, contents: str) -> str:
+        path = os.path.join(self.tmp_dir, name)
+
+        with open(path, 'w') as file:
+            file.write(contents)
+
+        return path
+
+    def test_route_by_extension(self):
+        """Make sure files only go to the linters for their extension, in linter order."""
+
+        self.assertEqual(self.router.route('src/app.py'), [self.everything, self.python])
+        self.assertEqual(self.router.route('logo.png'), [self.everything])
+
+    def test_route_by_glob(self):
+        """Make sure globs with a directory match the whole path, and others just the name."""
+
+        self.assertEqual(self.router.route('docs/index.txt'), [self.everything, self.docs])
+        self.assertEqual(self.router.route('notes/index.txt'), [self.everything])
+        self.assertEqual(self.router.route('sub/README'), [self.everything, self.docs])
+
+    def test_route_by_multi_dot_glob(self):
+        """Make sure globs like *.d.ts match the whole name rather than just the extension."""
+
+        declarations = NamedLinter(globs=['*.d.ts'])
+        router = LintRouter([declarations])
+
+        self.assertEqual(router.route('src/types.d.ts'), [declarations])
+        self.assertEqual(router.route('src/app.ts'), [])
+
+    def test_route_by_shebang(self):
+        """Make sure scripts without an extension are routed by their interpreter."""
+
+        script = self.write('script', '#!/usr/bin/env python3\nprint(1)\n')
+        other = self.write('other', '#!/bin/sh\necho 1\n')
+
+        self.assertEqual(self.router.route('bin/script', script), [self.everything, self.python])
+        self.assertEqual(self.router.route('bin/other', other), [self.everything])
+
+    def test_read_interpreter(self):
+        """Make sure the interpreter is found with and without env."""
+
+        self.assertEqual(read_interpreter(self.write('a', '#!/usr/bin/python -u\n')), 'python')
+        self.assertEqual(read_interpreter(self.write('b', '#!/usr/bin/env -S node --flag\n')), 'node')
+        self.assertIsNone(read_interpreter(self.write('c', 'no shebang\n')))
+        self.assertIsNone(read_interpreter(os.path.join(self.tmp_dir, 'missing')))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+"""Tests for FileLintWrapper."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import unittest
+from typing import Dict, List
+
+from lintable_lintball.lint_error import LintError
+from lintable_lintball.lint_limits import LintTimeout
+from lintable_lintball.lint_pool import LintPool
+from lintable_lintball.lint_wrapper import FileLintWrapper
+
+
+class GrepWhitespaceLinter(FileLintWrapper):
+    """Finds trailing spaces with grep, one process per batch of files."""
+
+    lint_command = 'grep'
+    batch_size = 10
+
+    def __init__(self):
+        self.calls = 0
+
+    def lint(self, filename: str) -> List[LintError]:
+        return self.lint_many([filename])[filename]
+
+    def lint_many(self, filenames: List[str]) -> Dict[str, List[LintError]]:
+        return self.lint_files(filenames, ['-n', '-H', ' $'])
+
+    def parse_linter_output(self, output: subprocess.CompletedProcess) -> List[LintError]:
+        return []
+
+    def parse_batch_linter_output(self, output: subprocess.CompletedProcess,
+                                  filenames: List[str]) -> Dict[str, List[LintError]]:
+        self.calls += 1
+        lint_errors = dict((filename, []) for filename in filenames)
+
+        for line in output.stdout.splitlines():
+            filename, line_number, _ = line.split(':', 2)
+            lint_errors[filename].append(LintError(line_number=int(line_number), column=0, msg='trailing space'))
+
+        return lint_errors
+
+
+class SleepLinter(FileLintWrapper):
+    """Sleeps for as many seconds as the filename says."""
+
+    lint_command = 'sleep'
+    timeout = 0.2
+
+    def lint(self, filename: str) -> List[LintError]:
+        return self.lint_file(filename)
+
+    def parse_linter_output(self, output: subprocess.CompletedProcess) -> List[LintError]:
+        return []
+
+
+class FileLintWrapperTests(unittest.TestCase):
+    """Tests for FileLintWrapper."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.linter = GrepWhitespaceLinter()
+        self.files = []
+
+        for x in range(0, 25):
+            filename = os.path.join(self.tmp_dir, 'file_{}.txt'.format(x))
+
+            with open(filename, 'w+') as output:
+                output.write('clean\n' * x + 'dirty \n')
+
+            self.files.append(filename)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_lint_files_demultiplexes_output(self):
+        """Make sure each file gets its own errors back."""
+
+        lint_errors = self.linter.lint_files(self.files, ['-n', '-H', ' $'])
+
+        for x, filename in enumerate(self.files):
+            self.assertEqual(lint_errors[filename], [LintError(line_number=x + 1, column=0, msg='trailing space')])
+
+        self.assertEqual(self.linter.calls, 1)
+
+    def test_command_line_is_capped(self):
+        """Make sure long lists of files are split over several processes."""
+
+        self.linter.max_command_length = 400
+        batches = list(self.linter.split_command_line(['grep', '-n'], self.files))
+
+        self.assertGreater(len(batches), 1)
+        self.assertEqual([filename for batch in batches for filename in batch], self.files)
+
+        for batch in batches:
+            self.assertLessEqual(sum(len(parameter) + 9 for parameter in ['grep', '-n'] + batch), 400)
+
+    def test_pool_batches_files(self):
+        """Make sure the pool hands batched linters whole batches of files."""
+
+        with LintPool(max_workers=2) as pool:
+            futures = [pool.submit(self.linter, filename) for filename in self.files]
+            pool.flush()
+            results = [future.result() for future in futures]
+
+        self.assertEqual(results, [self.linter.lint(filename) for filename in self.files])
+        # 3 batches through the pool, plus the 25 single file calls above
+        self.assertEqual(self.linter.calls, 3 + 25)
+
+    def test_slow_linters_are_killed(self):
+        """Make sure a linter that runs past its timeout is killed and reported as timed out."""
+
+        linter = SleepLinter()
+        started = time.monotonic()
+
+        with self.assertRaises(LintTimeout):
+            linter.lint('10')
+
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(linter.lint('0'), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from uuid import UUID, uuid4
+
+from lintable_benchmark.synthetic_repo import RepoSpec, create_synthetic_repo
+from lintable_git.git_handler import GitHandler
+from lintable_lintball import lintball
+from lintable_lintball.lint_report import LintReport
+from lintable_lintball.runner import runner
+from lintable_processes.do_nothing_handler import DoNothingHandler
+from lintable_processes.process_handler import ProcessHandler
+from lintable_processes.process_timings import ProcessTimings
+from lintable_settings.settings import LINTBALL_SETTINGS
+
+
+class RecordingHandler(DoNothingHandler):
+    """Remembers the reports and timings of the jobs it handles."""
+
+    def __init__(self):
+        super().__init__()
+        self.reports = []
+        self.job_timings = []
+
+    def report(self, uuid: UUID, lint_report: LintReport):
+        super().report(uuid, lint_report)
+        self.reports.append(lint_report)
+
+    def timings(self, uuid: UUID, timings: ProcessTimings):
+        super().timings(uuid, timings)
+        self.job_timings.append(timings)
+
+
+class LintChordTests(unittest.TestCase):
+    """Tests for linting a job split into batches across a chord."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.repo_path = os.path.join(self.tmp_dir, 'repo')
+        self.sha1_a, self.sha1_b = create_synthetic_repo(self.repo_path, RepoSpec(file_count=20,
+                                                                                  file_size=1024,
+                                                                                  changed_count=10,
+                                                                                  error_density=0.2))
+        self.recorder = RecordingHandler()
+        self.job = dict(uuid=str(uuid4()), github_id=1, full_name='owner/repo', repo_id=1,
+                        sha1_a=self.sha1_a, sha1_b=self.sha1_b, target_url='')
+
+        # every task reports to the recorder, and lints the local repo rather than GitHub's,
+        # without a cache so every file is linted each time
+        patches = [mock.patch.object(lintball, 'github_oauth_key', return_value='token'),
+                   mock.patch.object(lintball, 'github_repo_url', return_value=self.repo_path),
+                   mock.patch.object(lintball, 'github_process_handler',
+                                     side_effect=lambda job, oauth_key, logger: self.process_handler()),
+                   mock.patch.object(lintball, 'DBHandler', side_effect=lambda repo_id: DoNothingHandler()),
+                   mock.patch.object(lintball, 'default_lint_cache', return_value=None),
+                   mock.patch.dict(LINTBALL_SETTINGS['chord'], batch_size=3)]
+
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        always_eager = runner.conf.CELERY_ALWAYS_EAGER
+        runner.conf.CELERY_ALWAYS_EAGER = True
+        self.addCleanup(setattr, runner.conf, 'CELERY_ALWAYS_EAGER', always_eager)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def process_handler(self) -> ProcessHandler:
+        return ProcessHandler(repo=self.repo_path, uuid=self.job['uuid'], handlers=[self.recorder])
+
+    def lint(self, batch_size: int) -> ProcessTimings:
+        """Lint the job in batches of batch_size files, returning the timings it finished with."""
+
+        LINTBALL_SETTINGS['chord']['batch_size'] = batch_size
+        process_handler = self.process_handler()
+        git_handler = GitHandler(process_handler, self.repo_path, self.sha1_a, self.sha1_b)
+
+        lintball.lint_chord(git_handler, process_handler, self.job)
+
+        self.assertEqual(len(self.recorder.job_timings), 1)
+        return self.recorder.job_timings.pop()
+
+    def test_batches_are_timed(self):
+        """Make sure the job's timings cover the lint time of every batch, and the task that split it up."""
+
+        timings = self.lint(batch_size=3).to_dict()
+        report = self.recorder.reports.pop()
+        unsplit = self.lint(batch_size=100).to_dict()
+
+        self.assertEqual(report, self.recorder.reports.pop())
+        self.assertEqual(set(timings['files']), set(unsplit['files']))
+        self.assertEqual(set(timings['linters']), set(unsplit['linters']))
+        self.assertIn('clone_repo', timings['stages'])
+        self.assertIn('lint_files', timings['stages'])
+        self.assertGreaterEqual(timings['total'], sum(timings['linters'].values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
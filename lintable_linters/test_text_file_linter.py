@@ -0,0 +1,118 @@
+"""Tests for the TextFileLinter."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from lintable_lintball.lint_error import LintError
+from lintable_linters.text_file_linter import TextFileLinter
+from lintable_linters.whitespace_file_linter import WhitespaceFileLinter
+
+
+class TextFileLinterTestCase(unittest.TestCase):
+    """Tests for the TextFileLinter."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmp_dir, 'file.txt')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write(self, contents: bytes):
+        with open(self.filename, 'wb') as output:
+            output.write(contents)
+
+    def test_every_rule(self):
+        """Make sure every rule reports its errors, in line order."""
+
+        self.write('ok\r\n\tindented\nlong line!\ncafé \nno newline'.encode('utf-8'))
+        linter = TextFileLinter(tabs=True, line_length=8, crlf=True, non_ascii=True)
+
+        self.assertEqual(linter.lint(self.filename),
+                         [LintError(line_number=1, column=3, msg='Found CRLF line ending'),
+                          LintError(line_number=2, column=1, msg='Found tab'),
+                          LintError(line_number=2, column=9, msg='Line too long (9 > 8)'),
+                          LintError(line_number=3, column=9, msg='Line too long (10 > 8)'),
+                          LintError(line_number=4, column=5, msg="Found trailing whitespace: 'café'"),
+                          LintError(line_number=4, column=4, msg="Found non-ASCII character: 'é'"),
+                          LintError(line_number=5, column=9, msg='Line too long (10 > 8)'),
+                          LintError(line_number=5, column=11, msg='Missing newline at end of file')])
+
+    def test_rules_can_be_disabled(self):
+        """Make sure disabled rules report nothing, and change the linter's identity."""
+
+        self.write(b'\tdirty \r\nno newline')
+        linter = TextFileLinter(trailing_whitespace=False, final_newline=False)
+
+        self.assertEqual(linter.lint(self.filename), [])
+        self.assertNotEqual(linter.identity(), TextFileLinter().identity())
+
+    def test_matches_whitespace_linter(self):
+        """Make sure the trailing whitespace rule agrees with the WhitespaceFileLinter, across chunks."""
+
+        contents = b'a \r\nb\rc \r\n\r\n d\x0ce \t\nf \r'
+        self.write(contents)
+
+        linter = TextFileLinter(final_newline=False)
+        linter.chunk_size = 1
+
+        self.assertEqual(linter.lint(self.filename), WhitespaceFileLinter().lint(self.filename))
+        self.assertEqual([ending for _, ending in linter.get_lines_and_endings(self.filename)],
+                         ['\r\n', '\r', '\r\n', '\r\n', '\x0c', '\n', '\r'])
+
+    def test_lint_bytes_matches_lint(self):
+        """Make sure linting contents in memory finds exactly what linting the file did."""
+
+        contents = 'ok\r\n\tindented\nlong line!\ncafé \rno newline'.encode('utf-8')
+        self.write(contents)
+        linter = TextFileLinter(tabs=True, line_length=8, crlf=True, non_ascii=True)
+
+        self.assertEqual(linter.lint_bytes('file.txt', contents), linter.lint(self.filename))
+
+    def test_buffer_matches_decoded(self):
+        """Make sure scanning a plain ASCII file as bytes finds exactly what checking every decoded line does."""
+
+        contents = b'ok\r\n\tindented \r\nlong line!\n\x1f\n\n  \r\nno newline\t'
+        self.write(contents)
+        linter = TextFileLinter(tabs=True, line_length=8, crlf=True, non_ascii=True)
+
+        self.assertFalse(linter.needs_decoding(contents))
+        self.assertEqual(linter.lint(self.filename), linter.lint_decoded(contents.decode('ascii')))
+
+    def test_buffer_only_checks_found_lines(self):
+        """Make sure only the lines a rule found in the buffer, and the last line, are decoded and checked."""
+
+        self.write(b'clean\n' * 50 + b'\tdirty \r\n' + b'clean\n' * 50)
+        linter = TextFileLinter(tabs=True, crlf=True)
+        checked = []
+
+        linter.line_checks.append(lambda line_number, content, ending: checked.append(line_number))
+
+        self.assertEqual(len(linter.lint(self.filename)), 3)
+        self.assertEqual(checked, [51, 101])
+
+    def test_empty_file(self):
+        """Make sure an empty file isn't missing its final newline."""
+
+        self.write(b'')
+
+        self.assertEqual(TextFileLinter().lint(self.filename), [])
+
+if __name__ == '__main__':
+    unittest.main()
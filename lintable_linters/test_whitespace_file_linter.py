@@ -14,9 +14,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+import re
+import shutil
+import tempfile
 import unittest
 
 from lintable_lintball.lint_error import LintError
+from lintable_lintball.lint_limits import LintSkipped
 from lintable_linters.whitespace_file_linter import WhitespaceFileLinter
 
 class DetectTrailingWhitespaceTestCase(unittest.TestCase):
@@ -75,3 +80,139 @@ class DetectTrailingWhitespaceTestCase(unittest.TestCase):
 
         self.assertEqual(self.linter.has_trailing_whitespace(1, test_string),
                          lint_error)
+
+class LintTestCase(unittest.TestCase):
+    """Tests for linting whole files with the WhitespaceFileLinter."""
+
+    samples = [b'',
+               b'\n',
+               b' ',
+               b'no newline at the end ',
+               b'clean\nlines\n',
+               b'dirty \nclean\n\t\n  mixed \t \nlast\t',
+               b'\n\n\n \n\n',
+               b'unit\x1fseparator\x1f\n',
+               b'windows \r\nline endings\r\n',
+               b'old mac \rline endings\r',
+               b'form\x0cfeed \x0cand\x0bvertical tab\x0b\n',
+               'non-ascii caf\u00e9 \nno-break\u00a0\n'.encode('utf-8'),
+               'line\u2028separator \u2029\n'.encode('utf-8')]
+
+    def setUp(self):
+        self.linter = WhitespaceFileLinter()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmp_dir, 'file.txt')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def expected(self, contents: bytes):
+        """What the original, regex based, linter found."""
+
+        ws_regex = re.compile(r"^(.*?)(\s+)$")
+        lines = contents.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n').splitlines()
+        matches = [(line_number, ws_regex.match(line)) for line_number, line in enumerate(lines, start=1)]
+
+        return [LintError(line_number=line_number, column=match.start(2) + 1,
+                          msg="Found trailing whitespace: '{}'".format(match.group(1)))
+                for line_number, match in matches if match]
+
+    def test_matches_regex_linter(self):
+        """Make sure both the byte scanner and the text path find exactly what the regex did."""
+
+        for contents in self.samples:
+            with open(self.filename, 'wb') as output:
+                output.write(contents)
+
+            self.assertEqual(self.linter.lint(self.filename), self.expected(contents), contents)
+
+    def test_get_lines_streams_chunks(self):
+        """Make sure reading a few characters at a time splits lines just like splitlines."""
+
+        self.linter.chunk_size = 3
+
+        for contents in self.samples:
+            with open(self.filename, 'wb') as output:
+                output.write(contents)
+
+            with open(self.filename, 'r') as file:
+                expected = file.read().splitlines()
+
+            self.assertEqual(list(self.linter.get_lines(self.filename)), expected, contents)
+            self.assertEqual(self.linter.lint_text(self.filename), self.expected(contents), contents)
+
+    def test_large_files_are_skipped(self):
+        """Make sure files over max_file_size are skipped rather than read."""
+
+        self.linter.max_file_size = 10
+
+        with open(self.filename, 'wb') as output:
+            output.write(b'more than ten bytes \n')
+
+        with self.assertRaises(LintSkipped):
+            self.linter.lint(self.filename)
+
+        with self.assertRaises(LintSkipped):
+            self.linter.lint_lines(self.filename, [range(1, 2)])
+
+    def test_lint_bytes_matches_lint(self):
+        """Make sure linting contents in memory finds exactly what linting the file did."""
+
+        for contents in self.samples:
+            self.assertEqual(self.linter.lint_bytes('file.txt', contents), self.expected(contents), contents)
+
+        self.linter.max_file_size = 10
+
+        with self.assertRaises(LintSkipped):
+            self.linter.lint_bytes('file.txt', b'more than ten bytes \n')
+
+    def test_missing_file(self):
+        """Make sure a file that can't be read has no errors."""
+
+        self.assertEqual(self.linter.lint(os.path.join(self.tmp_dir, 'missing.txt')), [])
+
+class LintLinesTestCase(unittest.TestCase):
+    """Tests for linting only some lines with the WhitespaceFileLinter."""
+
+    def setUp(self):
+        self.linter = WhitespaceFileLinter()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmp_dir, 'file.txt')
+
+        with open(self.filename, 'w+') as output:
+            output.write(''.join('line {} \n'.format(x) for x in range(1, 11)))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_lint_lines_matches_lint(self):
+        """Make sure linting every line finds the same errors as lint."""
+
+        self.assertEqual(self.linter.lint_lines(self.filename, [range(1, 11)]),
+                         self.linter.lint(self.filename))
+
+    def test_lint_lines_only_given_ranges(self):
+        """Make sure only lines within the ranges are linted, even if they overlap."""
+
+        errors = self.linter.lint_lines(self.filename, [range(8, 12), range(2, 4), range(3, 5)])
+
+        self.assertEqual([error.line_number for error in errors], [2, 3, 4, 8, 9, 10])
+
+    def test_lint_lines_numbers_lines_like_lint(self):
+        """Make sure lines are numbered as lint and lint_bytes_lines number them, by str.splitlines."""
+
+        contents = b'a\x0cb  \nc\n'
+
+        with open(self.filename, 'wb') as output:
+            output.write(contents)
+
+        expected = self.linter.lint(self.filename)
+
+        self.assertEqual([(error.line_number, error.column) for error in expected], [(2, 2)])
+        self.assertEqual(self.linter.lint_lines(self.filename, [range(1, 4)]), expected)
+        self.assertEqual(self.linter.lint_bytes_lines('file.txt', contents, [range(1, 4)]), expected)
+
+    def test_lint_lines_no_ranges(self):
+        """Make sure no ranges means no errors."""
+
+        self.assertEqual(self.linter.lint_lines(self.filename, []), [])
@@ -0,0 +1,404 @@
+"""Checks many simple text rules in a single pass over each file."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from lintable_lintball.lint_error import LintError
+from lintable_lintball.lint_wrapper import LintWrapper
+from lintable_linters.whitespace_file_linter import WhitespaceFileLinter, line_numbers_in
+
+
+class TextRule(object):
+    """A rule checked by the TextFileLinter, one line at a time.
+
+    Each line is handed over split into its content and its line ending,
+    which is '' for a last line without one.
+    """
+
+    name = None  # type: str
+
+    def find_in_buffer(self, buffer) -> Optional[Iterable[int]]:
+        """Find the lines check_line might report in a buffer of ASCII text, with '\\n' or '\\r\\n' line endings.
+
+        :return Optional[Iterable[int]]: An offset into each such line, or None if every line has to be checked
+        """
+
+        return None
+
+    def check_line(self, line_number: int, content: str, ending: str) -> Optional[LintError]:
+        """Check a single line."""
+
+        return None
+
+    def check_last_line(self, line_number: int, content: str, ending: str) -> Optional[LintError]:
+        """Check the last line of a non-empty file, once every line has been checked."""
+
+        return None
+
+
+class TrailingWhitespaceRule(TextRule):
+    """Lines shouldn't end in whitespace, reported just as the WhitespaceFileLinter does."""
+
+    name = 'trailing_whitespace'
+
+    def __init__(self):
+        self.whitespace_linter = WhitespaceFileLinter()
+
+    def find_in_buffer(self, buffer) -> Optional[Iterable[int]]:
+        return self.whitespace_linter.trailing_whitespace_offsets(buffer, (b'\n', b'\r\n'))
+
+    def check_line(self, line_number: int, content: str, ending: str) -> Optional[LintError]:
+        return self.whitespace_linter.has_trailing_whitespace(line_number, content)
+
+
+class TabRule(TextRule):
+    """Lines shouldn't contain tabs."""
+
+    name = 'tabs'
+
+    def find_in_buffer(self, buffer) -> Optional[Iterable[int]]:
+        offsets = []
+        position = buffer.find(b'\t')
+
+        while position != -1:
+            offsets.append(position)
+
+            # only the first tab of a line is reported
+            end = buffer.find(b'\n', position)
+            position = buffer.find(b'\t', end) if end != -1 else -1
+
+        return offsets
+
+    def check_line(self, line_number: int, content: str, ending: str) -> Optional[LintError]:
+        column = content.find('\t')
+
+        if column == -1:
+            return None
+
+        return LintError(line_number=line_number, column=column + 1, msg='Found tab')
+
+
+class LineLengthRule(TextRule):
+    """Lines shouldn't be longer than max_length characters."""
+
+    name = 'line_length'
+
+    def __init__(self, max_length: int):
+        self.max_length = max_length  # type: int
+
+        # anchored to the start of a line, so short lines fail at once
+        self.too_long = re.compile('^[^\\r\\n]{{{0},}}'.format(max_length + 1).encode('ascii'), re.MULTILINE)
+
+    def find_in_buffer(self, buffer) -> Optional[Iterable[int]]:
+        return [match.start() for match in self.too_long.finditer(buffer)]
+
+    def check_line(self, line_number: int, content: str, ending: str) -> Optional[LintError]:
+        if len(content) <= self.max_length:
+            return None
+
+        return LintError(line_number=line_number,
+                         column=self.max_length + 1,
+                         msg='Line too long ({length} > {max_length})'.format(length=len(content),
+                                                                              max_length=self.max_length))
+
+
+class FinalNewlineRule(TextRule):
+    """Files should end with a line ending."""
+
+    name = 'final_newline'
+
+    def check_last_line(self, line_number: int, content: str, ending: str) -> Optional[LintError]:
+        if ending:
+            return None
+
+        return LintError(line_number=line_number, column=len(content) + 1, msg='Missing newline at end of file')
+
+
+class CrlfRule(TextRule):
+    """Lines should end with '\\n' rather than '\\r\\n'."""
+
+    name = 'crlf'
+
+    def find_in_buffer(self, buffer) -> Optional[Iterable[int]]:
+        offsets = []
+        position = buffer.find(b'\r\n')
+
+        while position != -1:
+            offsets.append(position)
+            position = buffer.find(b'\r\n', position + 2)
+
+        return offsets
+
+    def check_line(self, line_number: int, content: str, ending: str) -> Optional[LintError]:
+        if ending != '\r\n':
+            return None
+
+        return LintError(line_number=line_number, column=len(content) + 1, msg='Found CRLF line ending')
+
+
+class NonAsciiRule(TextRule):
+    """Lines should only contain ASCII characters."""
+
+    name = 'non_ascii'
+
+    def find_in_buffer(self, buffer) -> Optional[Iterable[int]]:
+        return []  # the buffer is all ASCII
+
+    def check_line(self, line_number: int, content: str, ending: str) -> Optional[LintError]:
+        try:
+            content.encode('ascii')
+            return None
+        except UnicodeEncodeError:
+            pass
+
+        column = next(index for index, character in enumerate(content) if ord(character) > 127)
+
+        return LintError(line_number=line_number,
+                         column=column + 1,
+                         msg='Found non-ASCII character: {character!r}'.format(character=content[column]))
+
+
+class TextFileLinter(WhitespaceFileLinter):
+    """Checks any number of simple text rules in a single pass over each file.
+
+    Plain ASCII files are scanned as bytes, just as the WhitespaceFileLinter
+    scans them: each rule searches the buffer for the lines it might report,
+    and only those lines, and the last, are decoded and checked by every
+    rule. Anything else is read and decoded once, chunk by chunk, and each
+    line is handed to every enabled rule. Either way, enabling another rule
+    costs a search or a check per line rather than another read of the
+    file. Rules are enabled with the keyword arguments of the constructor;
+    line_length is a number of characters, or None to leave line lengths
+    alone.
+    """
+
+    version = '1'
+    logger = logging.getLogger(__name__)
+
+    def __init__(self,
+                 trailing_whitespace: bool = True,
+                 tabs: bool = False,
+                 line_length: Optional[int] = None,
+                 final_newline: bool = True,
+                 crlf: bool = False,
+                 non_ascii: bool = False):
+        self.enabled = {'trailing_whitespace': trailing_whitespace,
+                        'tabs': tabs,
+                        'line_length': line_length,
+                        'final_newline': final_newline,
+                        'crlf': crlf,
+                        'non_ascii': non_ascii}  # type: Dict[str, object]
+
+        self.rules = []  # type: List[TextRule]
+
+        if trailing_whitespace:
+            self.rules.append(TrailingWhitespaceRule())
+        if tabs:
+            self.rules.append(TabRule())
+        if line_length is not None:
+            self.rules.append(LineLengthRule(line_length))
+        if final_newline:
+            self.rules.append(FinalNewlineRule())
+        if crlf:
+            self.rules.append(CrlfRule())
+        if non_ascii:
+            self.rules.append(NonAsciiRule())
+
+        # only the rules that override a check are called for it
+        self.line_checks = [rule.check_line for rule in self.rules
+                            if type(rule).check_line is not TextRule.check_line]
+        self.buffer_finds = [rule.find_in_buffer for rule in self.rules
+                             if type(rule).check_line is not TextRule.check_line]
+        self.last_line_checks = [rule.check_last_line for rule in self.rules
+                                 if type(rule).check_last_line is not TextRule.check_last_line]
+
+    def __repr__(self):
+        return 'Text Linter'
+
+    def config(self) -> dict:
+        """The settings that can change what this linter reports."""
+
+        return dict(self.enabled)
+
+    def lint_text(self, filename: str) -> List[LintError]:
+        """Lint the given file line by line, once decoded, with every enabled rule."""
+
+        return self.check_lines(number_lines(self.get_lines_and_endings(filename)))
+
+    def lint_decoded(self, text: str, lines: Optional[List[range]] = None) -> List[LintError]:
+        """Lint the decoded contents of a file with every enabled rule, only the given ranges of lines if given."""
+
+        if lines is None:
+            return self.check_lines(number_lines(split_line_ending(line) for line in text.splitlines(keepends=True)))
+
+        text_lines = text.splitlines(keepends=True)
+
+        return self.check_lines(((line_number,) + split_line_ending(text_lines[line_number - 1])
+                                 for line_number in line_numbers_in(lines, len(text_lines))),
+                                last_line_number=len(text_lines))
+
+    def needs_decoding(self, buffer) -> bool:
+        """Whether a buffer holds any bytes other than plain_bytes, or a '\\r' outside of a '\\r\\n'."""
+
+        for start in range(0, len(buffer), self.chunk_size):
+            # a byte over, so a '\r\n' split between chunks is seen whole
+            chunk = buffer[start:start + self.chunk_size + 1]
+
+            # a '\r' just over belongs to the next chunk, and is checked with it
+            if len(chunk) > self.chunk_size and chunk.endswith(b'\r'):
+                chunk = chunk[:-1]
+
+            if chunk.replace(b'\r\n', b'').translate(None, self.plain_bytes):
+                return True
+
+        return False
+
+    def lint_buffer(self, buffer, lines: Optional[List[range]] = None) -> List[LintError]:
+        """Lint a buffer of ASCII text, with '\\n' or '\\r\\n' line endings.
+
+        Only the lines some rule found in the buffer, and the last line, are
+        copied out of it and decoded, and of those only the lines within the
+        given ranges of line numbers are checked. If a rule can't search the
+        buffer, the whole buffer is decoded.
+        """
+
+        offsets = set()
+
+        for find in self.buffer_finds:
+            found = find(buffer)
+
+            if found is None:
+                return self.lint_decoded(buffer[:].decode('ascii'), lines)
+
+            offsets.update(found)
+
+        if lines is None:
+            if self.last_line_checks:
+                offsets.add(len(buffer) - 1)
+
+            return self.check_lines(buffer_lines(buffer, offsets))
+
+        # the last line is always found, to learn its line number
+        offsets.add(len(buffer) - 1)
+        found_lines = list(buffer_lines(buffer, offsets))
+
+        return self.check_lines((line for line in found_lines
+                                 if any(line[0] in line_range for line_range in lines)),
+                                last_line_number=found_lines[-1][0])
+
+    def check_lines(self, lines: Iterable[Tuple[int, str, str]],
+                    last_line_number: Optional[int] = None) -> List[LintError]:
+        """Check each line, given as its line number, content and line ending, with every enabled rule.
+
+        :param lines: The lines to check, in order
+        :param last_line_number: The line number of the last line of the file, which is only checked as
+                                 the last line if given; None checks the last line given as the last line
+        :return List[LintError]:
+        """
+
+        total_matches = []
+        line_number = 0
+        content = ending = None
+
+        try:
+            for line_number, content, ending in lines:
+                for check in self.line_checks:
+                    lint_error = check(line_number, content, ending)
+                    if lint_error is not None:
+                        total_matches.append(lint_error)
+
+            if line_number and last_line_number in (None, line_number):
+                for check in self.last_line_checks:
+                    lint_error = check(line_number, content, ending)
+                    if lint_error is not None:
+                        total_matches.append(lint_error)
+        except Exception as e:
+            self.logger.error(
+                'File processing failed.\nException: \n{}'.format(e))
+            total_matches = []
+
+        return total_matches
+
+    def lint_lines(self, filename: str, lines: List[range]) -> List[LintError]:
+        """Lint only the given ranges of line numbers of the given file."""
+
+        return LintWrapper.lint_lines(self, filename, lines)
+
+    def get_lines_and_endings(self, filename: str) -> Iterator[Tuple[str, str]]:
+        """Open the file at the given path and yield the content and line ending of each line.
+
+        Lines are split just as get_lines splits them, but line endings are
+        left untranslated, so '\\r\\n' can be told apart from '\\n'.
+        """
+
+        with open(filename, 'r', newline='') as file:
+            partial_line = ''
+
+            for chunk in iter(lambda: file.read(self.chunk_size), ''):
+                lines = (partial_line + chunk).splitlines(keepends=True)
+
+                # the last line may carry on in the next chunk, including a
+                # '\r' whose '\n' hasn't been read yet
+                partial_line = lines.pop() if split_line_ending(lines[-1])[1] in ('', '\r') else ''
+
+                for line in lines:
+                    yield split_line_ending(line)
+
+            if partial_line:
+                yield split_line_ending(partial_line)
+
+
+# the characters str.splitlines splits on, other than '\r\n'
+LINE_BREAKS = '\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029'
+
+
+def number_lines(lines_and_endings: Iterable[Tuple[str, str]]) -> Iterator[Tuple[int, str, str]]:
+    """Number lines, given as their content and line ending, from 1."""
+
+    for line_number, (content, ending) in enumerate(lines_and_endings, start=1):
+        yield line_number, content, ending
+
+
+def buffer_lines(buffer, offsets: Iterable[int]) -> Iterator[Tuple[int, str, str]]:
+    """Decode the lines of a buffer of ASCII text that the given offsets fall in, in order.
+
+    :param buffer: A buffer of ASCII text, with '\\n' or '\\r\\n' line endings
+    :param offsets: Offsets into the buffer, in any order
+    :return Iterator[Tuple[int, str, str]]: The line number, content and line ending of each line
+    """
+
+    for line_number, start, end in WhitespaceFileLinter.lines_at(buffer, offsets):
+        content = buffer[start:end].decode('ascii')
+        ending = '\n' if end < len(buffer) else ''
+
+        if content.endswith('\r'):
+            content, ending = content[:-1], '\r\n'
+
+        yield line_number, content, ending
+
+
+def split_line_ending(line: str) -> Tuple[str, str]:
+    """Split a line, as split by str.splitlines(keepends=True), into its content and line ending."""
+
+    if line.endswith('\r\n'):
+        return line[:-2], '\r\n'
+
+    if line and line[-1] in LINE_BREAKS:
+        return line[:-1], line[-1]
+
+    return line, ''
@@ -14,57 +14,337 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import itertools
+import locale
 import logging
-from typing import List
-
-import re
+import mmap
+import os
+from typing import Iterable, Iterator, List, Optional, Set, TextIO, Tuple
 
 from lintable_lintball.lint_error import LintError
+from lintable_lintball.lint_limits import LintSkipped
 from lintable_lintball.lint_wrapper import LintWrapper
+from lintable_lintball.pool_type import PoolType
+from lintable_settings.settings import LINTBALL_SETTINGS
 
 class WhitespaceFileLinter(LintWrapper):
     """Detects lines in a given file with trailing whitespace."""
 
-    ws_regex = re.compile(r"^(.*?)(\s+)$")
+    # the bytes the fast path can handle: anything outside ASCII has to be
+    # decoded to count columns in characters, and the control characters
+    # left out are line breaks to str.splitlines
+    plain_bytes = bytes(byte for byte in range(128) if byte not in b'\r\x0b\x0c\x1c\x1d\x1e')
+
+    # how much of the file is checked for other bytes, or decoded, at a time
+    chunk_size = 1024 * 1024
+
+    # files larger than this, in bytes, are skipped; None uses
+    # LINTBALL_SETTINGS['limits']['max_file_size']
+    max_file_size = None  # type: Optional[int]
+
+    # the ASCII whitespace left once the line breaks above are ruled out
+    whitespace_bytes = b' \t\x1f'
+
+    # a file is linted in far less time than it takes to pickle its contents
+    # over to a worker process, so threads are the cheaper pool
+    pool_type = PoolType.THREAD
+    version = '1'
+    line_local = True
+    reads_bytes = True
     logger = logging.getLogger(__name__)
 
     def __repr__(self):
         return 'Whitespace Linter'
 
     def lint(self, filename: str) -> List[LintError]:
-        """Lint the given file, provided as a file path."""
+        """Lint the given file, provided as a file path.
+
+        Plain ASCII files are scanned as bytes, straight from a memory map,
+        only looking at the lines that end in whitespace. Anything else is
+        decoded and checked line by line.
+        """
+
+        self.check_file_size(filename)
+
+        try:
+            with open(filename, 'rb') as file:
+                if os.fstat(file.fileno()).st_size == 0:
+                    return []
+
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    if not self.needs_decoding(buffer):
+                        return self.lint_buffer(buffer)
+        except Exception as e:
+            self.logger.error(
+                'File processing failed.\nException: \n{}'.format(e))
+            return []
+
+        return self.lint_text(filename)
+
+    def lint_bytes(self, filename: str, data: bytes) -> List[LintError]:
+        """Lint the contents of a file, just as lint would lint them on disk."""
+
+        return self.lint_data(filename, data, None)
+
+    def lint_bytes_lines(self, filename: str, data: bytes, lines: List[range]) -> List[LintError]:
+        """Lint only the given ranges of line numbers of the contents of a file."""
+
+        return self.lint_data(filename, data, lines)
+
+    def lint_data(self, filename: str, data: bytes, lines: Optional[List[range]]) -> List[LintError]:
+        """Lint the contents of a file, only the given ranges of line numbers if given."""
+
+        self.check_size(filename, len(data))
+
+        if not data:
+            return []
+
+        if not self.needs_decoding(data):
+            return self.lint_buffer(data, lines)
+
+        try:
+            text = data.decode(locale.getpreferredencoding(False))
+        except Exception as e:
+            self.logger.error(
+                'File processing failed.\nException: \n{}'.format(e))
+            return []
+
+        return self.lint_decoded(text, lines)
+
+    def lint_decoded(self, text: str, lines: Optional[List[range]] = None) -> List[LintError]:
+        """Lint the decoded contents of a file, only the given ranges of line numbers if given."""
+
+        # translate line endings as a file opened in text mode would
+        text_lines = text.replace('\r\n', '\n').replace('\r', '\n').splitlines()
+
+        if lines is None:
+            return self.lint_line_iterator(text_lines)
 
         total_matches = []
-        lines = self.get_lines(filename)
-        line_number = 1
 
-        for line in lines:
-            lint_error = self.has_trailing_whitespace(line_number, line)
+        for line_number in line_numbers_in(lines, len(text_lines)):
+            lint_error = self.has_trailing_whitespace(line_number, text_lines[line_number - 1])
             if lint_error is not None:
                 total_matches.append(lint_error)
-            line_number += 1
+
+        return total_matches
+
+    def check_file_size(self, filename: str):
+        """Raise LintSkipped if the file is too large to lint."""
+
+        try:
+            size = os.path.getsize(filename)
+        except OSError:
+            return  # reported when the file is opened
+
+        self.check_size(filename, size)
+
+    def check_size(self, filename: str, size: int):
+        """Raise LintSkipped if a file of size bytes is too large to lint."""
+
+        max_file_size = self.max_file_size if self.max_file_size is not None else \
+            LINTBALL_SETTINGS['limits']['max_file_size']
+
+        if max_file_size and size > max_file_size:
+            raise LintSkipped('{filename} is {size} bytes, over the limit of {max_file_size}'.format(
+                filename=filename, size=size, max_file_size=max_file_size))
+
+    def needs_decoding(self, buffer) -> bool:
+        """Whether a buffer holds any bytes other than plain_bytes."""
+
+        for start in range(0, len(buffer), self.chunk_size):
+            # deleting the plain bytes leaves nothing behind unless there are others
+            if buffer[start:start + self.chunk_size].translate(None, self.plain_bytes):
+                return True
+
+        return False
+
+    def lint_buffer(self, buffer, lines: Optional[List[range]] = None) -> List[LintError]:
+        """Lint a buffer of ASCII text, without line breaks other than newlines.
+
+        Rather than splitting the buffer into lines, the newlines preceded by
+        whitespace are searched for directly, so only the lines with errors
+        are ever copied out of the buffer. If ranges of line numbers are
+        given, only the errors within them are copied out.
+        """
+
+        total_matches = []
+
+        for line_number, start, end in self.lines_at(buffer, self.trailing_whitespace_offsets(buffer, (b'\n',))):
+            if lines is not None and not any(line_number in line_range for line_range in lines):
+                continue
+
+            prefix = buffer[start:end].rstrip(self.whitespace_bytes)
+
+            total_matches.append(LintError(line_number=line_number,
+                                           column=len(prefix) + 1,
+                                           msg="Found trailing whitespace: '{}'".format(prefix.decode('ascii'))))
+
+        return total_matches
+
+    def trailing_whitespace_offsets(self, buffer, endings: Iterable[bytes]) -> Set[int]:
+        """Find the offsets of the whitespace bytes that end a line of a buffer.
+
+        :param buffer: A buffer of ASCII text
+        :param endings: The line endings the buffer's lines may end with
+        :return Set[int]: The offset of the last whitespace byte of each line that ends in whitespace
+        """
+
+        offsets = set()
+
+        for byte, ending in itertools.product(self.whitespace_bytes, endings):
+            needle = bytes((byte,)) + ending
+            position = buffer.find(needle)
+
+            while position != -1:
+                offsets.add(position)
+                position = buffer.find(needle, position + len(needle))
+
+        # the last line might not end with a newline
+        if buffer[len(buffer) - 1] in self.whitespace_bytes:
+            offsets.add(len(buffer) - 1)
+
+        return offsets
+
+    @staticmethod
+    def lines_at(buffer, offsets: Iterable[int]) -> Iterator[Tuple[int, int, int]]:
+        """Find the lines of a buffer that the given offsets fall in, in order.
+
+        Only the newlines before each offset are counted, rather than the
+        buffer being split into lines, so finding a few lines of a large
+        buffer is cheap.
+
+        :param buffer: A buffer of text, with newlines ending its lines
+        :param offsets: Offsets into the buffer, in any order
+        :return Iterator[Tuple[int, int, int]]: The line number, start and end of each line an offset
+                                                 falls in, once, the end being the offset of its newline
+                                                 or the end of the buffer
+        """
+
+        line_number = 1
+        counted_to = 0
+        end = -1
+
+        for offset in sorted(offsets):
+            if offset <= end:
+                continue  # on the line just found
+
+            # mmap has no count, so count the newlines of each stretch in turn
+            line_number += buffer[counted_to:offset].count(b'\n')
+            counted_to = offset
+
+            start = buffer.rfind(b'\n', 0, offset) + 1
+            end = buffer.find(b'\n', offset)
+
+            if end == -1:
+                end = len(buffer)
+
+            yield line_number, start, end
+
+    def lint_text(self, filename: str) -> List[LintError]:
+        """Lint the given file line by line, once decoded."""
+
+        return self.lint_line_iterator(self.get_lines(filename))
+
+    def lint_line_iterator(self, lines: Iterable[str]) -> List[LintError]:
+        """Lint lines, without their line endings, in order."""
+
+        total_matches = []
+        line_number = 1
+
+        try:
+            for line in lines:
+                lint_error = self.has_trailing_whitespace(line_number, line)
+                if lint_error is not None:
+                    total_matches.append(lint_error)
+                line_number += 1
+        except Exception as e:
+            self.logger.error(
+                'File processing failed.\nException: \n{}'.format(e))
+            total_matches = []
+
+        return total_matches
+
+    def lint_lines(self, filename: str, lines: List[range]) -> List[LintError]:
+        """Lint only the given ranges of line numbers of the given file."""
+
+        self.check_file_size(filename)
+
+        total_matches = []
+        ranges = sorted((line_range for line_range in lines if line_range), key=lambda r: r.start)
+        index = 0
+
+        try:
+            # numbered as lint numbers them, by str.splitlines rather than by '\n'
+            for line_number, line in enumerate(self.get_lines(filename), start=1):
+                while index < len(ranges) and line_number >= ranges[index].stop:
+                    index += 1
+
+                if index == len(ranges):
+                    break
+
+                if line_number < ranges[index].start:
+                    continue
+
+                lint_error = self.has_trailing_whitespace(line_number, line)
+                if lint_error is not None:
+                    total_matches.append(lint_error)
+        except Exception as e:
+            self.logger.error(
+                'File processing failed.\nException: \n{}'.format(e))
 
         return total_matches
 
     def has_trailing_whitespace(self, line_number: int, line: str) -> List[LintError]:
         """Detects whether the given line has trailing whitespace."""
 
-        match = self.ws_regex.match(line)
-        if match:
+        prefix = line.rstrip()
+        if len(prefix) != len(line):
             return LintError(line_number=line_number,
-                             column=match.start(2) + 1,
-                             msg="Found trailing whitespace: '{}'".format(match.group(1)))
+                             column=len(prefix) + 1,
+                             msg="Found trailing whitespace: '{}'".format(prefix))
         else:
             return None
 
-    def get_lines(self, filename: str) -> List[str]:
-        """Open the file at the given path and return its contents as a list."""
+    def get_lines(self, filename: str) -> Iterator[str]:
+        """Open the file at the given path and yield its lines, as split by str.splitlines.
 
-        try:
-            with open(filename, 'r') as file:
-                lines = file.read().splitlines()
-        except Exception as e:
-            self.logger.error(
-                'File processing failed.\nException: \n{}'.format(e))
-            lines = []
-        return lines
+        The file is decoded chunk_size characters at a time, so only a chunk
+        and the line being read are held in memory however large the file
+        is. Errors reading or decoding the file are raised as the lines are
+        read.
+        """
+
+        with open(filename, 'r') as file:
+            yield from text_lines(file, self.chunk_size)
+
+
+def text_lines(file: TextIO, chunk_size: int = 1024 * 1024) -> Iterator[str]:
+    """Yield the lines of a text file opened with universal newlines, as split by str.splitlines.
+
+    :param file: The file to read
+    :param chunk_size: How many characters to read at a time
+    :return Iterator[str]: The lines, without their line endings
+    """
+
+    partial_line = ''
+
+    for chunk in iter(lambda: file.read(chunk_size), ''):
+        lines = (partial_line + chunk).splitlines(keepends=True)
+
+        # the last line may carry on in the next chunk; universal
+        # newlines leave only single character line breaks behind
+        partial_line = lines.pop() if lines[-1].splitlines()[0] == lines[-1] else ''
+
+        for line in lines:
+            yield line[:-1]
+
+    if partial_line:
+        yield partial_line
+
+
+def line_numbers_in(lines: List[range], line_count: int) -> List[int]:
+    """The line numbers, of a file line_count lines long, within any of the given ranges, in order."""
+
+    return sorted(set(line_number for line_range in lines
+                      for line_number in range(max(line_range.start, 1), min(line_range.stop, line_count + 1))))
@@ -0,0 +1,100 @@
+"""Serves the metrics of a worker over HTTP, for Prometheus to scrape."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hmac
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from typing import Optional
+
+from lintable_metrics.registry import CONTENT_TYPE, exposition
+from lintable_settings.settings import LINTBALL_SETTINGS
+
+LOGGER = logging.getLogger(__name__)
+
+
+class MetricsServer(ThreadingMixIn, HTTPServer):
+    """Answers each scrape from a thread of its own."""
+
+    daemon_threads = True
+
+
+def is_authorized(authorization: Optional[str], token: Optional[str] = None) -> bool:
+    """Whether a request's Authorization header carries the bearer token the metrics are served with.
+
+    :param authorization: The request's Authorization header, or None if it has none
+    :param token: The token, defaults to LINTBALL_SETTINGS['metrics']['token']; nothing is authorized without one
+    :return bool:
+    """
+
+    token = LINTBALL_SETTINGS['metrics']['token'] if token is None else token
+
+    if not token or authorization is None:
+        return False
+
+    return hmac.compare_digest(authorization.encode('utf-8'), 'Bearer {token}'.format(token=token).encode('utf-8'))
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Answers GET /metrics with the metrics, if it carries the token, and anything else with a 404."""
+
+    token = ''  # type: str
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+
+        if not is_authorized(self.headers.get('Authorization'), self.token):
+            self.send_error(401)
+            return
+
+        body = exposition()
+
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # scrapes come every few seconds, so keep them out of the worker's log
+        LOGGER.debug(format % args)
+
+
+def start_exporter(port: int, token: str, address: str = '') -> Optional[MetricsServer]:
+    """Serve the metrics on a port from a background thread.
+
+    :param port: The port to listen on, or 0 for any free port
+    :param token: The bearer token scrapes have to carry
+    :param address: The address to listen on, defaults to every address
+    :return Optional[MetricsServer]: The server, to find its port or shut it down, or None if the port is taken
+    """
+
+    handler = type('BoundMetricsRequestHandler', (MetricsRequestHandler,), {'token': token})
+
+    try:
+        server = MetricsServer((address, port), handler)
+    except OSError as error:
+        # another worker on the same host got the port first, which shouldn't stop this one from working
+        LOGGER.warning('Not serving metrics on port {port}: {error}'.format(port=port, error=error))
+        return None
+
+    thread = threading.Thread(target=server.serve_forever, name='lintable-metrics', daemon=True)
+    thread.start()
+
+    return server
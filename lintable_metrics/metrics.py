@@ -0,0 +1,84 @@
+"""The metrics lintable exports, shared by the web app and the workers."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# imported first, so prometheus_client shares the metrics between processes if it should
+from lintable_metrics.registry import DEFAULT_BUCKETS
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# buckets for counts per job, rather than durations
+COUNT_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000)
+
+# the pull request actions GitHub sends, anything else is counted as 'other' so
+# the action label can't grow without bound
+WEBHOOK_ACTIONS = frozenset(['assigned', 'unassigned', 'labeled', 'unlabeled', 'opened', 'edited', 'closed',
+                             'reopened', 'synchronize', 'review_requested', 'review_request_removed', 'none'])
+
+WEBHOOKS = Counter('lintable_webhooks_total',
+                   'GitHub webhooks received, by pull request action.',
+                   ('action',))
+
+QUEUE_WAIT_SECONDS = Histogram('lintable_queue_wait_seconds',
+                               'Time tasks spent on the broker before a worker started them.',
+                               ('task',), buckets=DEFAULT_BUCKETS)
+
+JOB_SECONDS = Histogram('lintable_job_seconds',
+                        'Time each job took, from starting to finishing.',
+                        buckets=DEFAULT_BUCKETS)
+
+STAGE_SECONDS = Histogram('lintable_stage_seconds',
+                          'Time each job spent in each stage of the linting process.',
+                          ('stage',), buckets=DEFAULT_BUCKETS)
+
+LINTER_SECONDS = Histogram('lintable_linter_seconds',
+                           'Time each linter spent on each file, across both commits.',
+                           ('linter',), buckets=DEFAULT_BUCKETS)
+
+JOB_FILES = Histogram('lintable_job_files',
+                      'Files linted per job.',
+                      buckets=COUNT_BUCKETS)
+
+JOB_ERRORS = Histogram('lintable_job_errors',
+                       'New errors reported per job.',
+                       buckets=COUNT_BUCKETS)
+
+LINT_OUTCOMES = Counter('lintable_lint_outcomes_total',
+                        'Files a linter timed out on, failed on or skipped, by outcome.',
+                        ('outcome',))
+
+LINTER_PROCESSES = Counter('lintable_linter_processes_total',
+                           'Linter subprocesses started, by command.',
+                           ('command',))
+
+# summed over the processes that are still running, so linters of processes that died aren't counted
+LINTER_PROCESSES_RUNNING = Gauge('lintable_linter_processes_running',
+                                 'Linter subprocesses running right now, by command.',
+                                 ('command',), multiprocess_mode='livesum')
+
+DB_WRITE_SECONDS = Histogram('lintable_db_write_seconds',
+                             'Time spent writing a job\'s progress to the database, by operation.',
+                             ('operation',), buckets=DEFAULT_BUCKETS)
+
+REPO_CACHE_UPDATES = Counter('lintable_repo_cache_updates_total',
+                             'Jobs that found their commits in the repo cache, or had to fetch or clone them, '
+                             'and mirrors recloned or evicted, by outcome.',
+                             ('outcome',))
+
+
+def webhook_action(action: object) -> str:
+    """The action label to count a webhook under."""
+
+    return action if isinstance(action, str) and action in WEBHOOK_ACTIONS else 'other'
@@ -0,0 +1,118 @@
+"""Metrics shared by the processes of the web app or a worker, exposed in the Prometheus text format."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import glob
+import os
+import re
+from typing import Optional
+
+# prometheus_client picks whether processes share their metrics through files when it's
+# first imported, so the directory has to be in the environment before anything imports it
+from lintable_settings.settings import LINTBALL_SETTINGS
+
+if LINTBALL_SETTINGS['metrics']['path']:
+    os.environ.setdefault('prometheus_multiproc_dir', LINTBALL_SETTINGS['metrics']['path'])
+    os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.environ['prometheus_multiproc_dir'])
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
+from prometheus_client.multiprocess import MultiProcessCollector, mark_process_dead
+
+# the content type of the Prometheus text format
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+# histogram buckets, in seconds, suited to anything from a database write to a whole job
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 1800.0)
+
+# the files live gauges keep per process, like gauge_livesum_1234.db
+LIVE_GAUGE_FILE = re.compile(r'^gauge_live(?:sum|all)_(\d+)\.db$')
+
+
+def multiprocess_path() -> Optional[str]:
+    """The directory the processes share their metrics through, or None if each process keeps its own."""
+
+    return os.environ.get('PROMETHEUS_MULTIPROC_DIR') or os.environ.get('prometheus_multiproc_dir') or None
+
+
+def is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # someone else's process, which is still running
+        pass
+
+    return True
+
+
+def prune_dead_processes(path: str):
+    """Drop the gauges of processes that are gone without saying so, like pool processes that were killed.
+
+    Counters and histograms of dead processes are kept, so counts from
+    recycled processes aren't lost, but what a gauge says was running in
+    them isn't anymore.
+
+    :param path: The directory the processes share their metrics through
+    :return:
+    """
+
+    for filename in os.listdir(path):
+        match = LIVE_GAUGE_FILE.match(filename)
+
+        if match is not None and not is_alive(int(match.group(1))):
+            mark_process_dead(int(match.group(1)), path)
+
+
+def clear_other_processes(path: str):
+    """Remove what processes other than this one left in the directory, like a previous run of the worker.
+
+    :param path: The directory the processes share their metrics through
+    :return:
+    """
+
+    own_suffix = '_{pid}.db'.format(pid=os.getpid())
+
+    for filename in glob.glob(os.path.join(path, '*.db')):
+        if not filename.endswith(own_suffix):
+            os.remove(filename)
+
+
+def process_dead(pid: int):
+    """Stop counting the gauges of a process that's shutting down, if the processes share their metrics.
+
+    :param pid: The process's id
+    :return:
+    """
+
+    path = multiprocess_path()
+
+    if path is not None:
+        mark_process_dead(pid, path)
+
+
+def exposition() -> bytes:
+    """Every metric, summed across the processes sharing them, in the Prometheus text format."""
+
+    path = multiprocess_path()
+
+    if path is None:
+        return generate_latest(REGISTRY)
+
+    prune_dead_processes(path)
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry, path)
+
+    return generate_latest(registry)
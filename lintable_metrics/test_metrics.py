@@ -0,0 +1,121 @@
+"""Tests for the metrics, their sharing between processes and their exporter."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+import urllib.error
+import urllib.request
+
+from lintable_metrics.exporter import is_authorized, start_exporter
+from lintable_metrics.metrics import webhook_action
+from lintable_metrics.registry import CONTENT_TYPE
+
+# counts in a process that dies without saying so, then exposes the metrics of both
+MULTIPROCESS_SCRIPT = '''
+import os
+from lintable_metrics.registry import exposition
+from prometheus_client import Counter, Gauge
+
+jobs = Counter('jobs_total', 'Jobs.')
+running = Gauge('running', 'Running linters.', multiprocess_mode='livesum')
+
+pid = os.fork()
+
+if pid == 0:
+    jobs.inc(2)
+    running.inc(5)
+    os._exit(0)
+
+os.waitpid(pid, 0)
+jobs.inc()
+running.inc()
+print(exposition().decode('utf-8'))
+'''
+
+
+class MetricsTests(unittest.TestCase):
+    """Tests for the metrics, their sharing between processes and their exporter."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'needs fork')
+    def test_processes_are_summed(self):
+        """Make sure counters count dead processes, and gauges only live ones."""
+
+        environment = dict(os.environ, LINTBALL_METRICS_PATH=self.tmp_dir)
+        environment.pop('prometheus_multiproc_dir', None)
+        environment.pop('PROMETHEUS_MULTIPROC_DIR', None)
+
+        output = subprocess.check_output([sys.executable, '-c', MULTIPROCESS_SCRIPT], env=environment,
+                                         universal_newlines=True)
+
+        self.assertIn('jobs_total 3.0\n', output)
+        self.assertIn('running 1.0\n', output)
+
+    def test_webhook_action(self):
+        """Make sure only the actions GitHub sends get a label of their own."""
+
+        self.assertEqual(webhook_action('opened'), 'opened')
+        self.assertEqual(webhook_action('made up'), 'other')
+        self.assertEqual(webhook_action(['opened']), 'other')
+
+    def test_is_authorized(self):
+        """Make sure scrapes need the token, and nothing is authorized without one."""
+
+        self.assertTrue(is_authorized('Bearer secret', 'secret'))
+        self.assertFalse(is_authorized('Bearer guess', 'secret'))
+        self.assertFalse(is_authorized(None, 'secret'))
+        self.assertFalse(is_authorized('Bearer ', ''))
+
+    def test_exporter(self):
+        """Make sure the exporter serves the metrics on /metrics to scrapes with the token, and nothing else."""
+
+        server = start_exporter(0, 'secret', address='127.0.0.1')
+
+        try:
+            url = 'http://127.0.0.1:{port}'.format(port=server.server_address[1])
+            scrape = urllib.request.Request(url + '/metrics', headers={'Authorization': 'Bearer secret'})
+
+            with urllib.request.urlopen(scrape) as response:
+                self.assertIn(b'# TYPE lintable_webhooks_total counter\n', response.read())
+                self.assertEqual(response.headers['Content-Type'], CONTENT_TYPE)
+
+            with self.assertRaises(urllib.error.HTTPError) as raised:
+                urllib.request.urlopen(url + '/metrics')
+
+            self.assertEqual(raised.exception.code, 401)
+
+            with self.assertRaises(urllib.error.HTTPError) as raised:
+                urllib.request.urlopen(url + '/other')
+
+            self.assertEqual(raised.exception.code, 404)
+
+            # a second worker on the same port carries on without an exporter
+            self.assertIsNone(start_exporter(server.server_address[1], 'secret', address='127.0.0.1'))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,6 +14,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from contextlib import contextmanager
 from typing import Optional
 from uuid import UUID
 
@@ -22,33 +23,55 @@ from git import Commit, Repo
 
 from lintable_db import models
 from lintable_db.database import DatabaseHandler
-from lintable_db.models import Jobs, Report, ReportSummary
+from lintable_db.models import EncodedReport, Jobs, Report, ReportSummary
 from lintable_lintball.lint_report import LintReport
+from lintable_lintball.lint_report_codec import encode_report
+from lintable_metrics.metrics import DB_WRITE_SECONDS
+from lintable_tracing.tracing import TRACER
 from lintable_processes.do_nothing_handler import DoNothingHandler
+from lintable_settings.settings import LINTBALL_SETTINGS
 
 
 class DBHandler(DoNothingHandler):
     """Updates the database based on a job's progress."""
 
-    def __init__(self, repo_id: int):
+    def __init__(self, repo_id: int, store_encoded: Optional[bool] = None):
+        """
+        :param repo_id: The github id of the repo being linted
+        :param store_encoded: Whether to store the report as a single encoded blob, rather than a row per
+                              error, defaults to LINTBALL_SETTINGS['report']['store_encoded']
+        :return:
+        """
+
         super().__init__()
         self.job = None  # type: Optional[Jobs]
         self.repo_id = repo_id
         self.repo_fk = None  # type: Optional[models.Repo]
+        self.store_encoded = store_encoded if store_encoded is not None else \
+            LINTBALL_SETTINGS['report']['store_encoded']  # type: bool
 
     def report(self, uuid: UUID, lint_report: LintReport):
         """Called when the linting process has produced a LintReport."""
 
         super().report(uuid, lint_report)
 
-        for filename, errors in lint_report.errors.items():
-            for error in errors:
-                line = Report.create(report_number=self.job,
-                                     file_name=filename,
-                                     column_number=error.column,
-                                     line_number=error.line_number,
-                                     error_message=error.msg)
-                line.save()
+        with db_write('report'):
+            self.write_report(lint_report)
+
+    def write_report(self, lint_report: LintReport):
+        """Store a report's errors, and the number of errors in each file, for the job."""
+
+        if self.store_encoded:
+            EncodedReport.create(job=self.job, data=encode_report(lint_report)).save()
+        else:
+            for filename, errors in lint_report.errors.items():
+                for error in errors:
+                    line = Report.create(report_number=self.job,
+                                         file_name=filename,
+                                         column_number=error.column,
+                                         line_number=error.line_number,
+                                         error_message=error.msg)
+                    line.save()
 
         self.job.status = 'REPORT'
         self.job.save()
@@ -62,13 +85,22 @@ class DBHandler(DoNothingHandler):
 
         super().started(uuid)
         self.repo_fk = DatabaseHandler.get_repo(identifier=self.repo_id)
-        self.job = Jobs.create(job_id=uuid,
-                               repo_owner=self.repo_fk.owner_id,
-                               repo=self.repo_fk,
-                               start_time=datetime.datetime.now(),
-                               end_time=None,
-                               status='STARTED')
-        self.job.save()
+
+        with db_write('started'):
+            self.job = Jobs.create(job_id=uuid,
+                                   repo_owner=self.repo_fk.owner_id,
+                                   repo=self.repo_fk,
+                                   start_time=datetime.datetime.now(),
+                                   end_time=None,
+                                   status='STARTED')
+            self.job.save()
+
+    def resume(self, uuid: UUID):
+        """Picks up a process that was started by another task."""
+
+        super().resume(uuid)
+        self.repo_fk = DatabaseHandler.get_repo(identifier=self.repo_id)
+        self.job = DatabaseHandler.get_job(identifier=uuid)
 
     def lint_file(self, uuid: UUID, linter: str, file: str):
         """Called when each file is linted."""
@@ -76,26 +108,31 @@ class DBHandler(DoNothingHandler):
         super().lint_file(uuid, linter, file)
 
         if self.job.status != 'LINT_FILES':
-            self.job.status = 'LINT_FILES'
-            self.job.save()
+            with db_write('lint_file'):
+                self.job.status = 'LINT_FILES'
+                self.job.save()
 
     def finish(self, uuid: UUID):
         """Called as a last step to clean up the linting process."""
 
         super().finish(uuid)
-        self.job.end_time = datetime.datetime.now()
-        self.job.status = 'FINISHED'
-        self.job.save()
+
+        with db_write('finish'):
+            self.job.end_time = datetime.datetime.now()
+            self.job.status = 'FINISHED'
+            self.job.save()
 
     def retrieve_file_from_commit(self, uuid: UUID, file: str, commit: Commit):
         """Called for each file being retrieved."""
 
         super().retrieve_file_from_commit(uuid, file, commit)
-        file_summary = ReportSummary.create(job_id=self.job, file_name=file)
-        file_summary.save()
 
-        self.job.status = 'RETRIEVE_FILES'
-        self.job.save()
+        with db_write('retrieve_file'):
+            file_summary = ReportSummary.create(job_id=self.job, file_name=file)
+            file_summary.save()
+
+            self.job.status = 'RETRIEVE_FILES'
+            self.job.save()
 
     def retrieve_changed_file_set(self, uuid: UUID, a_commit: Commit, b_commit: Commit):
         """Indicates what files are going to be retrieved for the 2 commits."""
@@ -106,5 +143,15 @@ class DBHandler(DoNothingHandler):
         """Indicates a repo has been cloned and where that clone is located."""
 
         super().clone_repo(uuid, repo, local_path)
-        self.job.status = 'CLONE_REPO'
-        self.job.save()
+
+        with db_write('clone_repo'):
+            self.job.status = 'CLONE_REPO'
+            self.job.save()
+
+
+@contextmanager
+def db_write(operation: str):
+    """Time a write to the database, for the metrics and as a span of the job's trace."""
+
+    with TRACER.span('db.' + operation), DB_WRITE_SECONDS.labels(operation=operation).time():
+        yield
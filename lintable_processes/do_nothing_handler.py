@@ -18,7 +18,9 @@ from uuid import UUID
 
 from git import Commit, Repo
 
+from lintable_lintball.lint_outcome import LintOutcome
 from lintable_lintball.lint_report import LintReport
+from lintable_processes.process_timings import ProcessTimings
 
 class DoNothingHandler(object):
     """Does-nothing class to be used for subclassing."""
@@ -31,6 +33,11 @@ class DoNothingHandler(object):
 
         return
 
+    def resume(self, uuid: UUID):
+        """Picks up a process that was started by another task."""
+
+        return
+
     def clone_repo(self, uuid: UUID, repo: Repo, local_path: str):
         """Indicates a repo has been cloned and where that clone is located."""
 
@@ -46,16 +53,31 @@ class DoNothingHandler(object):
 
         return
 
+    def skip_file(self, uuid: UUID, file: str, commit: Commit, reason: str):
+        """Called for each changed file that won't be retrieved or linted."""
+
+        return
+
     def lint_file(self, uuid: UUID, linter: str, file: str):
         """Called when each file is linted."""
 
         return
 
+    def lint_file_outcome(self, uuid: UUID, linter: str, file: str, outcome: LintOutcome):
+        """Called when a linter times out or fails on a file."""
+
+        return
+
     def report(self, uuid: UUID, lint_report: LintReport):
         """Called when the linting process has produced a LintReport."""
 
         return
 
+    def timings(self, uuid: UUID, timings: ProcessTimings):
+        """Called as the process finishes, with how long each stage, file and linter took."""
+
+        return
+
     def finish(self, uuid: UUID):
         """Called as a last step to clean up the linting process."""
 
@@ -19,8 +19,10 @@ from uuid import UUID
 
 from git import Commit, Repo
 
+from lintable_lintball.lint_outcome import LintOutcome
 from lintable_lintball.lint_report import LintReport
 from lintable_processes.do_nothing_handler import DoNothingHandler
+from lintable_processes.process_timings import ProcessTimings
 
 class LogHandler(DoNothingHandler):
     """Logger that the ProcessHandler can delegate to. Logs linting output."""
@@ -29,12 +31,26 @@ class LogHandler(DoNothingHandler):
         super().__init__()
         self.logger = logger
 
+    def skip_file(self, uuid: UUID, file: str, commit: Commit, reason: str):
+        """Called for each changed file that won't be retrieved or linted."""
+
+        super().skip_file(uuid, file, commit, reason)
+        self.logger.info('Skipping {reason} file {file} from {commit}'.format(reason=reason, file=file, commit=commit))
+
     def lint_file(self, uuid: UUID, linter: str, file: str):
         """Called when each file is linted."""
 
         super().lint_file(uuid, linter, file)
         self.logger.info('Linting {file} with linter {linter}'.format(file=file, linter=linter))
 
+    def lint_file_outcome(self, uuid: UUID, linter: str, file: str, outcome: LintOutcome):
+        """Called when a linter times out or fails on a file."""
+
+        super().lint_file_outcome(uuid, linter, file, outcome)
+        self.logger.error('Linter {linter} {outcome} on {file}'.format(linter=linter,
+                                                                      outcome=outcome.name.lower().replace('_', ' '),
+                                                                      file=file))
+
     def retrieve_changed_file_set(self, uuid: UUID, a_commit: Commit, b_commit: Commit):
         """Indicates what files are going to be retrieved for the 2 commits."""
 
@@ -59,12 +75,38 @@ class LogHandler(DoNothingHandler):
             else:
                 self.logger.info('{file} contained no errors.'.format(file=file))
 
+        for file, outcome in lint_report.outcomes.items():
+            self.logger.info('{file} was not fully linted: {outcome}'.format(file=file, outcome=outcome.name))
+
+    def timings(self, uuid: UUID, timings: ProcessTimings):
+        """Called as the process finishes, with how long each stage, file and linter took."""
+
+        super().timings(uuid, timings)
+        timings_dict = timings.to_dict()
+
+        self.logger.info('Linting process {uuid} took {total:.3f}s: {stages}'.format(
+            uuid=uuid, total=timings_dict['total'],
+            stages=', '.join('{stage} {seconds:.3f}s'.format(stage=stage, seconds=seconds)
+                             for stage, seconds in timings_dict['stages'].items())))
+
+        for linter, seconds in timings_dict['linters'].items():
+            self.logger.info('Linter {linter} took {seconds:.3f}s'.format(linter=linter, seconds=seconds))
+
+        for file, seconds in timings.slowest_files(5):
+            self.logger.info('Linting {file} took {seconds:.3f}s'.format(file=file, seconds=seconds))
+
     def started(self, uuid: UUID):
         """Kicks off the process."""
 
         super().started(uuid)
         self.logger.info('Starting linting process with id: {uuid}'.format(uuid=uuid))
 
+    def resume(self, uuid: UUID):
+        """Picks up a process that was started by another task."""
+
+        super().resume(uuid)
+        self.logger.info('Resuming linting process with id: {uuid}'.format(uuid=uuid))
+
     def clone_repo(self, uuid: UUID, repo: Repo, local_path: str):
         """Indicates a repo has been cloned and where that clone is located."""
 
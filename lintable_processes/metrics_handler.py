@@ -0,0 +1,56 @@
+"""Records the metrics of each job, for Prometheus."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from uuid import UUID
+
+from lintable_lintball.lint_outcome import LintOutcome
+from lintable_lintball.lint_report import LintReport
+from lintable_metrics.metrics import (JOB_ERRORS, JOB_FILES, JOB_SECONDS, LINT_OUTCOMES, LINTER_SECONDS,
+                                      STAGE_SECONDS)
+from lintable_processes.do_nothing_handler import DoNothingHandler
+from lintable_processes.process_timings import ProcessTimings
+
+
+class MetricsHandler(DoNothingHandler):
+    """Records how long each job, stage and linter took, and how many files and errors each job had."""
+
+    def lint_file_outcome(self, uuid: UUID, linter: str, file: str, outcome: LintOutcome):
+        """Called when a linter times out or fails on a file."""
+
+        super().lint_file_outcome(uuid, linter, file, outcome)
+        LINT_OUTCOMES.labels(outcome=outcome.name.lower()).inc()
+
+    def report(self, uuid: UUID, lint_report: LintReport):
+        """Called when the linting process has produced a LintReport."""
+
+        super().report(uuid, lint_report)
+        JOB_FILES.observe(len(lint_report.errors))
+        JOB_ERRORS.observe(sum(len(errors) for errors in lint_report.errors.values()))
+
+    def timings(self, uuid: UUID, timings: ProcessTimings):
+        """Called as the process finishes, with how long each stage, file and linter took."""
+
+        super().timings(uuid, timings)
+        timings_dict = timings.to_dict()
+
+        JOB_SECONDS.observe(timings_dict['total'])
+
+        for stage, seconds in timings_dict['stages'].items():
+            STAGE_SECONDS.labels(stage=stage).observe(seconds)
+
+        for linters in timings_dict['files'].values():
+            for linter, seconds in linters.items():
+                LINTER_SECONDS.labels(linter=linter).observe(seconds)
@@ -13,24 +13,30 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from typing import List
+from typing import Dict, List, Optional, Tuple
 from uuid import UUID
 
 from git import Commit, Repo
 
+from lintable_git.hunk import Hunk
+from lintable_lintball.lint_outcome import LintOutcome
 from lintable_lintball.lint_report import LintReport
 from lintable_processes.do_nothing_handler import DoNothingHandler
 from lintable_processes.process_state import ProcessState
+from lintable_processes.process_timings import ProcessTimings
 
 
 class ProcessHandler(object):
     """Handles the linting process, between the GitHandler and Lintball.
 
     It tracks the state of the process and delegates to side-effecting code
-    for logging, db persistence, and GitHub status updates.
+    for logging, db persistence, and GitHub status updates. How long each
+    state lasted is kept in timings, which is handed to the delegates as the
+    process finishes.
     """
 
     def __init__(self, uuid: UUID, repo: Repo, handlers: List[DoNothingHandler]):
+        self.timings = ProcessTimings()
         self.state = ProcessState.STARTED
         self.uuid = uuid
         self.repo = repo
@@ -42,6 +48,22 @@ class ProcessHandler(object):
         self.a_path = None
         self.b_path = None
         self.files = []
+        self.blob_ids = {}  # type: Dict[Tuple[str, str], str]
+        self.contents = {}  # type: Dict[Tuple[str, str], bytes]
+        self.hunks = None  # type: Optional[Dict[str, List[Hunk]]]
+
+    @property
+    def state(self) -> ProcessState:
+        """The state the process is in."""
+
+        return self.timings.state if self.timings.state is not None else ProcessState.FINISHED
+
+    @state.setter
+    def state(self, state: ProcessState):
+        if state == ProcessState.FINISHED:
+            self.timings.stop()
+        else:
+            self.timings.enter(state)
 
     def started(self):
         """Kicks off the process.
@@ -51,6 +73,17 @@ class ProcessHandler(object):
         for h in self.handlers:
             h.started(uuid=self.uuid)
 
+    def resume(self):
+        """Picks up a process that was started by another task.
+
+        Used when a job is split across several Celery tasks, so that the
+        delegates can reattach to the job instead of starting a new one.
+
+        :return:
+        """
+        for h in self.handlers:
+            h.resume(uuid=self.uuid)
+
     def clone_repo(self, local_path: str, repo_path: str, a_path: str, b_path: str):
         """Indicates a repo has been cloned and where that clone is located.
 
@@ -89,22 +122,99 @@ class ProcessHandler(object):
 
         return
 
-    def retrieve_file_from_commit(self, file: str, commit: Commit):
+    def retrieve_file_from_commit(self, file: str, commit: Commit, blob_id: Optional[str] = None,
+                                  contents: Optional[bytes] = None):
         """Called for each file being retrieved.
 
         :param file: The filename being retrieved
         :param commit: The commit it is being retrieved from.
+        :param blob_id: The sha1 of the file's blob in that commit, if known.
+        :param contents: The contents of the file, if it is kept in memory rather than written to disk.
         :return:
         """
 
         # track which files we have retrieved
         self.files.append(file)
 
+        if blob_id is not None:
+            self.blob_ids[(commit.hexsha, file)] = blob_id
+
+        if contents is not None:
+            self.contents[(commit.hexsha, file)] = contents
+
         for h in self.handlers:
             h.retrieve_file_from_commit(self.uuid, file, commit)
 
         return
 
+    def skip_file(self, file: str, commit: Commit, reason: str):
+        """Called for each changed file that won't be retrieved or linted.
+
+        :param file: The filename being skipped
+        :param commit: The commit it would have been retrieved from.
+        :param reason: Why it is skipped, e.g. 'binary' or 'generated'
+        :return:
+        """
+
+        for h in self.handlers:
+            h.skip_file(self.uuid, file, commit, reason)
+
+        return
+
+    def retrieve_changed_hunks(self, hunks: Dict[str, List[Hunk]]):
+        """Indicates which lines of each file changed between the 2 commits.
+
+        :param hunks: The hunks of each changed file, keyed by filename
+        :return:
+        """
+
+        self.hunks = hunks
+
+        return
+
+    def blob_id(self, commit: Commit, file: str) -> Optional[str]:
+        """The sha1 of a retrieved file's blob in the given commit, if known.
+
+        :param commit: The commit the file was retrieved from
+        :param file: The filename that was retrieved
+        :return Optional[str]:
+        """
+
+        return self.blob_ids.get((commit.hexsha, file))
+
+    def file_contents(self, commit: Commit, file: str) -> Optional[bytes]:
+        """The contents of a retrieved file in the given commit, if it was kept in memory.
+
+        :param commit: The commit the file was retrieved from
+        :param file: The filename that was retrieved
+        :return Optional[bytes]:
+        """
+
+        return self.contents.get((commit.hexsha, file))
+
+    def lint_files(self):
+        """Indicates the retrieved files are about to be linted.
+
+        :return:
+        """
+
+        self.state = ProcessState.LINT_FILES
+
+        return
+
+    def lint_file_time(self, linter: str, file: str, seconds: float):
+        """Called with how long a linter took on a file, once its results are collected.
+
+        :param linter: The name of the linter being used
+        :param file: The filename being linted.
+        :param seconds: How long, in seconds, the linter ran for.
+        :return:
+        """
+
+        self.timings.add_lint(linter, file, seconds)
+
+        return
+
     def lint_file(self, linter: str, file: str):
         """Called when each file is linted.
 
@@ -120,6 +230,20 @@ class ProcessHandler(object):
 
         return
 
+    def lint_file_outcome(self, linter: str, file: str, outcome: LintOutcome):
+        """Called when a linter times out or fails on a file, so its errors are incomplete.
+
+        :param linter: The name of the linter being used
+        :param file: The filename being linted.
+        :param outcome: How linting the file turned out
+        :return:
+        """
+
+        for h in self.handlers:
+            h.lint_file_outcome(self.uuid, linter, file, outcome)
+
+        return
+
     def report(self, report: LintReport):
         """Called when the linting process has produced a LintReport.
 
@@ -143,6 +267,7 @@ class ProcessHandler(object):
         self.state = ProcessState.FINISHED
 
         for h in self.handlers:
+            h.timings(self.uuid, self.timings)
             h.finish(self.uuid)
 
         return
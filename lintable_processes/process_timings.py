@@ -0,0 +1,172 @@
+"""Records how long each stage of the linting process, and each linter on each file, took."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from lintable_processes.process_state import ProcessState
+
+
+class ProcessTimings(object):
+    """How long, in seconds, each stage of the linting process took.
+
+    Stages are timed with time.monotonic as the ProcessHandler moves from one
+    ProcessState to the next, so each stage lasts until the next one starts.
+    Each stage's wall clock start time and duration is also kept, in order, in
+    history. The time each linter spent on each file is measured where the
+    linter ran, so it leaves out time spent waiting in the pool; a file's time
+    covers both of its commits.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        """
+        :param clock: The clock to time with, returning seconds
+        :return:
+        """
+
+        self.clock = clock
+        # to turn the clock's times into wall clock times
+        self.wall_offset = time.time() - clock()  # type: float
+        self.stages = OrderedDict()  # type: Dict[ProcessState, float]
+        self.history = []  # type: List[Tuple[ProcessState, float, float]]
+        self.files = OrderedDict()  # type: Dict[str, Dict[str, float]]
+        self.linters = OrderedDict()  # type: Dict[str, float]
+        self.state = None  # type: Optional[ProcessState]
+        self.started_at = None  # type: Optional[float]
+        self.stage_started_at = None  # type: Optional[float]
+        self.stopped_at = None  # type: Optional[float]
+
+    def enter(self, state: ProcessState):
+        """Start timing a stage, which ends the current one; entering the current stage again does nothing.
+
+        :param state: The state the process is moving to
+        :return:
+        """
+
+        if state == self.state:
+            return
+
+        now = self.clock()
+        self.end_stage(now)
+
+        if self.started_at is None:
+            self.started_at = now
+
+        self.state = state
+        self.stage_started_at = now
+        self.stopped_at = None
+
+    def stop(self):
+        """Stop timing, ending the current stage.
+
+        :return:
+        """
+
+        now = self.clock()
+        self.end_stage(now)
+        self.state = None
+        self.stopped_at = now
+
+    def end_stage(self, now: float):
+        """Add the time since the current stage started to it, if there is one."""
+
+        if self.state is not None:
+            self.stages[self.state] = self.stages.get(self.state, 0.0) + now - self.stage_started_at
+            self.history.append((self.state, self.wall_offset + self.stage_started_at, now - self.stage_started_at))
+
+    def add_lint(self, linter: str, file: str, seconds: float):
+        """Record the time a linter spent on a file.
+
+        :param linter: The name of the linter
+        :param file: The filename it linted
+        :param seconds: How long it took
+        :return:
+        """
+
+        file_timings = self.files.setdefault(file, OrderedDict())
+        file_timings[linter] = file_timings.get(linter, 0.0) + seconds
+        self.linters[linter] = self.linters.get(linter, 0.0) + seconds
+
+    def merge(self, timings: dict):
+        """Add the timings of another part of the same job, as given by its to_dict.
+
+        Used when a job is split across several Celery tasks: each stage's
+        time, and each linter's time on each file, is added to these timings,
+        and the job is taken to have started when its earliest part did.
+
+        :param timings: The to_dict of the other part's ProcessTimings
+        :return:
+        """
+
+        for stage, seconds in timings['stages'].items():
+            state = ProcessState[stage.upper()]
+            self.stages[state] = self.stages.get(state, 0.0) + seconds
+
+        for file, linters in timings['files'].items():
+            for linter, seconds in linters.items():
+                self.add_lint(linter, file, seconds)
+
+        if timings.get('started_at') is not None:
+            started_at = timings['started_at'] - self.wall_offset
+
+            if self.started_at is None or started_at < self.started_at:
+                self.started_at = started_at
+
+    def stage(self, state: ProcessState) -> float:
+        """How long a stage took, so far if it is the current one."""
+
+        seconds = self.stages.get(state, 0.0)
+
+        if state == self.state:
+            seconds += self.clock() - self.stage_started_at
+
+        return seconds
+
+    def file(self, file: str) -> float:
+        """How long every linter took, together, on a file."""
+
+        return sum(self.files.get(file, {}).values())
+
+    def total(self) -> float:
+        """How long the process took, from its first stage until it stopped, or until now."""
+
+        if self.started_at is None:
+            return 0.0
+
+        return (self.stopped_at if self.stopped_at is not None else self.clock()) - self.started_at
+
+    def slowest_files(self, count: int) -> List[Tuple[str, float]]:
+        """The count files the linters took longest on, slowest first."""
+
+        return sorted(((file, self.file(file)) for file in self.files), key=lambda item: item[1], reverse=True)[:count]
+
+    def to_dict(self) -> dict:
+        """The timings, keyed by the lower case names of the stages, for JSON and the like.
+
+        started_at is the wall clock time the first stage started at, if any.
+        """
+
+        states = list(self.stages)
+
+        if self.state is not None and self.state not in self.stages:
+            states.append(self.state)
+
+        return {'total': self.total(),
+                'started_at': self.wall_offset + self.started_at if self.started_at is not None else None,
+                'stages': OrderedDict((state.name.lower(), self.stage(state)) for state in states),
+                'linters': OrderedDict(self.linters),
+                'files': OrderedDict((file, OrderedDict(linters)) for file, linters in self.files.items())}
@@ -17,6 +17,7 @@ from github.Commit import Commit as GithubCommit
 
 from lintable_lintball.lint_report import LintReport
 from lintable_processes.do_nothing_handler import DoNothingHandler
+from lintable_tracing.tracing import TRACER
 import logging
 
 LINTABLE = 'Lintable'
@@ -38,31 +39,33 @@ class StatusHandler(DoNothingHandler):
         super().lint_file(uuid, linter, file)
         if not self.linting_files:
             self.linting_files = True
-            self.github_commit.create_status(state='pending',
-                                             target_url=self.target_url,
-                                             description='Linting files',
-                                             context=LINTABLE)
+            self.create_status(state='pending', description='Linting files')
 
     def report(self, uuid: UUID, report: LintReport):
         super().report(uuid, report)
         num_of_files = len(report.errors)
         files_with_errors = dict((filename, errors) for filename, errors in report.errors.items() if len(errors) > 0)
+        description = 'Total number of files processed: {nof}\t Files with errors: {fwe}'.format(nof=num_of_files,
+                                                                                            fwe=len(files_with_errors))
+
+        if len(report.outcomes) > 0:
+            description += '\t Files not fully linted: {fnl}'.format(fnl=len(report.outcomes))
 
         if len(files_with_errors) == 0:
-            self.github_commit.create_status(state='success',
-                                             target_url=self.target_url,
-                                             description='Total number of files processed: {nof}\t Files with errors: {fwe}'.format(nof=num_of_files,fwe=len(files_with_errors)),
-                                             context=LINTABLE)
+            self.create_status(state='success', description=description)
         else:
-            self.github_commit.create_status(state='failure',
-                                             target_url=self.target_url,
-                                             description='Total number of files processed: {nof}\t Files with errors: {fwe}'.format(nof=num_of_files,fwe=len(files_with_errors)),
-                                             context=LINTABLE)
+            self.create_status(state='failure', description=description)
 
     def started(self, uuid: UUID):
         self.logger.error('target_url= {url}'.format(url=self.target_url))
         super().started(uuid)
-        self.github_commit.create_status(state='pending',
-                                         target_url=self.target_url,
-                                         description='Starting linting process',
-                                         context=LINTABLE)
+        self.create_status(state='pending', description='Starting linting process')
+
+    def create_status(self, state: str, description: str):
+        """Set the status of the commit on GitHub, traced as a span of the job."""
+
+        with TRACER.span('github.create_status', state=state):
+            self.github_commit.create_status(state=state,
+                                             target_url=self.target_url,
+                                             description=description,
+                                             context=LINTABLE)
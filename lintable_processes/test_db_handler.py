@@ -26,9 +26,10 @@ from playhouse.test_utils import test_database
 from cryptography.fernet import Fernet
 
 from lintable_db.database import DatabaseHandler
-from lintable_db.models import User, Jobs, Repo, Report, ReportSummary
+from lintable_db.models import User, Jobs, Repo, EncodedReport, Report, ReportSummary
 from lintable_lintball.lint_error import LintError
 from lintable_lintball.lint_report import LintReport, create_from_db_query
+from lintable_lintball.lint_report_codec import decode_report
 from lintable_processes.db_handler import DBHandler
 from lintable_settings.settings import LINTWEB_SETTINGS
 
@@ -48,6 +49,7 @@ class DBHandlerTests(unittest.TestCase):
         Jobs._meta.database = test_db
         Repo._meta.database = test_db
         Report._meta.database = test_db
+        EncodedReport._meta.database = test_db
         ReportSummary._meta.database = test_db
 
         # Create local objects that can be written
@@ -56,7 +58,7 @@ class DBHandlerTests(unittest.TestCase):
         self.repo1 = Repo(repo_id=1, owner=self.user1,
                           url='https://github.com/user/repo.git')
 
-        for i in [User, Jobs, Repo, Report, ReportSummary]:
+        for i in [User, Jobs, Repo, Report, EncodedReport, ReportSummary]:
             if not i.table_exists():
                 test_db.create_table(i)
 
@@ -90,6 +92,16 @@ class DBHandlerTests(unittest.TestCase):
             self.db_handler.started(self.uuid)
             self.get_and_check_job_status(status='STARTED')
 
+    def test_resume(self):
+        with test_database(test_db, ()):
+            self.db_handler.started(self.uuid)
+
+            resumed_handler = DBHandler(repo_id=self.repo1.repo_id)
+            resumed_handler.resume(self.uuid)
+            resumed_handler.finish(self.uuid)
+
+            self.get_and_check_job_status(status='FINISHED')
+
     def test_clone_repo(self):
         with test_database(test_db, ()):
             self.db_handler.clone_repo(self.uuid, self.git_repo, self.tmp_dir)
@@ -132,6 +144,7 @@ class DBHandlerTests(unittest.TestCase):
             self.assertEqual(report,
                              retrieved_report,
                              'The original lint_report and the retrieved lint_report should be the same')
+            self.assertEqual(report, DatabaseHandler.get_report(job))
 
             self.assertIsNotNone(summaries)
             self.assertTrue(len(summaries) == 1 and
@@ -140,6 +153,23 @@ class DBHandlerTests(unittest.TestCase):
                             'ReportSummary should contain 1 row, with file_name == {a_file} and error_count == 1'
                             .format(a_file=a_file))
 
+    def test_report_encoded(self):
+        report = LintReport(errors=dict(a_file=[LintError(line_number=1,
+                                                          column=2,
+                                                          msg='Some error message')]))  # type: LintReport
+        encoded_handler = DBHandler(repo_id=self.repo1.repo_id, store_encoded=True)
+
+        with test_database(test_db, ()):
+            encoded_handler.started(self.uuid)
+            encoded_handler.report(self.uuid, report)
+            job = self.get_and_check_job_status(status='REPORT')
+
+            # the report is stored as a single blob rather than a row per error
+            self.assertEqual(len(job.reports), 0)
+            self.assertEqual(len(job.encoded_reports), 1)
+            self.assertEqual(report, decode_report(job.encoded_reports[0].data))
+            self.assertEqual(report, DatabaseHandler.get_report(job))
+
     def test_finished(self):
         with test_database(test_db, ()):
             self.db_handler.finish(self.uuid)
@@ -0,0 +1,106 @@
+"""Tests for ProcessTimings."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from lintable_processes.process_state import ProcessState
+from lintable_processes.process_timings import ProcessTimings
+
+
+class FakeClock(object):
+    """A clock that only moves when told to."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ProcessTimingsTests(unittest.TestCase):
+    """Tests for ProcessTimings."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.timings = ProcessTimings(clock=self.clock)
+
+    def test_stages(self):
+        """Make sure each stage lasts until the next one, and entering it again changes nothing."""
+
+        self.timings.enter(ProcessState.CLONE_REPO)
+        self.clock.now += 2.0
+        self.timings.enter(ProcessState.RETRIEVE_FILES)
+        self.clock.now += 1.0
+        self.timings.enter(ProcessState.LINT_FILES)
+        self.clock.now += 0.5
+        self.timings.enter(ProcessState.LINT_FILES)
+        self.clock.now += 0.5
+
+        self.assertEqual(self.timings.stage(ProcessState.LINT_FILES), 1.0)
+
+        self.timings.enter(ProcessState.REPORT)
+        self.clock.now += 0.25
+        self.timings.stop()
+        self.clock.now += 10.0
+
+        self.assertEqual(self.timings.to_dict()['stages'], {'clone_repo': 2.0,
+                                                            'retrieve_files': 1.0,
+                                                            'lint_files': 1.0,
+                                                            'report': 0.25})
+        self.assertEqual(self.timings.total(), 4.25)
+
+    def test_linters_and_files(self):
+        """Make sure lint times add up per file, across commits, and per linter."""
+
+        self.timings.add_lint('whitespace', 'a.py', 0.5)
+        self.timings.add_lint('whitespace', 'a.py', 0.25)
+        self.timings.add_lint('pylint', 'a.py', 2.0)
+        self.timings.add_lint('whitespace', 'b.py', 1.0)
+
+        self.assertEqual(self.timings.file('a.py'), 2.75)
+        self.assertEqual(self.timings.slowest_files(1), [('a.py', 2.75)])
+        self.assertEqual(self.timings.to_dict()['linters'], {'whitespace': 1.75, 'pylint': 2.0})
+        self.assertEqual(self.timings.to_dict()['files']['a.py'], {'whitespace': 0.75, 'pylint': 2.0})
+
+    def test_merge(self):
+        """Make sure merging the timings of another part of a job adds up its stages and lint times."""
+
+        part = ProcessTimings(clock=self.clock)
+        part.wall_offset = self.timings.wall_offset
+        part.enter(ProcessState.LINT_FILES)
+        part.add_lint('whitespace', 'a.py', 0.5)
+        self.clock.now += 2.0
+        part.stop()
+
+        self.timings.enter(ProcessState.REPORT)
+        self.timings.add_lint('whitespace', 'a.py', 0.25)
+        self.clock.now += 1.0
+        self.timings.merge(part.to_dict())
+        self.timings.stop()
+
+        self.assertEqual(self.timings.to_dict()['stages'], {'report': 1.0, 'lint_files': 2.0})
+        self.assertEqual(self.timings.to_dict()['files'], {'a.py': {'whitespace': 0.75}})
+        # the job started when the part did
+        self.assertEqual(self.timings.total(), 3.0)
+
+    def test_not_started(self):
+        """Make sure a process that never started took no time."""
+
+        self.assertEqual(self.timings.total(), 0.0)
+        self.assertEqual(self.timings.to_dict()['stages'], {})
+
+if __name__ == '__main__':
+    unittest.main()
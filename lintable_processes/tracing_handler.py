@@ -0,0 +1,61 @@
+"""Traces the stages of each job, as spans of the task running it."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from uuid import UUID
+
+from lintable_lintball.lint_report import LintReport
+from lintable_processes.do_nothing_handler import DoNothingHandler
+from lintable_processes.process_timings import ProcessTimings
+from lintable_tracing.tracer import Tracer
+from lintable_tracing.tracing import TRACER
+
+
+class TracingHandler(DoNothingHandler):
+    """Records a span for each stage of the job, once it finishes, under the current span.
+
+    The current span is usually that of the Celery task running the job, so the
+    stages line up with the task's queue wait, database writes and GitHub calls.
+    """
+
+    def __init__(self, tracer: Tracer = TRACER):
+        super().__init__()
+        self.tracer = tracer
+        self.files = None
+        self.errors = None
+
+    def report(self, uuid: UUID, lint_report: LintReport):
+        """Called when the linting process has produced a LintReport."""
+
+        super().report(uuid, lint_report)
+        self.files = len(lint_report.errors)
+        self.errors = sum(len(errors) for errors in lint_report.errors.values())
+
+    def timings(self, uuid: UUID, timings: ProcessTimings):
+        """Called as the process finishes, with how long each stage, file and linter took."""
+
+        super().timings(uuid, timings)
+
+        current = self.tracer.current()
+
+        if current is not None:
+            current.set_attribute('job', str(uuid))
+
+            if self.files is not None:
+                current.set_attribute('files', self.files)
+                current.set_attribute('errors', self.errors)
+
+        for state, start_time, seconds in timings.history:
+            self.tracer.record(state.name.lower(), start_time, start_time + seconds, job=str(uuid))
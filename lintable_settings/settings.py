@@ -15,6 +15,7 @@
 # limitations under the License.
 
 import os
+import tempfile
 
 #: Settings dictionary for lintweb.
 LINTWEB_SETTINGS = {
@@ -41,5 +42,91 @@ LINTBALL_SETTINGS = {
     'celery': {
         'broker': os.environ.get('CLOUDAMQP_URL', 'amqp://'),
         'backend': os.environ.get('REDIS_URL', 'redis://')
+    },
+    'pool': {
+        'workers': int(os.environ.get('LINTBALL_POOL_WORKERS', os.cpu_count() or 1))
+    },
+    'chord': {
+        # jobs with more changed files than this are split into batches of this size, 0 disables splitting
+        'batch_size': int(os.environ.get('LINTBALL_CHORD_BATCH_SIZE', 500))
+    },
+    'async': {
+        # the most linter subprocesses the asyncio engine runs at once
+        'max_processes': int(os.environ.get('LINTBALL_ASYNC_MAX_PROCESSES', 4 * (os.cpu_count() or 1)))
+    },
+    'daemon': {
+        'max_processes': int(os.environ.get('LINTBALL_DAEMON_MAX_PROCESSES', os.cpu_count() or 1)),
+        'max_requests': int(os.environ.get('LINTBALL_DAEMON_MAX_REQUESTS', 1000)),
+        'health_check_interval': float(os.environ.get('LINTBALL_DAEMON_HEALTH_CHECK_INTERVAL', 60)),
+        'timeout': float(os.environ.get('LINTBALL_DAEMON_TIMEOUT', 30))
+    },
+    'limits': {
+        # per linter and file, in seconds, unless the linter sets its own timeout
+        'timeout': float(os.environ.get('LINTBALL_LINT_TIMEOUT', 60)),
+        # per job, in seconds; files that aren't linted in time are reported as timed out
+        'job_timeout': float(os.environ.get('LINTBALL_JOB_TIMEOUT', 30 * 60)),
+        # caps on linter processes, 0 means no limit; the memory limit, in
+        # bytes, is opt-in, since it caps the address space (RLIMIT_AS) rather
+        # than resident memory, and JVM and Node linters reserve more than they
+        # use as soon as they start
+        'memory': int(os.environ.get('LINTBALL_LINT_MEMORY_LIMIT', 0)),
+        'cpu': int(os.environ.get('LINTBALL_LINT_CPU_LIMIT', 60)),
+        # files larger than this, in bytes, are skipped by linters that read them in, 0 means no limit
+        'max_file_size': int(os.environ.get('LINTBALL_LINT_MAX_FILE_SIZE', 64 * 1024 * 1024))
+    },
+    'filter': {
+        # changed files larger than this, in bytes, are skipped, 0 means no limit
+        'max_size': int(os.environ.get('LINTBALL_FILTER_MAX_SIZE', 1024 * 1024)),
+        # how much of each file is checked for NUL bytes to tell whether it's binary
+        'sniff_size': int(os.environ.get('LINTBALL_FILTER_SNIFF_SIZE', 8000))
+    },
+    'lint': {
+        'hunks_only': os.environ.get('LINTBALL_HUNKS_ONLY', 'false').lower() == 'true'
+    },
+    'codec': {
+        # encoded reports and task messages larger than this, in bytes, are compressed
+        'compress_threshold': int(os.environ.get('LINTBALL_CODEC_COMPRESS_THRESHOLD', 1024)),
+        'compress_level': int(os.environ.get('LINTBALL_CODEC_COMPRESS_LEVEL', 6))
+    },
+    'report': {
+        # store each job's report as a single encoded blob rather than a row per error
+        'store_encoded': os.environ.get('LINTBALL_STORE_ENCODED_REPORTS', 'false').lower() == 'true'
+    },
+    'metrics': {
+        # the directory the processes of the web app or a worker share their metrics through; the web app
+        # and each worker need a directory of their own, and each process keeps its own metrics if it's empty
+        'path': os.environ.get('LINTBALL_METRICS_PATH', ''),
+        # the port workers serve their metrics on, 0 disables it; workers sharing a host each need their own
+        'port': int(os.environ.get('LINTBALL_METRICS_PORT', 0)),
+        # the bearer token Prometheus has to scrape the metrics with, they aren't served if it's empty
+        'token': os.environ.get('LINTBALL_METRICS_TOKEN', '')
+    },
+    'tracing': {
+        'exporter': os.environ.get('LINTBALL_TRACING_EXPORTER', 'none'),  # none, file or otlp
+        'path': os.environ.get('LINTBALL_TRACING_PATH', os.path.join(tempfile.gettempdir(), 'lintable-traces.jsonl')),
+        'url': os.environ.get('LINTBALL_TRACING_URL', 'http://localhost:4318/v1/traces'),
+        'service': os.environ.get('LINTBALL_TRACING_SERVICE', 'lintable')
+    },
+    'clone': {
+        # how remote repos are cloned when the repo cache is disabled: partial fetches just the two commits,
+        # to depth, and then just the blobs of the changed files, while full clones everything
+        'strategy': os.environ.get('LINTBALL_CLONE_STRATEGY', 'partial'),  # partial or full
+        'depth': int(os.environ.get('LINTBALL_CLONE_DEPTH', 1))
+    },
+    'repo_cache': {
+        # keep a bare mirror of each repo, fetched from only when a job needs commits it doesn't have
+        'enabled': os.environ.get('LINTBALL_REPO_CACHE', 'true').lower() == 'true',
+        # on the same filesystem as the temporary directory, so jobs can clone from the mirrors by linking
+        'path': os.environ.get('LINTBALL_REPO_CACHE_PATH', os.path.join(tempfile.gettempdir(), 'lintable-repo-cache')),
+        # the mirrors used the longest ago are removed once they take up more than this, 0 means no limit
+        'max_bytes': int(os.environ.get('LINTBALL_REPO_CACHE_MAX_BYTES', 20 * 1024 * 1024 * 1024))
+    },
+    'cache': {
+        'store': os.environ.get('LINTBALL_CACHE_STORE', 'memory'),  # memory, disk, redis or none
+        'max_entries': int(os.environ.get('LINTBALL_CACHE_MAX_ENTRIES', 100000)),
+        'path': os.environ.get('LINTBALL_CACHE_PATH', os.path.join(tempfile.gettempdir(), 'lintable-lint-cache')),
+        'max_bytes': int(os.environ.get('LINTBALL_CACHE_MAX_BYTES', 1024 * 1024 * 1024)),
+        'url': os.environ.get('LINTBALL_CACHE_URL', os.environ.get('REDIS_URL', 'redis://')),
+        'ttl': int(os.environ.get('LINTBALL_CACHE_TTL', 7 * 24 * 60 * 60))
     }
 }
@@ -0,0 +1,80 @@
+"""A stand-in for an OpenTelemetry collector, that writes the spans it receives to a file."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+import click
+
+
+class CollectorServer(ThreadingMixIn, HTTPServer):
+    """Accepts the spans of each request in a thread of its own."""
+
+    daemon_threads = True
+
+
+class CollectorRequestHandler(BaseHTTPRequestHandler):
+    """Accepts OTLP JSON on POST /v1/traces, appending each span to the output as a line of JSON."""
+
+    output = sys.stdout
+    lock = threading.Lock()
+
+    def do_POST(self):
+        if self.path != '/v1/traces':
+            self.send_error(404)
+            return
+
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8'))
+        except ValueError:
+            self.send_error(400)
+            return
+
+        lines = [json.dumps(span, sort_keys=True) + '\n'
+                 for resource_spans in request.get('resourceSpans', [])
+                 for scope_spans in resource_spans.get('scopeSpans', [])
+                 for span in scope_spans.get('spans', [])]
+
+        with self.lock:
+            self.output.writelines(lines)
+            self.output.flush()
+
+        body = b'{}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        return
+
+
+@click.command()
+@click.option('--port', default=4318, type=int, help='The port to listen on.')
+@click.option('--output', type=click.File('a'), default='-', help='The file to append the spans to.')
+def collector(port, output):
+    """Collect the spans sent by LINTBALL_TRACING_EXPORTER=otlp, for trying tracing out locally."""
+
+    handler = type('BoundCollectorRequestHandler', (CollectorRequestHandler,), {'output': output})
+    CollectorServer(('', port), handler).serve_forever()
+
+
+if __name__ == '__main__':
+    collector()
@@ -0,0 +1,179 @@
+"""Where finished spans go: a local file, or a collector that speaks OTLP."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import logging
+import os
+import threading
+from typing import List, Optional
+
+import requests
+
+from lintable_settings.settings import LINTBALL_SETTINGS
+from lintable_tracing.tracer import Span
+
+# OpenTelemetry status codes
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+# OpenTelemetry span kinds
+KIND_INTERNAL = 1
+
+
+class SpanExporter(object):
+    """Base class for exporters, which drops every span."""
+
+    def export(self, spans: List[Span]):
+        """Take finished spans, either sending them right away or holding on to them until flushed."""
+
+        return
+
+    def flush(self):
+        """Send any spans being held on to."""
+
+        return
+
+
+class FileExporter(SpanExporter):
+    """Appends each span to a file, as a line of JSON."""
+
+    def __init__(self, path: str):
+        """
+        :param path: The file to append the spans to
+        :return:
+        """
+
+        self.path = path  # type: str
+        self.lock = threading.Lock()
+
+    def export(self, spans: List[Span]):
+        lines = ''.join(json.dumps(span.to_dict(), sort_keys=True) + '\n' for span in spans)
+
+        with self.lock:
+            directory = os.path.dirname(self.path)
+
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            with open(self.path, 'a') as output:
+                output.write(lines)
+
+
+class OTLPExporter(SpanExporter):
+    """Sends spans to an OpenTelemetry collector, as OTLP over HTTP with JSON encoding.
+
+    Spans are held on to until max_batch of them have finished or flush is
+    called, so a job sends a handful of requests rather than one per span.
+    A collector that can't be reached loses the spans, but never fails the job.
+    """
+
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, url: str, service: str, max_batch: int = 512, timeout: float = 5.0):
+        """
+        :param url: The collector's traces endpoint, e.g. http://localhost:4318/v1/traces
+        :param service: The name to report the spans under, e.g. 'lintable-worker'
+        :param max_batch: The most spans to hold on to before sending them
+        :param timeout: How long, in seconds, to wait on the collector
+        :return:
+        """
+
+        self.url = url  # type: str
+        self.service = service  # type: str
+        self.max_batch = max_batch  # type: int
+        self.timeout = timeout  # type: float
+        self.spans = []  # type: List[Span]
+        self.lock = threading.Lock()
+
+    def export(self, spans: List[Span]):
+        with self.lock:
+            self.spans.extend(spans)
+            full = len(self.spans) >= self.max_batch
+
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            spans, self.spans = self.spans, []
+
+        if not spans:
+            return
+
+        try:
+            requests.post(self.url, data=json.dumps(self.encode(spans)),
+                          headers={'Content-Type': 'application/json'}, timeout=self.timeout).raise_for_status()
+        except requests.exceptions.RequestException as e:
+            self.logger.error('Unable to send {count} spans to {url}: {e}'.format(count=len(spans), url=self.url, e=e))
+
+    def encode(self, spans: List[Span]) -> dict:
+        """The spans as an OTLP ExportTraceServiceRequest, in its JSON encoding."""
+
+        return {'resourceSpans': [{
+            'resource': {'attributes': [otlp_attribute('service.name', self.service)]},
+            'scopeSpans': [{'scope': {'name': 'lintable'},
+                            'spans': [otlp_span(span) for span in spans]}]}]}
+
+
+def otlp_span(span: Span) -> dict:
+    """A single span in the OTLP JSON encoding."""
+
+    encoded = {'traceId': span.trace_id,
+               'spanId': span.span_id,
+               'name': span.name,
+               'kind': KIND_INTERNAL,
+               'startTimeUnixNano': str(int(span.start_time * 1e9)),
+               'endTimeUnixNano': str(int((span.end_time if span.end_time is not None else span.start_time) * 1e9)),
+               'attributes': [otlp_attribute(key, value) for key, value in sorted(span.attributes.items())],
+               'status': {'code': STATUS_ERROR, 'message': span.error} if span.error else {'code': STATUS_OK}}
+
+    if span.parent_id is not None:
+        encoded['parentSpanId'] = span.parent_id
+
+    return encoded
+
+
+def otlp_attribute(key: str, value) -> dict:
+    """A single attribute in the OTLP JSON encoding."""
+
+    if isinstance(value, bool):
+        encoded = {'boolValue': value}
+    elif isinstance(value, int):
+        encoded = {'intValue': str(value)}
+    elif isinstance(value, float):
+        encoded = {'doubleValue': value}
+    else:
+        encoded = {'stringValue': str(value)}
+
+    return {'key': key, 'value': encoded}
+
+
+def create_exporter(service: Optional[str] = None) -> SpanExporter:
+    """Create the exporter chosen in LINTBALL_SETTINGS['tracing'].
+
+    :param service: The name to report spans under, defaults to the setting's
+    :return SpanExporter:
+    """
+
+    settings = LINTBALL_SETTINGS['tracing']
+    exporter_type = settings['exporter']
+
+    if exporter_type == 'file':
+        return FileExporter(settings['path'])
+    elif exporter_type == 'otlp':
+        return OTLPExporter(settings['url'], service or settings['service'])
+
+    return SpanExporter()
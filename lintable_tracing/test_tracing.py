@@ -0,0 +1,177 @@
+"""Tests for tracing jobs across processes."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from uuid import uuid4
+
+from lintable_tracing.collector import CollectorRequestHandler, CollectorServer
+from lintable_tracing.exporters import FileExporter, OTLPExporter, SpanExporter
+from lintable_tracing.tracer import Tracer, parse_traceparent, trace_id_for
+from lintable_tracing.tracing import finish_task, inject, start_task
+
+
+class ListExporter(SpanExporter):
+    """Keeps the spans it is given."""
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+
+class Request(object):
+    """A task's request, with its custom headers as attributes, like Celery's."""
+
+    def __init__(self, headers: dict):
+        self.__dict__.update(headers)
+
+
+class TracerTests(unittest.TestCase):
+    """Tests for Tracer and the propagation of traces through task headers."""
+
+    def setUp(self):
+        self.exporter = ListExporter()
+        self.tracer = Tracer(self.exporter)
+
+    def test_nested_spans(self):
+        """Make sure spans are children of the current span, and record errors."""
+
+        with self.tracer.span('job', trace_id=trace_id_for('00000000-0000-0000-0000-000000000001')) as job:
+            with self.assertRaises(ValueError):
+                with self.tracer.span('clone_repo', files=3):
+                    raise ValueError('no such repo')
+
+            self.assertIs(self.tracer.current(), job)
+
+        self.assertIsNone(self.tracer.current())
+
+        clone, job = self.exporter.spans
+        self.assertEqual(job.trace_id, '00000000000000000000000000000001')
+        self.assertEqual((clone.trace_id, clone.parent_id), (job.trace_id, job.span_id))
+        self.assertEqual(clone.error, 'ValueError: no such repo')
+        self.assertEqual(clone.attributes, {'files': 3})
+        self.assertGreaterEqual(clone.duration, 0.0)
+
+    def test_task_continues_trace(self):
+        """Make sure a task continues the trace it was sent from, after a span for its time in the queue."""
+
+        headers = {}
+
+        with self.tracer.span('webhook') as webhook:
+            inject(headers, self.tracer)
+
+        self.assertEqual(parse_traceparent(headers['traceparent']), (webhook.trace_id, webhook.span_id))
+
+        task = start_task('a-task', 'lintable_lintball.lintball.lint_github', Request(headers), self.tracer)
+
+        with self.tracer.span('clone_repo') as clone:
+            pass
+
+        finish_task('a-task', 'SUCCESS', self.tracer)
+
+        queue = self.exporter.spans[1]
+        self.assertEqual([span.name for span in self.exporter.spans], ['webhook', 'queue', 'clone_repo', 'lint_github'])
+        self.assertEqual((queue.parent_id, task.parent_id), (webhook.span_id, webhook.span_id))
+        self.assertEqual(clone.parent_id, task.span_id)
+        self.assertEqual(task.attributes['state'], 'SUCCESS')
+        self.assertIsNone(self.tracer.current())
+
+    def test_task_without_trace(self):
+        """Make sure a task sent without a trace starts one keyed by its id."""
+
+        task_id = str(uuid4())
+        task = start_task(task_id, 'lint_batch', Request({'headers': {'traceparent': 'garbage'}}), self.tracer)
+        finish_task(task_id, 'FAILURE', self.tracer)
+
+        self.assertEqual(task.trace_id, task_id.replace('-', ''))
+        self.assertIsNone(task.parent_id)
+        self.assertEqual(task.error, 'FAILURE')
+
+
+class ExporterTests(unittest.TestCase):
+    """Tests for the file and OTLP exporters."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_file_exporter(self):
+        """Make sure each span is appended to the file as a line of JSON."""
+
+        filename = os.path.join(self.tmp_dir, 'traces', 'spans.jsonl')
+        tracer = Tracer(FileExporter(filename))
+
+        with tracer.span('job'):
+            with tracer.span('lint_files'):
+                pass
+
+        with open(filename, 'r') as file:
+            spans = [json.loads(line) for line in file]
+
+        self.assertEqual([span['name'] for span in spans], ['lint_files', 'job'])
+        self.assertEqual(spans[0]['parent_id'], spans[1]['span_id'])
+
+    def test_otlp_exporter(self):
+        """Make sure spans reach an OTLP collector once flushed, in its JSON encoding."""
+
+        output = io.StringIO()
+        handler = type('TestCollectorRequestHandler', (CollectorRequestHandler,), {'output': output})
+        server = CollectorServer(('127.0.0.1', 0), handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        try:
+            tracer = Tracer(OTLPExporter('http://127.0.0.1:{port}/v1/traces'.format(port=server.server_address[1]),
+                                         'lintable-test'))
+
+            with tracer.span('job', files=2, cached=False):
+                pass
+
+            self.assertEqual(output.getvalue(), '')
+
+            tracer.flush()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        span = json.loads(output.getvalue())
+        self.assertEqual(span['name'], 'job')
+        self.assertEqual(span['status'], {'code': 1})
+        self.assertEqual(span['attributes'], [{'key': 'cached', 'value': {'boolValue': False}},
+                                              {'key': 'files', 'value': {'intValue': '2'}}])
+        self.assertGreaterEqual(int(span['endTimeUnixNano']), int(span['startTimeUnixNano']))
+
+    def test_unreachable_collector(self):
+        """Make sure a collector that can't be reached doesn't fail the job."""
+
+        tracer = Tracer(OTLPExporter('http://127.0.0.1:9/v1/traces', 'lintable-test', timeout=1.0))
+
+        with tracer.span('job'):
+            pass
+
+        tracer.flush()
+
+if __name__ == '__main__':
+    unittest.main()
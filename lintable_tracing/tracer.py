@@ -0,0 +1,209 @@
+"""Traces a job across processes, as spans sharing a trace id."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Tuple
+from uuid import UUID
+
+# a W3C trace context header, like 00-<32 hex trace id>-<16 hex span id>-01
+TRACEPARENT = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$')
+
+
+def new_span_id() -> str:
+    return os.urandom(8).hex()
+
+
+def new_trace_id() -> str:
+    return os.urandom(16).hex()
+
+
+def trace_id_for(task_id: str) -> str:
+    """The trace id of a job, from the id of the Celery task that started it, which is also the job's UUID."""
+
+    try:
+        return UUID(str(task_id)).hex
+    except ValueError:
+        return new_trace_id()
+
+
+class Span(object):
+    """A timed operation within a trace, like cloning a repo or writing to the database.
+
+    Times are wall clock seconds since the epoch, so that spans from different
+    processes line up; durations are measured with time.monotonic.
+    """
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None,
+                 start_time: Optional[float] = None, attributes: Optional[dict] = None):
+        """
+        :param name: What the span covers, e.g. 'clone_repo'
+        :param trace_id: The trace the span belongs to, as 32 hex digits
+        :param parent_id: The span this one is part of, if any, as 16 hex digits
+        :param start_time: When the span started, defaults to now
+        :param attributes: Details of the span, e.g. the number of files
+        :return:
+        """
+
+        self.name = name  # type: str
+        self.trace_id = trace_id  # type: str
+        self.span_id = new_span_id()  # type: str
+        self.parent_id = parent_id  # type: Optional[str]
+        self.start_time = start_time if start_time is not None else time.time()  # type: float
+        self.started = time.monotonic()  # type: float
+        self.end_time = None  # type: Optional[float]
+        self.attributes = dict(attributes or {})  # type: dict
+        self.error = None  # type: Optional[str]
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def set_error(self, error: BaseException):
+        self.error = '{name}: {error}'.format(name=type(error).__name__, error=error)
+
+    def end(self, end_time: Optional[float] = None):
+        """End the span, now unless end_time is given."""
+
+        if self.end_time is None:
+            self.end_time = end_time if end_time is not None else self.start_time + time.monotonic() - self.started
+
+    @property
+    def duration(self) -> Optional[float]:
+        return self.end_time - self.start_time if self.end_time is not None else None
+
+    def traceparent(self) -> str:
+        """The span as a W3C traceparent header, to continue the trace in another process."""
+
+        return '00-{trace_id}-{span_id}-01'.format(trace_id=self.trace_id, span_id=self.span_id)
+
+    def to_dict(self) -> dict:
+        return {'name': self.name,
+                'trace_id': self.trace_id,
+                'span_id': self.span_id,
+                'parent_id': self.parent_id,
+                'start_time': self.start_time,
+                'end_time': self.end_time,
+                'duration': self.duration,
+                'attributes': self.attributes,
+                'error': self.error}
+
+
+def parse_traceparent(traceparent: Optional[str]) -> Optional[Tuple[str, str]]:
+    """The trace id and parent span id of a W3C traceparent header, or None if it isn't one."""
+
+    match = TRACEPARENT.match(traceparent.strip().lower()) if isinstance(traceparent, str) else None
+
+    return (match.group(1), match.group(2)) if match else None
+
+
+class Tracer(object):
+    """Starts spans, keeps track of the current one, and hands finished spans to an exporter.
+
+    The current span is kept per thread, so each thread, and so each task of a
+    worker, has its own; LintPool hands it on to the threads it lints in. New
+    spans are children of the current span, unless they're given a trace id
+    of their own.
+    """
+
+    def __init__(self, exporter=None):
+        """
+        :param exporter: Where finished spans go, a SpanExporter; None drops them
+        :return:
+        """
+
+        self.exporter = exporter
+        self.local = threading.local()
+
+    def current(self) -> Optional[Span]:
+        return getattr(self.local, 'span', None)
+
+    def start_span(self, name: str, trace_id: Optional[str] = None, parent_id: Optional[str] = None,
+                   start_time: Optional[float] = None, **attributes) -> Span:
+        """Start a span, a child of the current span unless trace_id is given.
+
+        :param name: What the span covers
+        :param trace_id: The trace to start the span in, instead of the current span's
+        :param parent_id: The span it is part of, when trace_id is given
+        :param start_time: When the span started, defaults to now
+        :return Span:
+        """
+
+        if trace_id is None:
+            current = self.current()
+
+            if current is not None:
+                trace_id, parent_id = current.trace_id, current.span_id
+            else:
+                trace_id = new_trace_id()
+
+        return Span(name, trace_id, parent_id, start_time, attributes)
+
+    def activate(self, span: Span):
+        """Make a span, or None, the current one, returning a token to deactivate it with."""
+
+        token = self.current()
+        self.local.span = span
+
+        return token
+
+    def deactivate(self, token):
+        """Make the span that was current before activate the current one again."""
+
+        self.local.span = token
+
+    def finish(self, span: Span, end_time: Optional[float] = None):
+        """End a span and hand it to the exporter."""
+
+        span.end(end_time)
+
+        if self.exporter is not None:
+            self.exporter.export([span])
+
+    def record(self, name: str, start_time: float, end_time: float, **attributes) -> Span:
+        """Record a span that has already happened, as a child of the current span."""
+
+        span = self.start_span(name, start_time=start_time, **attributes)
+        self.finish(span, end_time)
+
+        return span
+
+    @contextmanager
+    def span(self, name: str, trace_id: Optional[str] = None, parent_id: Optional[str] = None, **attributes):
+        """Trace the with block as a span, the current span while it runs.
+
+        Exceptions are recorded on the span, and raised again.
+        """
+
+        span = self.start_span(name, trace_id, parent_id, **attributes)
+        token = self.activate(span)
+
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(e)
+            raise
+        finally:
+            self.deactivate(token)
+            self.finish(span)
+
+    def flush(self):
+        """Send any spans the exporter is holding on to."""
+
+        if self.exporter is not None:
+            self.exporter.flush()
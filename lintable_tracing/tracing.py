@@ -0,0 +1,110 @@
+"""The tracer of each process, and the propagation of traces through Celery."""
+
+# Copyright 2015-2016 Capstone Team G
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+from typing import Dict, Optional, Tuple
+
+from lintable_tracing.exporters import create_exporter
+from lintable_tracing.tracer import Span, Tracer, parse_traceparent, trace_id_for
+
+# the process-wide tracer, exporting wherever LINTBALL_SETTINGS['tracing'] says
+TRACER = Tracer(create_exporter())
+
+# the span of each task running in this process, and the token to deactivate it with, by task id
+TASK_SPANS = {}  # type: Dict[str, Tuple[Span, object]]
+
+
+def inject(headers: dict, tracer: Tracer = TRACER):
+    """Add the current trace, and the time, to the headers of a task being sent.
+
+    :param headers: The task's message headers
+    :param tracer: The tracer whose current span the task continues
+    :return:
+    """
+
+    current = tracer.current()
+
+    if current is not None:
+        headers.setdefault('traceparent', current.traceparent())
+
+    headers.setdefault('enqueued_at', time.time())
+
+
+def header(request, name: str):
+    """A custom header of a task's request; Celery keeps them on the request itself, or in its headers."""
+
+    value = getattr(request, name, None)
+
+    if value is None:
+        value = (getattr(request, 'headers', None) or {}).get(name)
+
+    return value
+
+
+def start_task(task_id: str, task_name: str, request, tracer: Tracer = TRACER) -> Span:
+    """Start the span of a task as it starts running, making it the current span.
+
+    The task continues the trace in its traceparent header if it has one, and
+    otherwise starts a trace keyed by its own id. The time it spent queued is
+    recorded as a span of its own.
+
+    :param task_id: The id of the task
+    :param task_name: The name of the task, e.g. 'lintable_lintball.lintball.lint_github'
+    :param request: The task's request, with its headers
+    :param tracer: The tracer to start the span with
+    :return Span:
+    """
+
+    context = parse_traceparent(header(request, 'traceparent'))
+    trace_id, parent_id = context if context is not None else (trace_id_for(task_id), None)
+    enqueued_at = header(request, 'enqueued_at')
+
+    now = time.time()
+
+    if enqueued_at is not None:
+        queued = tracer.start_span('queue', trace_id, parent_id, start_time=float(enqueued_at), task=task_name)
+        tracer.finish(queued, max(float(enqueued_at), now))
+
+    span = tracer.start_span(task_name.rsplit('.', 1)[-1], trace_id, parent_id, start_time=now,
+                             task=task_name, task_id=task_id)
+    TASK_SPANS[task_id] = (span, tracer.activate(span))
+
+    return span
+
+
+def finish_task(task_id: str, state: Optional[str] = None, tracer: Tracer = TRACER):
+    """Finish the span of a task once it has run, and send the task's spans on.
+
+    :param task_id: The id of the task
+    :param state: How the task ended, e.g. 'SUCCESS' or 'FAILURE'
+    :param tracer: The tracer the span was started with
+    :return:
+    """
+
+    span, token = TASK_SPANS.pop(task_id, (None, None))
+
+    if span is None:
+        return
+
+    if state is not None:
+        span.set_attribute('state', state)
+
+        if state != 'SUCCESS':
+            span.error = state
+
+    tracer.deactivate(token)
+    tracer.finish(span)
+    tracer.flush()
@@ -17,9 +17,10 @@
 import json
 import logging
 import urllib.parse
+from uuid import uuid4
 
 import requests
-from flask import (Flask, request, render_template, redirect, url_for,
+from flask import (Flask, Response, request, render_template, redirect, url_for,
                    abort, flash)
 from flask_login import (LoginManager, login_user, login_required, logout_user,
                          current_user)
@@ -27,8 +28,13 @@ from github import Github
 
 from lintable_db.database import DatabaseHandler
 from lintable_db.models import User, database
+from lintable_metrics.exporter import is_authorized
+from lintable_metrics.metrics import WEBHOOKS, webhook_action
+from lintable_metrics.registry import CONTENT_TYPE, exposition
 from lintable_settings.settings import LINTWEB_SETTINGS
 from lintable_lintball import lintball
+from lintable_tracing.tracer import trace_id_for
+from lintable_tracing.tracing import TRACER
 
 app = Flask(__name__) # pylint: disable=invalid-name
 app.secret_key = LINTWEB_SETTINGS['SESSIONS_SECRET']
@@ -77,6 +83,15 @@ def index():
     if not DEBUG:
         return render_template('index.html')
 
+@app.route('/metrics')
+def metrics():
+    """Expose the metrics of the web app's processes to Prometheus, if it scrapes with the metrics token."""
+
+    if not is_authorized(request.headers.get('Authorization')):
+        abort(401)
+
+    return Response(exposition(), content_type=CONTENT_TYPE)
+
 if not DEBUG:
     @app.route('/account')
     @login_required
@@ -109,7 +124,7 @@ if not DEBUG:
             abort(403)
 
         LOGGER.error('returning status for job.job_id: {}'.format(job.job_id))
-        return render_template('status.html', job=job)
+        return render_template('status.html', job=job, report=DatabaseHandler.get_report(job))
 
     @app.route('/terms')
     def terms():
@@ -143,7 +158,16 @@ if not DEBUG:
         """Trigger processing of a JSON payload."""
         payload = request.get_json()
         target_url = url_for('status', _external=True)
-        lintball.lint_github.delay(payload=payload, target_url=target_url)
+        action = payload.get('action', 'none') if isinstance(payload, dict) else 'none'
+        WEBHOOKS.labels(action=webhook_action(action)).inc()
+
+        # the job's trace is keyed by the id of the task that lints it
+        task_id = str(uuid4())
+
+        with TRACER.span('webhook', trace_id=trace_id_for(task_id), action=action):
+            lintball.lint_github.apply_async(kwargs=dict(payload=payload, target_url=target_url), task_id=task_id)
+
+        TRACER.flush()
         return 'successy'
 
     @app.route('/login')